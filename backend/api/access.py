@@ -0,0 +1,74 @@
+"""
+Station access sets of AuthUser accounts.
+
+An AuthUser can only consult the stations it was granted through
+StationConsult. The granted station ids of each AuthUser are kept as one
+frozenset in the default cache (Redis), so scoping a list is a single
+`id__in` filter and a per-object check is a set lookup. Within a request
+the set is also memoized on the user object.
+
+`api.signals` drops the cached set whenever a StationConsult row is
+created or deleted, whichever code path wrote it (grant_station,
+revoke_station, grant_access, StationConsultViewSet, cascades).
+
+Sets are always read from the primary, even inside routing.replica_reads():
+a lagging replica would bring back (and cache) a grant just revoked.
+
+Admins and users without an AuthUser profile are not scoped by grants.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .models import StationConsult
+
+
+def access_key(auth_user_id):
+    """Cache key of the station set of an AuthUser."""
+    return f'stationaccess:{auth_user_id}'
+
+
+def granted_station_ids(auth_user_id):
+    """Return the frozenset of station ids granted to an AuthUser."""
+    key = access_key(auth_user_id)
+    station_ids = cache.get(key)
+    if station_ids is None:
+        station_ids = frozenset(
+            StationConsult.objects.using(DEFAULT_DB_ALIAS).filter(auth_user_id=auth_user_id)
+            .values_list('station_id', flat=True)
+        )
+        cache.set(key, station_ids, settings.STATION_ACCESS_CACHE_TIMEOUT)
+    return station_ids
+
+
+def station_scope(user):
+    """
+    Stations `user` is restricted to.
+
+    Returns:
+        frozenset | None: Granted station ids for AuthUser accounts, None
+        when the user is not scoped by grants.
+    """
+    if not (user and user.is_authenticated):
+        return None
+    if hasattr(user, 'admin_profile') or not hasattr(user, 'auth_profile'):
+        return None
+    if not hasattr(user, '_station_scope'):
+        user._station_scope = granted_station_ids(user.auth_profile.pk)
+    return user._station_scope
+
+
+def scope_key(station_ids):
+    """Short cache-scope fragment identifying a station set."""
+    if station_ids is None:
+        return 'all'
+    digest = hashlib.md5(','.join(map(str, sorted(station_ids))).encode()).hexdigest()
+    return f'stations:{digest}'
+
+
+def invalidate(auth_user_id):
+    """Drop the cached set of an AuthUser once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete(access_key(auth_user_id)))
@@ -4,9 +4,11 @@ from django.contrib.gis import admin as geoadmin
 from .models import (
     User, Admin, AuthUser,
     Institution, Station, Device,
-    Alert, AlertPollutant,
-    AlertReceive, StationConsult
+    Alert, AlertPollutant, AlertThreshold,
+    AlertReceive, StationConsult,
+    Measurement, Job,
 )
+from .pagination import EstimatedCountPaginator
 
 """
 Admin configuration for all backend models.
@@ -106,12 +108,15 @@ class DeviceAdmin(admin.ModelAdmin):
 """
 Admin interface for alerts generated by stations.
 Supports filtering by attended status and station.
+Counts are estimated on large result sets (EstimatedCountPaginator).
 """
 @admin.register(Alert)
 class AlertAdmin(admin.ModelAdmin):
     list_display = ("id", "station", "attended", "alert_date")
     list_filter = ("attended", "station")
     search_fields = ("station__name",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 # -------------------------
@@ -120,12 +125,30 @@ class AlertAdmin(admin.ModelAdmin):
 """
 Admin settings for pollutants associated with alerts.
 Displays pollutant type, level, and timestamp.
+Counts are estimated on large result sets (EstimatedCountPaginator).
 """
 @admin.register(AlertPollutant)
 class AlertPollutantAdmin(admin.ModelAdmin):
     list_display = ("id", "alert", "pollutant", "level", "recorded_at")
     list_filter = ("pollutant",)
     search_fields = ("alert__station__name",)
+    list_select_related = ("alert__station",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+# -------------------------
+# AlertThreshold
+# -------------------------
+"""
+Admin settings for the thresholds evaluated on every ingested batch.
+Rows without station are network-wide defaults.
+"""
+@admin.register(AlertThreshold)
+class AlertThresholdAdmin(admin.ModelAdmin):
+    list_display = ("id", "pollutant", "station", "level", "clear_level", "updated_at")
+    list_filter = ("pollutant",)
+    search_fields = ("station__name",)
 
 
 # -------------------------
@@ -145,4 +168,39 @@ class AlertReceiveAdmin(admin.ModelAdmin):
 @admin.register(StationConsult)
 class StationConsultAdmin(admin.ModelAdmin):
     list_display = ("id", "auth_user", "station", "granted_at")
-    search_fields = ("auth_user__user__email", "station__name")
\ No newline at end of file
+    search_fields = ("auth_user__user__email", "station__name")
+
+
+# -------------------------
+# Measurement
+# -------------------------
+"""
+Admin settings for continuous device readings.
+The table is very large, so counts are estimated (EstimatedCountPaginator)
+and the unfiltered total is not displayed.
+"""
+@admin.register(Measurement)
+class MeasurementAdmin(admin.ModelAdmin):
+    list_display = ("id", "station", "device", "pollutant", "value", "recorded_at")
+    list_filter = ("pollutant",)
+    list_select_related = ("station", "device")
+    raw_id_fields = ("station", "device")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+
+# -------------------------
+# Job
+# -------------------------
+"""
+Admin settings for the background job queue (api/jobs.py).
+Failed jobs keep their last traceback in last_error.
+"""
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "priority", "attempts", "run_at", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "unique_key")
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at", "finished_at", "locked_at", "locked_by", "last_error", "result")
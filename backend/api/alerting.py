@@ -0,0 +1,209 @@
+"""
+Threshold alert engine evaluated on every ingested batch.
+
+A batch is checked against the thresholds of its (station, pollutant)
+pairs in one vectorized pass: thresholds are resolved once per pair and
+broadcast to the readings, breaches are a single comparison, and the peak
+and latest value of each pair are reduced with NumPy.
+
+To avoid alert storms, every pair carries a small state in the shared
+Django cache (Redis, see settings.CACHES):
+
+- hysteresis: after an alert the pair stays active, and does not alert
+  again, until a reading falls below its clear level;
+- cooldown: a pair that alerted cannot alert again before
+  ALERT_COOLDOWN_MINUTES have passed, even if it cleared in between.
+
+Batches of the same station are serialized with an advisory lock (see
+api.locks) held from reading the state until the transaction commits, so
+two concurrent batches cannot both see a pair as clear and alert twice.
+The new state is written to the cache only once the transaction commits:
+a rolled-back batch must not leave a cooldown for an alert that was never
+stored.
+
+Alerts that fire in the same batch are grouped per station: one Alert with
+one AlertPollutant per breached pollutant (level and recorded_at of the
+peak reading, so backfilled batches keep their reading times), written with
+two bulk inserts.
+"""
+
+import time
+from datetime import timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Alert, AlertPollutant, AlertThreshold
+from . import caching, locks, streams
+
+
+_PAIR_DTYPE = [('station', np.int64), ('pollutant', 'U10')]
+
+
+def state_key(station_id, pollutant):
+    """Cache key holding the alert state of a station/pollutant pair."""
+    return f'alerting:{station_id}:{pollutant}'
+
+
+def load_thresholds(station_ids):
+    """
+    Resolve the thresholds that apply to the given stations.
+
+    Returns:
+        dict: {(station_id | None, pollutant): (level, clear_level)}; keys with
+        None are network-wide defaults.
+    """
+    ratio = settings.ALERT_CLEAR_RATIO
+    thresholds = {
+        (None, pollutant): (float(level), float(level) * ratio)
+        for pollutant, level in settings.ALERT_DEFAULT_THRESHOLDS.items()
+    }
+    rows = AlertThreshold.objects.filter(
+        Q(station__isnull=True) | Q(station_id__in=list(station_ids))
+    ).values_list('station_id', 'pollutant', 'level', 'clear_level')
+    for station_id, pollutant, level, clear_level in rows:
+        thresholds[(station_id, pollutant)] = (
+            level, clear_level if clear_level is not None else level * ratio
+        )
+    return thresholds
+
+
+def evaluate(batch, thresholds):
+    """
+    Reduce a batch to one row per (station, pollutant) pair.
+
+    Returns:
+        tuple: (pairs, peaks, peak_times, latest, clear_levels) where
+        `pairs` is a structured array, `peaks` the highest breaching value of
+        each pair (NaN if none breached), `peak_times` the time of that
+        reading (NaT if none), `latest` the value of its most recent reading
+        and `clear_levels` its clear level (NaN without threshold).
+    """
+    keys = np.empty(len(batch), dtype=_PAIR_DTYPE)
+    keys['station'] = batch.station_ids
+    keys['pollutant'] = batch.pollutants
+    pairs, inverse = np.unique(keys, return_inverse=True)
+
+    levels = np.full(pairs.size, np.nan)
+    clear_levels = np.full(pairs.size, np.nan)
+    for i, (station_id, pollutant) in enumerate(zip(
+        pairs['station'].tolist(), pairs['pollutant'].tolist()
+    )):
+        found = thresholds.get((station_id, pollutant)) or thresholds.get((None, pollutant))
+        if found:
+            levels[i], clear_levels[i] = found
+
+    values = batch.values
+    breach = values >= levels[inverse]
+    peaks = np.full(pairs.size, -np.inf)
+    np.maximum.at(peaks, inverse[breach], values[breach])
+    peaks[np.isinf(peaks)] = np.nan
+
+    # Time of each peak: sort the breaches by pair then value, take each group's last row.
+    peak_times = np.full(pairs.size, np.datetime64('NaT'), dtype='datetime64[us]')
+    breaches = np.flatnonzero(breach)
+    if breaches.size:
+        order = breaches[np.lexsort((values[breaches], inverse[breaches]))]
+        last = order[np.append(inverse[order][1:] != inverse[order][:-1], True)]
+        peak_times[inverse[last]] = batch.recorded_at[last]
+
+    # Latest reading per pair: sort by pair then time, take each group's last row.
+    order = np.lexsort((batch.recorded_at, inverse))
+    last = np.flatnonzero(np.append(inverse[order][1:] != inverse[order][:-1], True))
+    latest = values[order][last]
+
+    return pairs, peaks, peak_times, latest, clear_levels
+
+
+def decide(pairs, peaks, peak_times, latest, clear_levels, states, now):
+    """
+    Apply hysteresis and cooldown to the evaluated pairs.
+
+    Parameters:
+        states (dict): Cached states by `state_key`.
+        now (float): Current epoch seconds.
+
+    Returns:
+        tuple[list, dict]: Fired (station_id, pollutant, peak, peak_time)
+        tuples and the states that changed, by cache key.
+    """
+    cooldown = settings.ALERT_COOLDOWN_MINUTES * 60
+    fired = []
+    changed = {}
+    for station_id, pollutant, peak, peak_time, value, clear_level in zip(
+        pairs['station'].tolist(), pairs['pollutant'].tolist(),
+        peaks.tolist(), peak_times.tolist(), latest.tolist(), clear_levels.tolist(),
+    ):
+        key = state_key(station_id, pollutant)
+        state = states.get(key) or {'active': False, 'last_alert': None}
+        active, last_alert = state['active'], state['last_alert']
+
+        cooled = last_alert is None or now - last_alert >= cooldown
+        if not np.isnan(peak) and not active and cooled:
+            fired.append((station_id, pollutant, peak, peak_time.replace(tzinfo=dt_timezone.utc)))
+            active, last_alert = True, now
+        if active and value < clear_level:
+            active = False
+
+        if (active, last_alert) != (state['active'], state['last_alert']):
+            changed[key] = {'active': active, 'last_alert': last_alert}
+    return fired, changed
+
+
+def create_alerts(fired):
+    """
+    Bulk-create one Alert per station and one AlertPollutant per breach.
+
+    Returns:
+        list[Alert]: The created alerts.
+    """
+    by_station = {}
+    for station_id, pollutant, peak, peak_time in fired:
+        by_station.setdefault(station_id, []).append((pollutant, peak, peak_time))
+
+    with transaction.atomic():
+        alerts = Alert.objects.bulk_create(
+            [Alert(station_id=station_id) for station_id in by_station]
+        )
+        AlertPollutant.objects.bulk_create([
+            AlertPollutant(alert=alert, pollutant=pollutant, level=peak, recorded_at=peak_time)
+            for alert, breaches in zip(alerts, by_station.values())
+            for pollutant, peak, peak_time in breaches
+        ])
+        # Bulk inserts do not send signals.
+        caching.invalidate(caching.ALERTS)
+        caching.invalidate(caching.STATIONS, by_station, lists=False)
+        streams.publish_alerts(
+            (alert, [(pollutant, peak) for pollutant, peak, _ in breaches])
+            for alert, breaches in zip(alerts, by_station.values())
+        )
+    return alerts
+
+
+def process_batch(batch, now=None):
+    """
+    Evaluate an ingested batch and raise alerts for new breaches.
+
+    Returns:
+        list[Alert]: Alerts created for this batch.
+    """
+    if len(batch) == 0:
+        return []
+    now = now or time.time()
+
+    station_ids = np.unique(batch.station_ids).tolist()
+    thresholds = load_thresholds(station_ids)
+    pairs, peaks, peak_times, latest, clear_levels = evaluate(batch, thresholds)
+
+    keys = [state_key(s, p) for s, p in zip(pairs['station'].tolist(), pairs['pollutant'].tolist())]
+    with transaction.atomic():
+        locks.lock_stations(locks.ALERTING, station_ids)
+        states = cache.get_many(keys)
+        fired, changed = decide(pairs, peaks, peak_times, latest, clear_levels, states, now)
+        alerts = create_alerts(fired) if fired else []
+        if changed:
+            transaction.on_commit(lambda: cache.set_many(changed, timeout=None))
+    return alerts
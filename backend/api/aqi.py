@@ -0,0 +1,234 @@
+"""
+Vectorized air quality index (AQI) computation.
+
+Two breakpoint tables are supported:
+- `colombia`: Índice de Calidad del Aire (ICA), Resolución 2254 de 2017.
+- `us_epa`: US EPA AQI (2024 PM2.5 revision).
+
+All concentrations are expected in µg/m³, as stored in VRISA; the EPA gas
+breakpoints (ppb/ppm) are converted to µg/m³ at 25 °C when the tables are
+built. Sub-indices are interpolated linearly between consecutive upper
+breakpoints and capped at 500.
+
+Each pollutant is evaluated over its regulatory averaging period (24 h for
+PM2.5/PM10, 8 h for O3/CO, 1 h for NO2/SO2), read from the rolling windows
+kept by `api.rolling`. Sub-indices are computed for whole arrays of readings
+with NumPy (one mask per pollutant), and the per-station AQI is the maximum
+sub-index, with the pollutant that produced it reported as dominant. `refresh()` recomputes and
+stores the index for every station in the network with one read query and
+one upsert, so it can run on every ingest cycle. Stations without a reading
+within AQI_LOOKBACK_HOURS lose their stored index in the same transaction:
+an old value must not be served as current.
+"""
+
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import StationAQI, StationRollingWindow, AQIStandard
+from .rolling import REGULATORY_WINDOW
+from . import tiles
+
+
+# Upper index value of each category, shared by both standards.
+INDEX_UPPER = np.array([50, 100, 150, 200, 300, 500], dtype=np.float64)
+
+CATEGORIES = {
+    AQIStandard.COLOMBIA: [
+        'Buena',
+        'Aceptable',
+        'Dañina a la salud para grupos sensibles',
+        'Dañina a la salud',
+        'Muy dañina a la salud',
+        'Peligrosa',
+    ],
+    AQIStandard.US_EPA: [
+        'Good',
+        'Moderate',
+        'Unhealthy for Sensitive Groups',
+        'Unhealthy',
+        'Very Unhealthy',
+        'Hazardous',
+    ],
+}
+
+# Molecular weights (g/mol) and molar volume at 25 °C for ppb -> µg/m³.
+MOLECULAR_WEIGHT = {'O3': 48.00, 'CO': 28.01, 'SO2': 64.07, 'NO2': 46.01}
+MOLAR_VOLUME = 24.45
+
+
+def _ppb_to_ugm3(pollutant, values):
+    return [round(v * MOLECULAR_WEIGHT[pollutant] / MOLAR_VOLUME, 1) for v in values]
+
+
+# Upper concentration breakpoint (µg/m³) of each category.
+BREAKPOINTS = {
+    AQIStandard.COLOMBIA: {
+        'PM25': [12, 37, 55, 150, 250, 500],
+        'PM10': [54, 154, 254, 354, 424, 604],
+        'O3': [106, 138, 167, 207, 393, 1185],
+        'CO': [5094, 10819, 14254, 17688, 34862, 57703],
+        'SO2': [93, 197, 486, 797, 1583, 2629],
+        'NO2': [100, 189, 677, 1221, 2349, 3853],
+    },
+    AQIStandard.US_EPA: {
+        'PM25': [9.0, 35.4, 55.4, 125.4, 225.4, 325.4],
+        'PM10': [54, 154, 254, 354, 424, 604],
+        'O3': _ppb_to_ugm3('O3', [54, 70, 85, 105, 200, 604]),
+        'CO': _ppb_to_ugm3('CO', [4400, 9400, 12400, 15400, 30400, 50400]),
+        'SO2': _ppb_to_ugm3('SO2', [35, 75, 185, 304, 604, 1004]),
+        'NO2': _ppb_to_ugm3('NO2', [53, 100, 360, 649, 1249, 2049]),
+    },
+}
+
+
+def sub_indices(pollutants, values, standard=AQIStandard.COLOMBIA):
+    """
+    Compute the AQI sub-index of every reading.
+
+    Parameters:
+        pollutants (np.ndarray[str]): Pollutant code per reading.
+        values (np.ndarray[float]): Concentration per reading (µg/m³).
+        standard (str): AQIStandard value.
+
+    Returns:
+        np.ndarray[float]: Sub-index per reading; NaN for unknown pollutants
+        or invalid concentrations.
+    """
+    pollutants = np.asarray(pollutants)
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(values.shape, np.nan)
+    index_lower = np.concatenate(([0.0], INDEX_UPPER[:-1]))
+
+    for pollutant, upper in BREAKPOINTS[standard].items():
+        mask = (pollutants == pollutant) & (values >= 0)
+        if not mask.any():
+            continue
+        conc_upper = np.asarray(upper, dtype=np.float64)
+        conc_lower = np.concatenate(([0.0], conc_upper[:-1]))
+        conc = values[mask]
+        k = np.minimum(np.searchsorted(conc_upper, conc, side='left'), conc_upper.size - 1)
+        index = index_lower[k] + (INDEX_UPPER[k] - index_lower[k]) * (
+            (conc - conc_lower[k]) / (conc_upper[k] - conc_lower[k])
+        )
+        result[mask] = np.minimum(index, INDEX_UPPER[-1])
+    return result
+
+
+def category(index, standard=AQIStandard.COLOMBIA):
+    """Return the category label for an AQI value."""
+    k = min(int(np.searchsorted(INDEX_UPPER, index, side='left')), INDEX_UPPER.size - 1)
+    return CATEGORIES[standard][k]
+
+
+def station_indices(station_ids, pollutants, values, standard=AQIStandard.COLOMBIA):
+    """
+    Aggregate readings into one AQI per station.
+
+    Returns:
+        tuple: (stations, aqi, dominant_pollutant, details) where the first
+        three are aligned arrays with one entry per station, and `details`
+        is (station_ids, pollutants, sub_indices) for every valid reading,
+        sorted by station.
+    """
+    station_ids = np.asarray(station_ids, dtype=np.int64)
+    pollutants = np.asarray(pollutants)
+    sub = sub_indices(pollutants, values, standard)
+
+    valid = ~np.isnan(sub)
+    station_ids, pollutants, sub = station_ids[valid], pollutants[valid], sub[valid]
+
+    # Sort by station, highest sub-index first: the first row of each
+    # station group holds its AQI and dominant pollutant.
+    order = np.lexsort((-sub, station_ids))
+    station_ids, pollutants, sub = station_ids[order], pollutants[order], sub[order]
+    stations, first = np.unique(station_ids, return_index=True)
+    details = (station_ids, pollutants, sub)
+    return stations, sub[first], pollutants[first], details
+
+
+def latest_concentrations(now=None):
+    """
+    Regulatory-window average per station and pollutant, for pairs with a
+    reading within AQI_LOOKBACK_HOURS.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: station ids, pollutants, values.
+    """
+    since = (now or timezone.now()) - timedelta(hours=settings.AQI_LOOKBACK_HOURS)
+    rows = list(
+        StationRollingWindow.objects.filter(head__gte=since)
+        .values_list('station_id', 'pollutant', 'avg_1h', 'avg_8h', 'avg_24h')
+    )
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, str), np.empty(0, np.float64)
+    stations, pollutants, avg_1h, avg_8h, avg_24h = zip(*rows)
+    pollutants = np.array(pollutants)
+    windows = np.array([REGULATORY_WINDOW[p] for p in pollutants.tolist()])
+    averages = {
+        window: np.array(column, dtype=np.float64)
+        for window, column in (('1h', avg_1h), ('8h', avg_8h), ('24h', avg_24h))
+    }
+    values = np.select(
+        [windows == window for window in averages],
+        list(averages.values()),
+        default=np.nan,
+    )
+    return np.array(stations, dtype=np.int64), pollutants, values
+
+
+def refresh(now=None):
+    """
+    Recompute and store the current AQI of every station for every
+    configured standard, and delete the rows of stations without recent
+    readings.
+
+    Returns:
+        int: Number of station/standard rows written.
+    """
+    now = now or timezone.now()
+    station_ids, pollutants, values = latest_concentrations(now)
+
+    objects = []
+    computed = {}
+    for standard in settings.AQI_STANDARDS:
+        stations, indices, dominant, details = station_indices(
+            station_ids, pollutants, values, standard
+        )
+        computed[standard] = stations.tolist()
+        detail_stations, detail_pollutants, detail_sub = details
+        bounds = np.searchsorted(detail_stations, stations, side='right')
+        starts = np.concatenate(([0], bounds[:-1]))
+        for station_id, index, pollutant, start, end in zip(
+            stations.tolist(), indices.tolist(), dominant.tolist(), starts, bounds
+        ):
+            index = round(index)
+            objects.append(StationAQI(
+                station_id=station_id,
+                standard=standard,
+                aqi=index,
+                category=category(index, standard),
+                dominant_pollutant=pollutant,
+                sub_indices={
+                    p: round(v) for p, v in zip(
+                        detail_pollutants[start:end].tolist(), detail_sub[start:end].tolist()
+                    )
+                },
+                computed_at=now,
+            ))
+
+    with transaction.atomic():
+        for standard, stations in computed.items():
+            StationAQI.objects.filter(standard=standard).exclude(station_id__in=stations).delete()
+        StationAQI.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=['station', 'standard'],
+            update_fields=['aqi', 'category', 'dominant_pollutant', 'sub_indices', 'computed_at'],
+        )
+    # Tiles embed the current AQI of every station.
+    tiles.invalidate()
+    return len(objects)
@@ -0,0 +1,268 @@
+"""
+Async implementations of the hottest read endpoints.
+
+Served under /api/async/ by the ASGI application (core/asgi.py, run with
+uvicorn; WEB_CONCURRENCY sets the worker count). While a request waits on
+PostGIS or Redis its coroutine is suspended instead of holding one of a
+fixed pool of threads, so a worker keeps accepting requests. Queries go
+through the async ORM (`async for`, `aexists`) and the cache through its
+async API; what has none yet (the raw SQL of the series, page counts, JWT
+validation through the user cache) runs in `sync_to_async`. Every
+middleware in settings.MIDDLEWARE is async-capable, so the request itself
+never switches to a thread.
+
+The responses are the same as those of the sync viewsets:
+
+- GET /api/async/stations/                  = /api/stations/
+- GET /api/async/stations/nearby/           = /api/stations/nearby/
+- GET /api/async/stations/{id}/series/      = /api/stations/{id}/series/
+- GET /api/async/alerts/                    = /api/alerts/
+- GET /api/async/health/                    = /health/
+
+including filtering, search, ordering, pagination (page numbers, and
+?pagination=cursor for alerts), station access scopes and the response
+cache of api.caching. Like their sync counterparts they may read from a
+replica (see api.routing). `manage.py benchmark_read_path` compares both
+paths.
+"""
+
+import functools
+import operator
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db import connection
+from django.db.models import Q
+from django.http import HttpResponse
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .auth_cache import CachedJWTAuthentication
+from .pagination import KeysetPagination
+from .serializers import StationListSerializer, AlertSerializer
+from .views import StationViewSet, AlertViewSet
+from . import access, caching, downsampling, routing, series, spatial
+
+
+def _response(data, status=200, headers=None):
+    """JSON response rendered exactly like the DRF views."""
+    response = HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def _authenticate(request):
+    result = CachedJWTAuthentication().authenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    return result[0]
+
+
+def async_api_view(authenticated=True):
+    """
+    Decorator for the async GET views of this module: authenticates the
+    request with the access token, renders the returned data as JSON
+    (views may also return a response) and turns DRF exceptions into their
+    usual error responses.
+    """
+    def decorate(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return _response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+            try:
+                with routing.replica_reads():
+                    if authenticated:
+                        request.user = await sync_to_async(_authenticate)(request)
+                    data = await view(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+                headers = {'WWW-Authenticate': 'Bearer realm="api"'} if exc.status_code == 401 else None
+                return _response(detail, status=exc.status_code, headers=headers)
+            if isinstance(data, HttpResponse):
+                return data
+            return _response(data)
+        return wrapper
+    return decorate
+
+
+# ---------------------------------------------------------------- helpers
+
+async def _cached(namespace, scope, request, render):
+    """Serve list data from the response cache of api.caching, or render it."""
+    key = await sync_to_async(caching.list_key)(namespace, scope, request)
+    data = await cache.aget(key)
+    if data is None:
+        data = await render()
+        await cache.aset(key, data, routing.cache_timeout(settings.API_CACHE_TIMEOUT))
+    return data
+
+
+def _filter(request, queryset, viewset):
+    """Apply the filterset, search and ordering of `viewset` to `queryset`."""
+    filterset = viewset.filterset_class(request.GET, queryset=queryset, request=request)
+    if not filterset.is_valid():
+        raise exceptions.ValidationError(filterset.errors)
+    queryset = filterset.qs
+
+    terms = request.GET.get('search', '').replace('\x00', '').replace(',', ' ').split()
+    for term in terms:
+        queryset = queryset.filter(functools.reduce(operator.or_, [
+            Q(**{f'{field}__icontains': term}) for field in viewset.search_fields
+        ]))
+
+    ordering = [
+        term.strip() for term in request.GET.get('ordering', '').split(',')
+        if term.strip().lstrip('-') in viewset.ordering_fields
+    ]
+    return queryset.order_by(*(ordering or viewset.ordering))
+
+
+def _page_number(paginator, raw, last_page_strings):
+    # Runs the (possibly estimated) count.
+    if raw in last_page_strings:
+        raw = paginator.num_pages
+    return paginator.validate_number(raw)
+
+
+async def _paginate(request, queryset, serializer_class, pagination_class):
+    """Page-number pagination with the response format of `pagination_class`."""
+    pagination = pagination_class()
+    size = pagination.page_size
+    try:
+        size = min(max(int(request.GET[pagination.page_size_query_param]), 1), pagination.max_page_size)
+    except (KeyError, ValueError):
+        pass
+
+    paginator = pagination.django_paginator_class(queryset, size)
+    try:
+        number = await sync_to_async(_page_number)(
+            paginator, request.GET.get(pagination.page_query_param, 1), pagination.last_page_strings,
+        )
+    except InvalidPage:
+        raise exceptions.NotFound('Invalid page.')
+
+    bottom = (number - 1) * size
+    rows = [obj async for obj in queryset[bottom:bottom + size]]
+
+    url = request.build_absolute_uri()
+    param = pagination.page_query_param
+    previous = None
+    if number > 1:
+        previous = replace_query_param(url, param, number - 1) if number > 2 else remove_query_param(url, param)
+    return {
+        'count': paginator.count,
+        'count_is_estimate': getattr(paginator, 'is_estimate', False),
+        'next': replace_query_param(url, param, number + 1) if number < paginator.num_pages else None,
+        'previous': previous,
+        'total_pages': paginator.num_pages,
+        'current_page': number,
+        'results': serializer_class(rows, many=True).data,
+    }
+
+
+def _keyset_page(request, queryset, ordering):
+    paginator = KeysetPagination(ordering)
+    rows = paginator.paginate_queryset(queryset, request)
+    return paginator.get_paginated_response(AlertSerializer(rows, many=True).data).data
+
+
+def _stations(scope):
+    queryset = StationViewSet.queryset.all()
+    if scope is not None:
+        queryset = queryset.filter(id__in=scope)
+    return queryset
+
+
+# ---------------------------------------------------------------- views
+
+@async_api_view()
+async def station_list(request):
+    """Async GET /api/stations/ (see StationViewSet)."""
+    scope = await sync_to_async(access.station_scope)(request.user)
+
+    async def render():
+        queryset = _filter(request, _stations(scope), StationViewSet)
+        return await _paginate(
+            request, queryset, StationListSerializer, StationViewSet.pagination_class,
+        )
+
+    return await _cached(caching.STATIONS, access.scope_key(scope), request, render)
+
+
+@async_api_view()
+async def station_nearby(request):
+    """Async GET /api/stations/nearby/ (see StationViewSet.nearby)."""
+    try:
+        lon, lat, k, radius = spatial.parse_nearby_params(request.GET, settings.NEARBY_MAX_K)
+    except ValueError as exc:
+        return _response({'error': str(exc)}, status=400)
+
+    scope = await sync_to_async(access.station_scope)(request.user)
+    stations = [station async for station in spatial.nearby(_stations(scope), lon, lat, k, radius)]
+    data = StationListSerializer(stations, many=True).data
+    for item, station in zip(data, stations):
+        item['distance'] = station.distance
+    return data
+
+
+@async_api_view()
+async def station_series(request, pk):
+    """Async GET /api/stations/{id}/series/ (see StationViewSet.series)."""
+    scope = await sync_to_async(access.station_scope)(request.user)
+    if not await _stations(scope).filter(pk=pk).aexists():
+        raise exceptions.NotFound('No Station matches the given query.')
+
+    try:
+        params = series.parse_params(request.GET)
+        max_points = downsampling.parse_max_points(request.GET)
+    except ValueError as exc:
+        return _response({'error': str(exc)}, status=400)
+
+    return await sync_to_async(series.series_payload)(pk, params, max_points)
+
+
+@async_api_view()
+async def alert_list(request):
+    """Async GET /api/alerts/ (see AlertViewSet)."""
+
+    async def render():
+        queryset = _filter(request, AlertViewSet.queryset.all(), AlertViewSet)
+        drf_request = Request(request)
+        if KeysetPagination.requested(drf_request):
+            return await sync_to_async(_keyset_page)(drf_request, queryset, AlertViewSet.keyset_ordering)
+        return await _paginate(request, queryset, AlertSerializer, AlertViewSet.pagination_class)
+
+    return await _cached(caching.ALERTS, 'all', request, render)
+
+
+def _ping_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+@async_api_view(authenticated=False)
+async def health(request):
+    """Async GET /health/: PostgreSQL and Redis checks."""
+    result = {'status': 'ok', 'django': 'ok', 'database': None, 'redis': None}
+
+    try:
+        await sync_to_async(_ping_database)()
+        result['database'] = 'ok'
+    except Exception as e:
+        result['database'] = str(e)
+        result['status'] = 'error'
+
+    try:
+        await cache.aset('health', 'ok', 10)
+        if await cache.aget('health') == 'ok':
+            result['redis'] = 'ok'
+    except Exception as e:
+        result['redis'] = str(e)
+
+    return result
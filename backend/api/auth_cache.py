@@ -0,0 +1,114 @@
+"""
+JWT authentication backed by a short-lived cache of users and profiles.
+
+simplejwt's JWTAuthentication loads the User on every request, and the
+permission classes then resolve `admin_profile` / `auth_profile`, one more
+query each. CachedJWTAuthentication keeps one record per user in the
+default cache (user fields plus both profiles, AUTH_USER_CACHE_TIMEOUT
+seconds) and rebuilds the instances from it with both reverse one-to-one
+relations already cached, so `hasattr(user, 'admin_profile')` and friends
+do not touch the database.
+
+Records are dropped by `api.signals` whenever the user, its Admin or its
+AuthUser profile is saved or deleted; the TTL only bounds how long a
+missed invalidation can last. Records are read from the primary, so a
+lagging replica cannot re-cache a user that just changed. Password fields
+are never cached: they are deferred on the rebuilt user and loaded on
+access.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User, Admin, AuthUser
+
+
+USER_FIELDS = [
+    field.attname for field in User._meta.concrete_fields
+    if field.name not in ('password', 'password_hash')
+]
+ADMIN_FIELDS = [field.attname for field in Admin._meta.concrete_fields]
+AUTH_USER_FIELDS = [field.attname for field in AuthUser._meta.concrete_fields]
+
+# Reverse one-to-one descriptors: user.admin_profile / user.auth_profile
+_PROFILES = (
+    (User.admin_profile, Admin, ADMIN_FIELDS, 'admin'),
+    (User.auth_profile, AuthUser, AUTH_USER_FIELDS, 'auth'),
+)
+
+
+def user_key(user_id):
+    """Cache key of the record of a user."""
+    return f'authuser:{user_id}'
+
+
+def _values(instance, fields):
+    return [getattr(instance, field) for field in fields]
+
+
+def _record(user):
+    record = {'user': _values(user, USER_FIELDS)}
+    for descriptor, model, fields, name in _PROFILES:
+        profile = getattr(user, descriptor.related.get_accessor_name(), None)
+        record[name] = _values(profile, fields) if profile is not None else None
+    return record
+
+
+def _build(record):
+    user = User.from_db(DEFAULT_DB_ALIAS, USER_FIELDS, record['user'])
+    for descriptor, model, fields, name in _PROFILES:
+        profile = None
+        if record[name] is not None:
+            profile = model.from_db(DEFAULT_DB_ALIAS, fields, record[name])
+            model.user.field.set_cached_value(profile, user)
+        # A cached None makes the accessor raise DoesNotExist without a query.
+        descriptor.related.set_cached_value(user, profile)
+    return user
+
+
+def get_user(user_id):
+    """
+    Return the user with its profiles, from the cache when possible.
+
+    Returns:
+        User | None: None if the user does not exist.
+    """
+    key = user_key(user_id)
+    record = cache.get(key)
+    if record is None:
+        user = (
+            User.objects.using(DEFAULT_DB_ALIAS).select_related('admin_profile', 'auth_profile')
+            .filter(pk=user_id).first()
+        )
+        if user is None:
+            return None
+        record = _record(user)
+        cache.set(key, record, settings.AUTH_USER_CACHE_TIMEOUT)
+    return _build(record)
+
+
+def invalidate_user(user_id):
+    """Drop the cached record of a user once the current transaction commits."""
+    if user_id is not None:
+        transaction.on_commit(lambda: cache.delete(user_key(user_id)))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that resolves the user through `get_user` above."""
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        user = get_user(user_id)
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
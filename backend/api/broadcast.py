@@ -0,0 +1,246 @@
+"""
+Live event fan-out over PostgreSQL LISTEN/NOTIFY.
+
+Producers call `publish` / `publish_many` inside their transaction; NOTIFY
+is transactional, so events are delivered only if the write commits, in
+commit order, to every listening process.
+
+Each server process runs one `Broadcaster` (the module-level `broadcaster`)
+on its event loop. It holds a single psycopg2 connection in autocommit
+mode that LISTENs on every channel with subscribers and is watched with
+`loop.add_reader`, so no polling is involved. Only connecting, which
+blocks in libpq, runs in the default executor (bounded by the connection's
+connect_timeout) so a slow or unreachable database never stalls the loop.
+A notification is decoded once and offered to the matching subscriptions;
+thousands of idle clients cost one database connection per process.
+
+Every subscription has a bounded queue (LIVE_QUEUE_SIZE). A client that
+does not keep up is not allowed to grow memory: when its queue is full
+either the oldest event is dropped (`drop_oldest`, for streams where only
+the latest value matters) or the queue is cleared and replaced with
+OVERFLOW, and the stream ends so the client reconnects (and, for alerts,
+resumes from Last-Event-ID).
+"""
+
+import asyncio
+import functools
+import json
+import logging
+
+import psycopg2
+import psycopg2.extensions
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, connections
+
+
+logger = logging.getLogger(__name__)
+
+ALERTS_CHANNEL = 'vrisa_alerts'
+READINGS_CHANNEL = 'vrisa_readings'
+
+# Marker queued for a subscription that fell behind.
+OVERFLOW = object()
+
+# Seconds to wait for the listener connection when the database alias sets none.
+CONNECT_TIMEOUT = 5
+
+
+def encode(event):
+    """Compact JSON of an event (datetimes as ISO 8601)."""
+    return json.dumps(event, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def publish(channel, event):
+    """NOTIFY `channel` with a JSON event, delivered when the transaction commits."""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_notify(%s, %s)', [channel, encode(event)])
+
+
+def publish_many(channel, events):
+    """NOTIFY `channel` with several JSON events in one statement."""
+    if not events:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload',
+            [channel, [encode(event) for event in events]],
+        )
+
+
+class Subscription:
+    """
+    Bounded queue of (event, raw payload) tuples for one client.
+
+    Parameters:
+        accept (callable): Optional predicate on the decoded event; events
+            it rejects are not queued.
+        drop_oldest (bool): When full, drop the oldest event instead of
+            ending the subscription.
+    """
+
+    def __init__(self, broadcaster, channel, accept=None, maxsize=None, drop_oldest=False):
+        self.broadcaster = broadcaster
+        self.channel = channel
+        self.accept = accept
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self.queue = asyncio.Queue(maxsize or settings.LIVE_QUEUE_SIZE)
+
+    def offer(self, event, payload):
+        if self.accept is not None and not self.accept(event):
+            return
+        if self.drop_oldest and self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        try:
+            self.queue.put_nowait((event, payload))
+        except asyncio.QueueFull:
+            logger.warning('Live subscriber on %s fell behind, disconnecting', self.channel)
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+            self.broadcaster.unsubscribe(self)
+
+    async def get(self, timeout=None):
+        """Next item, OVERFLOW, or None if nothing arrived within `timeout`."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """Single LISTEN connection per process, shared by all subscriptions."""
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self._subscriptions = {}
+        self._connection = None
+        self._connecting = None
+        self._loop = None
+
+    def subscribe(self, channel, accept=None, maxsize=None, drop_oldest=False):
+        """Subscribe to `channel`; must be called from the serving event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._disconnect()
+            self._loop = loop
+        subscription = Subscription(self, channel, accept, maxsize, drop_oldest)
+        new_channel = channel not in self._subscriptions
+        self._subscriptions.setdefault(channel, set()).add(subscription)
+        if self._connection is None:
+            self._start_connect()
+        elif new_channel:
+            self._listen(channel)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self._subscriptions.get(subscription.channel)
+        if not subscriptions or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.channel]
+            if self._connection is not None:
+                self._unlisten(subscription.channel)
+        if not self._subscriptions:
+            self._disconnect()
+
+    def _start_connect(self):
+        if self._connecting is None:
+            self._connecting = self._loop.create_task(self._connect())
+
+    async def _connect(self):
+        task = asyncio.current_task()
+        database = connections[self.alias or settings.LIVE_DATABASE].settings_dict
+        connect = functools.partial(
+            psycopg2.connect,
+            dbname=database['NAME'],
+            user=database['USER'],
+            password=database['PASSWORD'],
+            host=database['HOST'],
+            port=database['PORT'],
+            connect_timeout=database.get('OPTIONS', {}).get('connect_timeout', CONNECT_TIMEOUT),
+            application_name='vrisa-live',
+        )
+        try:
+            listener = await self._loop.run_in_executor(None, connect)
+        except psycopg2.Error:
+            if self._connecting is task:
+                self._connecting = None
+                logger.exception('Live listener could not connect, retrying')
+                self._schedule_reconnect()
+            return
+        if self._connecting is not task or not self._subscriptions:
+            # Disconnected (or every client left) while connecting.
+            listener.close()
+            return
+        self._connecting = None
+        self._connection = listener
+        self._connection.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        for channel in self._subscriptions:
+            self._listen(channel)
+        if self._connection is not None:
+            self._loop.add_reader(self._connection.fileno(), self._on_readable)
+
+    def _disconnect(self):
+        self._connecting = None
+        if self._connection is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._connection.fileno())
+        self._connection.close()
+        self._connection = None
+
+    def _schedule_reconnect(self):
+        self._disconnect()
+
+        def reconnect():
+            if self._connection is None and self._subscriptions:
+                self._start_connect()
+
+        self._loop.call_later(settings.LIVE_RECONNECT_SECONDS, reconnect)
+
+    def _execute(self, sql):
+        if self._connection is None:
+            return
+        try:
+            with self._connection.cursor() as cursor:
+                cursor.execute(sql)
+        except psycopg2.Error:
+            logger.exception('Live listener connection lost, reconnecting')
+            self._schedule_reconnect()
+
+    def _listen(self, channel):
+        self._execute(f'LISTEN "{channel}"')
+
+    def _unlisten(self, channel):
+        self._execute(f'UNLISTEN "{channel}"')
+
+    def _on_readable(self):
+        try:
+            self._connection.poll()
+        except psycopg2.Error:
+            logger.exception('Live listener connection lost, reconnecting')
+            self._schedule_reconnect()
+            return
+        notifies = self._connection.notifies
+        while notifies:
+            notify = notifies.pop(0)
+            subscriptions = self._subscriptions.get(notify.channel)
+            if not subscriptions:
+                continue
+            try:
+                event = json.loads(notify.payload)
+            except ValueError:
+                logger.warning('Ignoring malformed payload on %s', notify.channel)
+                continue
+            for subscription in list(subscriptions):
+                subscription.offer(event, notify.payload)
+
+
+broadcaster = Broadcaster()
@@ -0,0 +1,125 @@
+"""
+Response cache for read endpoints, invalidated by model signals.
+
+List and retrieve responses of the cached viewsets are stored in the default
+cache (Redis) as serialized data. Keys embed version stamps instead of being
+deleted one by one:
+
+- `gen`: every entry of a namespace (e.g. a station rename changes the
+  `station_name` shown by every device and alert);
+- `list`: every list page of a namespace;
+- `obj:<pk>`: the detail of one object.
+
+Invalidating means writing a new stamp (a nanosecond timestamp, so a stamp
+lost to eviction can never bring back an older entry); stale entries simply
+stop being read and expire after API_CACHE_TIMEOUT. `api.signals` maps model
+changes to the stamps they affect, and code that writes in bulk (which does
+not send signals) calls `invalidate` directly.
+"""
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from . import routing
+
+
+PREFIX = 'apicache'
+
+STATIONS = 'stations'
+INSTITUTIONS = 'institutions'
+DEVICES = 'devices'
+ALERTS = 'alerts'
+TILES = 'tiles'
+
+
+def _stamp_key(namespace, name):
+    return f'{PREFIX}:{namespace}:stamp:{name}'
+
+
+def _stamps(namespace, *names):
+    keys = [_stamp_key(namespace, name) for name in names]
+    found = cache.get_many(keys)
+    return ':'.join(str(found.get(key, 0)) for key in keys)
+
+
+def list_key(namespace, scope, request):
+    """Cache key of a list response (host, path and query string included)."""
+    query = hashlib.md5(
+        f'{request.get_host()}{request.get_full_path()}'.encode()
+    ).hexdigest()
+    return f'{PREFIX}:{namespace}:list:{_stamps(namespace, "gen", "list")}:{scope}:{query}'
+
+
+def detail_key(namespace, scope, pk, request):
+    """Cache key of a retrieve response."""
+    query = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    stamps = _stamps(namespace, 'gen', f'obj:{pk}')
+    return f'{PREFIX}:{namespace}:obj:{pk}:{stamps}:{scope}:{query}'
+
+
+def versioned_key(namespace, *parts):
+    """Cache key for data that is only invalidated namespace-wide (`gen`)."""
+    return f'{PREFIX}:{namespace}:{_stamps(namespace, "gen")}:' + ':'.join(str(p) for p in parts)
+
+
+def _bump(names):
+    stamp = time.time_ns()
+    cache.set_many({name: stamp for name in names}, timeout=None)
+
+
+def invalidate(namespace, pks=(), lists=True, everything=False):
+    """
+    Invalidate cached responses of a namespace after the current
+    transaction commits.
+
+    Parameters:
+        pks (iterable): Objects whose detail changed.
+        lists (bool): Invalidate list pages.
+        everything (bool): Invalidate every list and detail of the namespace.
+    """
+    names = [_stamp_key(namespace, f'obj:{pk}') for pk in pks if pk is not None]
+    if lists:
+        names.append(_stamp_key(namespace, 'list'))
+    if everything:
+        names.append(_stamp_key(namespace, 'gen'))
+    if names:
+        transaction.on_commit(lambda: _bump(names))
+
+
+class CachedResponseMixin:
+    """
+    Cache list and retrieve responses of a ViewSet.
+
+    Authentication, permissions and throttling still run on every request;
+    only the queryset evaluation and serialization are skipped on a hit.
+    Subclasses set `cache_namespace` and can override `get_cache_scope` when
+    the response depends on the requesting user.
+    """
+    cache_namespace = None
+
+    def get_cache_scope(self):
+        """Return the part of the key that depends on the requester."""
+        return 'all'
+
+    def _cached(self, key, render):
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = render()
+        if response.status_code == 200:
+            cache.set(key, response.data, routing.cache_timeout(settings.API_CACHE_TIMEOUT))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        key = list_key(self.cache_namespace, self.get_cache_scope(), request)
+        return self._cached(key, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        key = detail_key(self.cache_namespace, self.get_cache_scope(), pk, request)
+        return self._cached(key, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
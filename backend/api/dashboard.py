@@ -0,0 +1,219 @@
+"""
+Dashboard summary: everything the Dashboard page shows, in one response.
+
+`compute` builds it with a handful of grouped queries:
+
+1. stations and devices per station status;
+2. unattended alerts per station (with its institution), folded into
+   per-institution counts and totals in Python, plus the count of attended
+   ones;
+3. the current AQI of every station (api_stationaqi, kept by api.aqi);
+4. exceedance hours of the last 24 hours per pollutant: hourly rollups whose
+   maximum reached the threshold that applies to the station (its own
+   AlertThreshold, else the network one, else ALERT_DEFAULT_THRESHOLDS,
+   as in api.alerting).
+
+Summaries are cached per station scope (see api.access) and AQI standard
+with stale-while-revalidate: an entry is fresh for DASHBOARD_FRESH_SECONDS,
+then still served for up to DASHBOARD_STALE_SECONDS more while a
+`dashboard.refresh` job recomputes it (at most one per entry). Only a cold
+cache computes within the request. Recomputations read from a replica when
+there is one (see api.routing).
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, FloatField, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Alert, AlertThreshold, MeasurementHourly, Station, StationAQI
+from . import access, jobs, routing
+
+
+EXCEEDANCE_WINDOW = timedelta(hours=24)
+
+
+def cache_key(station_ids, standard):
+    """Cache key of the summary of a station scope."""
+    return f'dashboard:{standard}:{access.scope_key(station_ids)}'
+
+
+def _scoped(queryset, station_ids, field='station_id'):
+    if station_ids is not None:
+        queryset = queryset.filter(**{f'{field}__in': station_ids})
+    return queryset
+
+
+def _stations_by_status(station_ids):
+    by_status = {status: {'stations': 0, 'devices': 0} for status, _ in Station.STATUS_CHOICES}
+    rows = (
+        _scoped(Station.objects.all(), station_ids, 'id')
+        .values('status')
+        .annotate(stations=Count('id', distinct=True), devices=Count('devices'))
+        .order_by()
+    )
+    for row in rows:
+        by_status[row['status']] = {'stations': row['stations'], 'devices': row['devices']}
+    return by_status
+
+
+def _unattended_alerts(station_ids):
+    rows = (
+        _scoped(Alert.objects.filter(attended=False), station_ids)
+        .values('station_id', 'station__name', 'station__institution_id', 'station__institution__name')
+        .annotate(count=Count('id'), latest=Max('alert_date'))
+        .order_by('-count', 'station_id')
+    )
+    by_station = []
+    by_institution = {}
+    for row in rows:
+        by_station.append({
+            'station': row['station_id'],
+            'name': row['station__name'],
+            'institution': row['station__institution_id'],
+            'count': row['count'],
+            'latest': row['latest'],
+        })
+        institution = by_institution.setdefault(row['station__institution_id'], {
+            'institution': row['station__institution_id'],
+            'name': row['station__institution__name'],
+            'count': 0,
+            'stations': 0,
+        })
+        institution['count'] += row['count']
+        institution['stations'] += 1
+    return {
+        'by_station': by_station,
+        'by_institution': sorted(by_institution.values(), key=lambda i: (-i['count'], i['institution'])),
+    }
+
+
+def _attended_alerts(station_ids):
+    return _scoped(Alert.objects.filter(attended=True), station_ids).count()
+
+
+def _current_aqi(station_ids, standard):
+    rows = (
+        _scoped(StationAQI.objects.filter(standard=standard), station_ids)
+        .values('station_id', 'aqi', 'category', 'dominant_pollutant', 'computed_at')
+        .order_by('station_id')
+    )
+    return [
+        {
+            'station': row['station_id'],
+            'aqi': row['aqi'],
+            'category': row['category'],
+            'dominant_pollutant': row['dominant_pollutant'],
+            'computed_at': row['computed_at'],
+        }
+        for row in rows
+    ]
+
+
+def _exceedances(station_ids, since):
+    default_level = Case(
+        *[
+            When(pollutant=pollutant, then=Value(float(level)))
+            for pollutant, level in settings.ALERT_DEFAULT_THRESHOLDS.items()
+        ],
+        output_field=FloatField(),
+    )
+    station_level = AlertThreshold.objects.filter(
+        station_id=OuterRef('station_id'), pollutant=OuterRef('pollutant')
+    ).values('level')
+    network_level = AlertThreshold.objects.filter(
+        station__isnull=True, pollutant=OuterRef('pollutant')
+    ).values('level')
+    rows = (
+        _scoped(MeasurementHourly.objects.filter(bucket__gte=since), station_ids)
+        .alias(threshold=Coalesce(Subquery(station_level), Subquery(network_level), default_level))
+        .filter(max__gte=F('threshold'))
+        .values('pollutant')
+        .annotate(hours=Count('id'), stations=Count('station_id', distinct=True))
+        .order_by('pollutant')
+    )
+    return list(rows)
+
+
+def compute(station_ids=None, standard=None, now=None):
+    """
+    Build the summary of the stations in `station_ids` (None: all).
+
+    Returns:
+        dict: generated_at, totals, stations_by_status, unattended_alerts
+        (by_station, by_institution), aqi (standard, stations) and
+        exceedances_24h (since, by_pollutant).
+    """
+    standard = standard or settings.AQI_DEFAULT_STANDARD
+    now = now or timezone.now()
+    since = now - EXCEEDANCE_WINDOW
+
+    by_status = _stations_by_status(station_ids)
+    alerts = _unattended_alerts(station_ids)
+    exceedances = _exceedances(station_ids, since)
+
+    return {
+        'generated_at': now,
+        'totals': {
+            'stations': sum(s['stations'] for s in by_status.values()),
+            'active_stations': by_status['active']['stations'],
+            'devices': sum(s['devices'] for s in by_status.values()),
+            'unattended_alerts': sum(s['count'] for s in alerts['by_station']),
+            'attended_alerts': _attended_alerts(station_ids),
+            'exceedance_hours_24h': sum(e['hours'] for e in exceedances),
+        },
+        'stations_by_status': by_status,
+        'unattended_alerts': alerts,
+        'aqi': {'standard': standard, 'stations': _current_aqi(station_ids, standard)},
+        'exceedances_24h': {'since': since, 'by_pollutant': exceedances},
+    }
+
+
+def _lock_key(key):
+    return f'{key}:refreshing'
+
+
+def refresh(station_ids=None, standard=None):
+    """Recompute and cache the summary of a station scope."""
+    standard = standard or settings.AQI_DEFAULT_STANDARD
+    key = cache_key(station_ids, standard)
+    with routing.replica_reads():
+        data = compute(station_ids, standard)
+    cache.set(
+        key, {'data': data, 'stored_at': time.time()},
+        settings.DASHBOARD_FRESH_SECONDS + settings.DASHBOARD_STALE_SECONDS,
+    )
+    cache.delete(_lock_key(key))
+    return data
+
+
+def summary(station_ids=None, standard=None):
+    """
+    Cached summary of a station scope (stale-while-revalidate).
+
+    Returns:
+        tuple[dict, float]: The summary and its age in seconds.
+    """
+    standard = standard or settings.AQI_DEFAULT_STANDARD
+    key = cache_key(station_ids, standard)
+    entry = cache.get(key)
+    if entry is None:
+        return refresh(station_ids, standard), 0.0
+
+    age = max(time.time() - entry['stored_at'], 0.0)
+    if age > settings.DASHBOARD_FRESH_SECONDS and cache.add(
+        _lock_key(key), 1, settings.DASHBOARD_STALE_SECONDS
+    ):
+        jobs.enqueue(
+            'dashboard.refresh',
+            {
+                'station_ids': sorted(station_ids) if station_ids is not None else None,
+                'standard': standard,
+            },
+            unique_key=key,
+        )
+    return entry['data'], age
@@ -0,0 +1,113 @@
+"""
+Server-side downsampling of chart series.
+
+Implements Largest-Triangle-Three-Buckets (LTTB, Steinarsson 2013) with
+NumPy. LTTB keeps the visual shape of a series (spikes and dips) far better
+than picking every n-th point. On top of it, callers can force specific
+indices to be kept (e.g. the global peak) so the maximum a user would care
+about is never dropped.
+"""
+
+import numpy as np
+
+
+MIN_POINTS = 3
+
+
+def parse_max_points(params):
+    """
+    Read the optional `max_points` query parameter.
+
+    Raises:
+        ValueError: If the value is not an integer >= MIN_POINTS.
+
+    Returns:
+        int | None
+    """
+    raw = params.get('max_points')
+    if raw in (None, ''):
+        return None
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError('max_points must be an integer')
+    if value < MIN_POINTS:
+        raise ValueError(f'max_points must be at least {MIN_POINTS}')
+    return value
+
+
+def lttb(x, y, threshold):
+    """
+    Select `threshold` indices of (x, y) with Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. Bucket averages are computed
+    for all buckets at once from cumulative sums; the selection itself is a
+    single pass because each choice depends on the previous one.
+
+    Parameters:
+        x (array-like): Monotonically increasing x values (e.g. epoch seconds).
+        y (array-like): Values.
+        threshold (int): Number of points to return.
+
+    Returns:
+        np.ndarray[int64]: Sorted indices of the selected points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if threshold >= n or threshold < MIN_POINTS:
+        return np.arange(n)
+
+    # Shift x so cumulative sums of epoch timestamps stay precise.
+    x = x - x[0]
+
+    # Bucket boundaries over the interior points [1, n - 1).
+    every = (n - 2) / (threshold - 2)
+    edges = (np.floor(np.arange(threshold - 1) * every) + 1).astype(np.int64)
+    edges[-1] = n - 1
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average point of every bucket (the last "next bucket" is the final point).
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = ends - starts
+    avg_x = np.append((cx[ends] - cx[starts]) / sizes, x[-1])
+    avg_y = np.append((cy[ends] - cy[starts]) / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = starts[i], ends[i]
+        next_x, next_y = avg_x[i + 1], avg_y[i + 1]
+        areas = np.abs(
+            (x[a] - next_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (next_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(x, y, threshold, keep=()):
+    """
+    LTTB selection plus indices that must always be kept.
+
+    Parameters:
+        keep (iterable[int]): Extra indices to include (e.g. argmax of the
+            bucket maxima so peaks stay visible).
+
+    Returns:
+        np.ndarray[int64]: Sorted, unique indices; at most `threshold` of
+        them unless `keep` leaves fewer than MIN_POINTS for LTTB.
+    """
+    indices = lttb(x, y, threshold)
+    if len(indices) == len(x):
+        return indices
+    keep = np.unique(np.asarray(list(keep), dtype=np.int64))
+    if np.setdiff1d(keep, indices).size:
+        # Make room for every forced interior index, whatever LTTB picks.
+        forced = np.count_nonzero((keep > 0) & (keep < len(x) - 1))
+        indices = lttb(x, y, max(threshold - forced, MIN_POINTS))
+    return np.union1d(indices, keep)
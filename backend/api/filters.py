@@ -1,5 +1,9 @@
 import django_filters
-from .models import Station, Alert, Device, AlertPollutant
+from .models import (
+    Station, Alert, Device, AlertPollutant, Measurement, MeasurementHourly, PollutantType,
+    StationRollingWindow,
+)
+from .rolling import WINDOWS, REGULATORY_WINDOW
 
 
 class StationFilter(django_filters.FilterSet):
@@ -10,6 +14,9 @@ class StationFilter(django_filters.FilterSet):
     - status, institution, admin
     - installed_after, installed_before (date range)
     - name (case-insensitive substring match)
+    - rolling_pollutant + rolling_min / rolling_max: stations whose rolling
+      average of the pollutant is in range; rolling_window (1h, 8h, 24h)
+      defaults to the pollutant's regulatory window
     """
     name = django_filters.CharFilter(lookup_expr='icontains')
     status = django_filters.ChoiceFilter(choices=Station.STATUS_CHOICES)
@@ -17,11 +24,44 @@ class StationFilter(django_filters.FilterSet):
     admin = django_filters.NumberFilter(field_name='admin__id')
     installed_after = django_filters.DateFilter(field_name='installed_at', lookup_expr='gte')
     installed_before = django_filters.DateFilter(field_name='installed_at', lookup_expr='lte')
+    rolling_pollutant = django_filters.ChoiceFilter(choices=PollutantType.choices, method='filter_rolling')
+    rolling_window = django_filters.ChoiceFilter(
+        choices=[(window, window) for window in WINDOWS], method='filter_rolling'
+    )
+    rolling_min = django_filters.NumberFilter(method='filter_rolling')
+    rolling_max = django_filters.NumberFilter(method='filter_rolling')
 
     class Meta:
         model = Station
         fields = ['status', 'institution', 'admin', 'name']
 
+    def filter_rolling(self, queryset, name, value):
+        """
+        The rolling_* parameters only make sense together; they are applied
+        once in `filter_queryset`.
+        """
+        return queryset
+
+    def filter_queryset(self, queryset):
+        """
+        Apply the regular filters, then the rolling-average range if a
+        pollutant and at least one bound were given.
+        """
+        queryset = super().filter_queryset(queryset)
+        data = self.form.cleaned_data
+        pollutant = data.get('rolling_pollutant')
+        minimum, maximum = data.get('rolling_min'), data.get('rolling_max')
+        if not pollutant or (minimum is None and maximum is None):
+            return queryset
+
+        field = f"avg_{data.get('rolling_window') or REGULATORY_WINDOW[pollutant]}"
+        windows = StationRollingWindow.objects.filter(pollutant=pollutant)
+        if minimum is not None:
+            windows = windows.filter(**{f'{field}__gte': minimum})
+        if maximum is not None:
+            windows = windows.filter(**{f'{field}__lte': maximum})
+        return queryset.filter(id__in=windows.values('station_id'))
+
 
 class AlertFilter(django_filters.FilterSet):
     """
@@ -103,4 +143,41 @@ class AlertPollutantFilter(django_filters.FilterSet):
 
     class Meta:
         model = AlertPollutant
-        fields = ['pollutant', 'alert']
\ No newline at end of file
+        fields = ['pollutant', 'alert']
+
+
+class MeasurementFilter(django_filters.FilterSet):
+    """
+    Filters for Measurement objects.
+
+    Supports:
+    - station, device, pollutant
+    - recorded_after / recorded_before (datetime range, enables partition pruning)
+    """
+    station = django_filters.NumberFilter(field_name='station_id')
+    device = django_filters.NumberFilter(field_name='device_id')
+    pollutant = django_filters.ChoiceFilter(choices=PollutantType.choices)
+    recorded_after = django_filters.DateTimeFilter(field_name='recorded_at', lookup_expr='gte')
+    recorded_before = django_filters.DateTimeFilter(field_name='recorded_at', lookup_expr='lte')
+
+    class Meta:
+        model = Measurement
+        fields = ['station', 'device', 'pollutant']
+
+
+class MeasurementRollupFilter(django_filters.FilterSet):
+    """
+    Filters for hourly and daily rollups.
+
+    Supports:
+    - station, pollutant
+    - bucket_after / bucket_before (datetime range)
+    """
+    station = django_filters.NumberFilter(field_name='station_id')
+    pollutant = django_filters.ChoiceFilter(choices=PollutantType.choices)
+    bucket_after = django_filters.DateTimeFilter(field_name='bucket', lookup_expr='gte')
+    bucket_before = django_filters.DateTimeFilter(field_name='bucket', lookup_expr='lt')
+
+    class Meta:
+        model = MeasurementHourly
+        fields = ['station', 'pollutant']
\ No newline at end of file
@@ -0,0 +1,292 @@
+"""
+Interpolated pollution surfaces (IDW) over the city bounding box.
+
+Once per ingest cycle, the latest hourly mean of every station is spread
+over a regular lon/lat grid covering HEATMAP_BBOX with inverse distance
+weighting:
+
+    value(cell) = sum(w_i * v_i) / sum(w_i),   w_i = 1 / d_i ** HEATMAP_POWER
+
+Distances use an equirectangular projection, exact enough at city scale.
+Each pollutant grid is written as a .npy file in HEATMAP_DIR (next to a
+small JSON metadata file) and atomically swapped in, so every process and
+worker reads the same surface through a read-only memory map instead of
+holding it in memory or recomputing it.
+
+Web map tiles (PNG or JSON) are sampled from the memory map by nearest
+grid cell; only the pages under the requested tile are read. Encoded tiles
+are cached with the grid's computed_at in the key, so a new surface never
+serves old tiles.
+"""
+
+import json
+import math
+import os
+import struct
+import zlib
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import StationRollingWindow
+
+
+TILE_SIZE = 256
+
+# Upper bound of the weights computed at once by `idw` (32 MB of float64)
+IDW_BLOCK_ELEMENTS = 4_000_000
+
+# Metres per degree of latitude (and of longitude at the equator)
+_METRES_PER_DEGREE = 111320.0
+
+# Colour ramp (value / scale -> RGB), scale = alert threshold of the pollutant
+_RAMP_STOPS = np.array([0.0, 0.5, 1.0, 1.5, 2.0])
+_RAMP_COLORS = np.array([
+    [0, 228, 0],
+    [255, 255, 0],
+    [255, 126, 0],
+    [255, 0, 0],
+    [143, 63, 151],
+], dtype=np.float64)
+_ALPHA = 160
+
+
+def _paths(pollutant):
+    directory = Path(settings.HEATMAP_DIR)
+    return directory / f'{pollutant}.npy', directory / f'{pollutant}.json'
+
+
+def latest_readings(pollutant, now=None):
+    """
+    Latest hourly mean of `pollutant` per station, for stations with a
+    reading within AQI_LOOKBACK_HOURS.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]: longitudes, latitudes, values.
+    """
+    since = (now or timezone.now()) - timedelta(hours=settings.AQI_LOOKBACK_HOURS)
+    rows = [
+        (location.x, location.y, value)
+        for location, value in StationRollingWindow.objects.filter(
+            pollutant=pollutant, head__gte=since, avg_1h__isnull=False,
+        ).values_list('station__location', 'avg_1h')
+    ]
+    if not rows:
+        return np.empty(0), np.empty(0), np.empty(0)
+    lons, lats, values = (np.array(column, dtype=np.float64) for column in zip(*rows))
+    return lons, lats, values
+
+
+def grid_axes():
+    """Longitudes of the grid columns and latitudes of its rows (north first)."""
+    west, south, east, north = settings.HEATMAP_BBOX
+    cols, rows = settings.HEATMAP_GRID
+    lons = west + (np.arange(cols) + 0.5) * (east - west) / cols
+    lats = north - (np.arange(rows) + 0.5) * (north - south) / rows
+    return lons, lats
+
+
+def idw(lons, lats, values, grid_lons, grid_lats, power=2.0):
+    """
+    Inverse-distance-weighted surface of the given points.
+
+    The grid is processed in blocks of rows so the cell-to-station weights
+    never take more than about IDW_BLOCK_ELEMENTS float64 values at once,
+    whatever the grid size and number of stations.
+
+    Returns:
+        np.ndarray: float32 grid of shape (len(grid_lats), len(grid_lons)).
+    """
+    scale_x = _METRES_PER_DEGREE * math.cos(math.radians(float(np.mean(grid_lats))))
+    dx = (grid_lons[:, None] - lons[None, :]) * scale_x          # cols x stations
+    dy = (grid_lats[:, None] - lats[None, :]) * _METRES_PER_DEGREE  # rows x stations
+
+    surface = np.empty((grid_lats.size, grid_lons.size), dtype=np.float32)
+    block = max(1, IDW_BLOCK_ELEMENTS // max(grid_lons.size * lons.size, 1))
+    for start in range(0, grid_lats.size, block):
+        weights = np.hypot(dx[None, :, :], dy[start:start + block, None, :])
+        # A cell on top of a station takes its value.
+        np.maximum(weights, 1.0, out=weights)
+        np.power(weights, -power, out=weights)
+        surface[start:start + block] = (weights @ values) / weights.sum(axis=2)
+    return surface
+
+
+def _write(pollutant, surface, meta):
+    npy_path, meta_path = _paths(pollutant)
+    npy_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp = npy_path.with_suffix('.npy.tmp')
+    grid = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=surface.shape)
+    grid[:] = surface
+    grid.flush()
+    del grid
+    os.replace(tmp, npy_path)
+
+    tmp = meta_path.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, meta_path)
+
+
+def refresh(pollutants=None, now=None):
+    """
+    Recompute the surfaces of the given pollutants (all by default).
+
+    Pollutants without recent readings keep their previous surface.
+
+    Returns:
+        list[str]: Pollutants whose surface was written.
+    """
+    now = now or timezone.now()
+    grid_lons, grid_lats = grid_axes()
+    written = []
+    for pollutant in pollutants or settings.ALERT_DEFAULT_THRESHOLDS:
+        lons, lats, values = latest_readings(pollutant, now)
+        if values.size == 0:
+            continue
+        surface = idw(lons, lats, values, grid_lons, grid_lats, settings.HEATMAP_POWER)
+        _write(pollutant, surface, {
+            'pollutant': pollutant,
+            'computed_at': now.isoformat(),
+            'bbox': list(settings.HEATMAP_BBOX),
+            'stations': int(values.size),
+            'min': float(surface.min()),
+            'max': float(surface.max()),
+        })
+        written.append(pollutant)
+    return written
+
+
+def load(pollutant):
+    """
+    Open the current surface of a pollutant.
+
+    Returns:
+        tuple: (read-only memmap, metadata dict), or (None, None) if no
+        surface has been computed yet.
+    """
+    npy_path, meta_path = _paths(pollutant)
+    try:
+        meta = json.loads(meta_path.read_text())
+        grid = np.load(npy_path, mmap_mode='r')
+    except FileNotFoundError:
+        return None, None
+    return grid, meta
+
+
+def tile_bounds(z, x, y):
+    """(west, south, east, north) in degrees of a Web Mercator tile."""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+
+    return x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y)
+
+
+def sample_tile(grid, z, x, y, size):
+    """
+    Sample a size x size tile from the grid (nearest cell).
+
+    Returns:
+        np.ndarray: float32 values, NaN outside the grid bounding box.
+    """
+    n = 2 ** z
+    pixels = (np.arange(size) + 0.5) / size
+    lons = (x + pixels) / n * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + pixels) / n))))
+
+    west, south, east, north = settings.HEATMAP_BBOX
+    rows, cols = grid.shape
+    col = np.floor((lons - west) / (east - west) * cols).astype(np.int64)
+    row = np.floor((north - lats) / (north - south) * rows).astype(np.int64)
+    col_in = (col >= 0) & (col < cols)
+    row_in = (row >= 0) & (row < rows)
+
+    tile = np.full((size, size), np.nan, dtype=np.float32)
+    if col_in.any() and row_in.any():
+        tile[np.ix_(row_in, col_in)] = grid[np.ix_(row[row_in], col[col_in])]
+    return tile
+
+
+def colorize(values, scale):
+    """Map values to RGBA with the colour ramp; NaN becomes transparent."""
+    ratio = np.nan_to_num(values / scale, nan=0.0)
+    rgba = np.zeros(values.shape + (4,), dtype=np.uint8)
+    for channel in range(3):
+        rgba[..., channel] = np.interp(ratio, _RAMP_STOPS, _RAMP_COLORS[:, channel])
+    rgba[..., 3] = np.where(np.isnan(values), 0, _ALPHA)
+    return rgba
+
+
+def encode_png(rgba):
+    """Encode an (h, w, 4) uint8 array as a PNG."""
+    height, width, _ = rgba.shape
+    # Every scanline starts with filter type 0 (None).
+    raw = np.concatenate(
+        [np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)], axis=1
+    ).tobytes()
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack('>I', len(data)) + body + struct.pack('>I', zlib.crc32(body))
+
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)),
+        chunk(b'IDAT', zlib.compress(raw, 6)),
+        chunk(b'IEND', b''),
+    ])
+
+
+def png_tile(pollutant, z, x, y):
+    """
+    PNG tile of a pollutant surface (cached).
+
+    Returns:
+        bytes | None: The PNG, or None if no surface has been computed.
+    """
+    grid, meta = load(pollutant)
+    if grid is None:
+        return None
+    key = f'heatmap:{pollutant}:{meta["computed_at"]}:png:{z}:{x}:{y}'
+    tile = cache.get(key)
+    if tile is None:
+        values = sample_tile(grid, z, x, y, TILE_SIZE)
+        tile = encode_png(colorize(values, settings.ALERT_DEFAULT_THRESHOLDS[pollutant]))
+        cache.set(key, tile, settings.TILE_CACHE_TIMEOUT)
+    return tile
+
+
+def json_tile(pollutant, z, x, y):
+    """
+    Values of a pollutant surface over a tile, HEATMAP_JSON_TILE_SIZE
+    samples per side (cached). Cells outside the bounding box are null.
+
+    Returns:
+        dict | None: The tile, or None if no surface has been computed.
+    """
+    grid, meta = load(pollutant)
+    if grid is None:
+        return None
+    key = f'heatmap:{pollutant}:{meta["computed_at"]}:json:{z}:{x}:{y}'
+    tile = cache.get(key)
+    if tile is None:
+        size = settings.HEATMAP_JSON_TILE_SIZE
+        values = sample_tile(grid, z, x, y, size).astype(np.float64).round(2)
+        tile = {
+            'pollutant': pollutant,
+            'computed_at': meta['computed_at'],
+            'bounds': tile_bounds(z, x, y),
+            'size': size,
+            'values': [
+                [None if math.isnan(v) else v for v in row]
+                for row in values.tolist()
+            ],
+        }
+        cache.set(key, tile, settings.TILE_CACHE_TIMEOUT)
+    return tile
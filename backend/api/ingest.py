@@ -0,0 +1,348 @@
+"""
+Bulk ingestion of device measurements.
+
+Readings arrive as a list of dictionaries (JSON array, NDJSON or CSV, see
+`api.parsers`). They are converted into column arrays and validated with
+NumPy in a single pass, then written with one `COPY ... FROM STDIN` inside a
+transaction instead of one INSERT per row.
+
+Expected row shape:
+
+    {"device": 3, "station": 1, "pollutant": "PM25", "value": 12.4,
+     "recorded_at": "2025-01-01T10:00:00-05:00"}
+
+`station` is optional (it is taken from the device) and `recorded_at`
+defaults to the ingestion time. Timestamps without an offset are UTC.
+"""
+
+import io
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import Device, PollutantType
+from . import partitions, rollups, rolling, alerting, jobs, streams
+
+
+# Readings slightly ahead of the server clock are accepted (device clock skew).
+FUTURE_TOLERANCE = timedelta(minutes=5)
+
+# Maximum number of row errors returned to the client.
+MAX_REPORTED_ERRORS = 100
+
+COPY_SQL = (
+    "COPY api_measurement (device_id, station_id, pollutant, value, recorded_at) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_NAT = np.iinfo(np.int64).min
+
+# Epoch seconds representable as a datetime; anything outside is invalid.
+_MIN_EPOCH_SECONDS = (datetime.min.replace(tzinfo=dt_timezone.utc) - _EPOCH).total_seconds()
+_MAX_EPOCH_SECONDS = (datetime.max.replace(tzinfo=dt_timezone.utc) - _EPOCH).total_seconds()
+
+
+class IngestValidationError(Exception):
+    """
+    Raised when a batch contains invalid readings.
+
+    Attributes:
+        errors (list[dict]): `{"row": index, "errors": [...]}` entries for the
+            first MAX_REPORTED_ERRORS invalid rows.
+        invalid_rows (int): Total number of invalid rows.
+    """
+
+    def __init__(self, message, errors=None, invalid_rows=0):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+        self.invalid_rows = invalid_rows
+
+
+class MeasurementBatch:
+    """
+    Column-oriented, validated batch of readings.
+
+    Attributes:
+        device_ids (np.ndarray[int64])
+        station_ids (np.ndarray[int64])
+        pollutants (np.ndarray[str])
+        values (np.ndarray[float64])
+        recorded_at (np.ndarray[datetime64[us]]): UTC timestamps.
+    """
+
+    def __init__(self, device_ids, station_ids, pollutants, values, recorded_at):
+        self.device_ids = device_ids
+        self.station_ids = station_ids
+        self.pollutants = pollutants
+        self.values = values
+        self.recorded_at = recorded_at
+
+    def __len__(self):
+        return len(self.values)
+
+    def months(self):
+        """Return the distinct months (UTC month starts) spanned by the batch."""
+        return [
+            datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc)
+            for month in np.unique(self.recorded_at.astype('datetime64[M]')).astype(datetime)
+        ]
+
+    def to_csv(self):
+        """Serialize the batch as CSV rows in COPY column order."""
+        timestamps = np.datetime_as_string(self.recorded_at, unit='us', timezone='UTC')
+        buffer = io.StringIO()
+        buffer.writelines(
+            f"{device},{station},{pollutant},{value!r},{ts}\n"
+            for device, station, pollutant, value, ts in zip(
+                self.device_ids.tolist(), self.station_ids.tolist(),
+                self.pollutants.tolist(), self.values.tolist(), timestamps.tolist(),
+            )
+        )
+        buffer.seek(0)
+        return buffer
+
+
+def _column(rows, key):
+    return [row.get(key) if isinstance(row, dict) else None for row in rows]
+
+
+def _to_float_array(values):
+    """
+    Convert a list to float64, mapping missing or unparsable entries to NaN.
+
+    The fast path is a single NumPy conversion; only a batch containing bad
+    entries falls back to element-wise parsing.
+    """
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            try:
+                out[i] = float(value)
+            except (TypeError, ValueError):
+                out[i] = np.nan
+        return out
+
+
+def _to_epoch_us(values, now):
+    """
+    Convert timestamps (ISO 8601 strings, epoch seconds or datetimes) to
+    int64 microseconds since the epoch. Missing values default to `now`;
+    invalid ones, including epoch seconds outside the datetime range, become
+    the NaT sentinel.
+    """
+    now_us = (now - _EPOCH) // timedelta(microseconds=1)
+    out = np.empty(len(values), dtype=np.int64)
+    for i, value in enumerate(values):
+        if value is None:
+            out[i] = now_us
+            continue
+        if isinstance(value, str):
+            # CSV cells are always strings: accept epoch seconds written as text.
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            if np.isfinite(value) and _MIN_EPOCH_SECONDS <= value <= _MAX_EPOCH_SECONDS:
+                out[i] = int(value * 1_000_000)
+            else:
+                out[i] = _NAT
+            continue
+        parsed = value if isinstance(value, datetime) else None
+        if parsed is None and isinstance(value, str):
+            try:
+                parsed = parse_datetime(value.strip())
+            except ValueError:
+                parsed = None
+        if parsed is None:
+            out[i] = _NAT
+            continue
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt_timezone.utc)
+        out[i] = (parsed - _EPOCH) // timedelta(microseconds=1)
+    return out
+
+
+def build_batch(rows, now=None):
+    """
+    Validate raw rows and convert them into a MeasurementBatch.
+
+    All checks are evaluated as boolean masks over whole columns; device to
+    station resolution uses a single query for the distinct device ids.
+
+    Parameters:
+        rows (list[dict]): Parsed request payload.
+        now (datetime): Reference time (defaults to the current time).
+
+    Raises:
+        IngestValidationError: If the batch is empty, too large or contains
+            any invalid row. Nothing is written in that case.
+
+    Returns:
+        MeasurementBatch
+    """
+    if not isinstance(rows, list) or not rows:
+        raise IngestValidationError('A non-empty list of readings is required')
+
+    max_rows = settings.MEASUREMENT_INGEST_MAX_ROWS
+    if len(rows) > max_rows:
+        raise IngestValidationError(f'Batch exceeds the maximum of {max_rows} readings')
+
+    now = now or datetime.now(dt_timezone.utc)
+    size = len(rows)
+    problems = []
+
+    not_object = np.array([not isinstance(row, dict) for row in rows])
+    problems.append((not_object, 'row must be an object'))
+
+    # Devices and stations
+    device_raw = _to_float_array(_column(rows, 'device'))
+    device_bad = ~np.isfinite(device_raw) | (device_raw != np.floor(device_raw)) | (device_raw <= 0)
+    device_ids = np.where(device_bad, 0, device_raw).astype(np.int64)
+    problems.append((device_bad & ~not_object, 'device must be a positive integer id'))
+
+    known_ids, known_stations = np.empty(0, np.int64), np.empty(0, np.int64)
+    requested = np.unique(device_ids[~device_bad])
+    if requested.size:
+        pairs = list(
+            Device.objects.filter(id__in=requested.tolist())
+            .order_by('id')
+            .values_list('id', 'station_id')
+        )
+        if pairs:
+            known_ids, known_stations = (np.array(col, dtype=np.int64) for col in zip(*pairs))
+
+    if known_ids.size:
+        position = np.clip(np.searchsorted(known_ids, device_ids), 0, known_ids.size - 1)
+        device_known = known_ids[position] == device_ids
+        station_ids = np.where(device_known, known_stations[position], 0)
+    else:
+        device_known = np.zeros(size, dtype=bool)
+        station_ids = np.zeros(size, dtype=np.int64)
+    problems.append((~device_bad & ~device_known, 'unknown device'))
+
+    station_raw = _to_float_array(_column(rows, 'station'))
+    station_given = ~np.isnan(station_raw)
+    station_mismatch = station_given & device_known & (station_raw != station_ids)
+    problems.append((station_mismatch, 'device does not belong to station'))
+
+    # Pollutants
+    pollutants = np.array(
+        [str(p).strip().upper() if p is not None else '' for p in _column(rows, 'pollutant')],
+        dtype=object,
+    )
+    pollutant_bad = ~np.isin(pollutants, PollutantType.values)
+    problems.append((pollutant_bad & ~not_object, f'pollutant must be one of {", ".join(PollutantType.values)}'))
+
+    # Values
+    values = _to_float_array(_column(rows, 'value'))
+    problems.append((~np.isfinite(values) & ~not_object, 'value must be a finite number'))
+    problems.append((np.isfinite(values) & (values < 0), 'value must be non-negative'))
+
+    # Timestamps
+    epoch_us = _to_epoch_us(_column(rows, 'recorded_at'), now)
+    ts_bad = epoch_us == _NAT
+    limit_us = (now + FUTURE_TOLERANCE - _EPOCH) // timedelta(microseconds=1)
+    # Older months are (or will be) detached, see api.partitions
+    cutoff_us = (partitions.retention_cutoff(now=now) - _EPOCH) // timedelta(microseconds=1)
+    problems.append((ts_bad & ~not_object, 'recorded_at must be an ISO 8601 datetime or epoch seconds'))
+    problems.append((~ts_bad & (epoch_us > limit_us), 'recorded_at is in the future'))
+    problems.append((~ts_bad & (epoch_us < cutoff_us), 'recorded_at is older than the retention window'))
+
+    # Same device, pollutant and timestamp as an earlier row of the batch
+    _, pollutant_codes = np.unique(pollutants.astype(str), return_inverse=True)
+    order = np.lexsort((np.arange(size), epoch_us, pollutant_codes, device_ids))
+    repeated = np.zeros(size, dtype=bool)
+    repeated[order[1:]] = (
+        (device_ids[order[1:]] == device_ids[order[:-1]])
+        & (pollutant_codes[order[1:]] == pollutant_codes[order[:-1]])
+        & (epoch_us[order[1:]] == epoch_us[order[:-1]])
+    )
+    problems.append((repeated & ~device_bad & ~ts_bad, 'duplicate reading in batch'))
+
+    invalid = np.zeros(size, dtype=bool)
+    for mask, _ in problems:
+        invalid |= mask
+
+    if invalid.any():
+        reported = np.flatnonzero(invalid)[:MAX_REPORTED_ERRORS]
+        errors = [
+            {'row': int(i), 'errors': [message for mask, message in problems if mask[i]]}
+            for i in reported
+        ]
+        raise IngestValidationError(
+            'Invalid readings', errors=errors, invalid_rows=int(invalid.sum())
+        )
+
+    return MeasurementBatch(
+        device_ids=device_ids,
+        station_ids=station_ids.astype(np.int64),
+        pollutants=pollutants.astype(str),
+        values=values,
+        recorded_at=epoch_us.astype('datetime64[us]'),
+    )
+
+
+def copy_measurements(batch):
+    """
+    Write a validated batch with a single COPY inside a transaction.
+
+    Missing monthly partitions are created first (outside the transaction,
+    so a failed COPY does not roll back partition DDL).
+
+    Raises:
+        IngestValidationError: If a reading falls in an expired or detached
+            month. Nothing is written in that case.
+
+    Returns:
+        int: Number of rows written.
+    """
+    try:
+        partitions.ensure_partitions_for(batch.months())
+    except partitions.PartitionUnavailable as exc:
+        raise IngestValidationError(str(exc))
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.copy_expert(COPY_SQL, batch.to_csv())
+        # Live readings (see api/streams.py), delivered when the COPY commits
+        streams.publish_readings(batch)
+    return len(batch)
+
+
+def process_batch(batch):
+    """
+    Update the data derived from a stored batch.
+
+    Runs after the COPY has committed so every step sees the new rows:
+    - hourly/daily rollups for the buckets the batch touched
+    - rolling 1h/8h/24h windows of the pairs the batch touched
+    - threshold alerts for new breaches
+
+    The network-wide recomputations (current AQI, heatmap surfaces) are
+    queued as background jobs (see api/jobs.py); a burst of batches
+    coalesces into one pending job of each kind.
+    """
+    rollups.refresh_for_batch(batch)
+    rolling.update_for_batch(batch)
+    alerting.process_batch(batch)
+    jobs.enqueue('aqi.refresh', priority=10, unique_key='aqi.refresh')
+    jobs.enqueue('heatmap.refresh', unique_key='heatmap.refresh')
+
+
+def ingest(rows, now=None):
+    """
+    Validate and store a batch of raw readings, then update derived data.
+
+    Returns:
+        MeasurementBatch: The stored batch.
+    """
+    batch = build_batch(rows, now=now)
+    copy_measurements(batch)
+    process_batch(batch)
+    return batch
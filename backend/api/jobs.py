@@ -0,0 +1,173 @@
+"""
+Background jobs on a PostgreSQL table.
+
+Producers call `enqueue` (inside their own transaction, so a job only
+becomes visible if the work that created it commits). Workers started with
+`manage.py run_workers` loop over `run_next`:
+
+1. claim: the next runnable job is selected with
+   `FOR UPDATE SKIP LOCKED` (highest priority first, then oldest run_at),
+   marked running and committed, so concurrent workers never pick the same
+   row and never wait on each other;
+2. run: the registered handler is called with the payload as keyword
+   arguments, outside any lock;
+3. finish: the job is marked done with the handler's return value, or on
+   error rescheduled with exponential backoff until `max_attempts`, then
+   marked failed.
+
+Jobs left running by a worker that died are claimed again once their lock
+is older than JOB_LOCK_TIMEOUT_SECONDS.
+
+Handlers are registered with the `task` decorator (see api/tasks.py) and
+must be idempotent: a job can run more than once if a worker dies after
+the handler finished but before the job was marked done.
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job, JobStatus
+
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(name):
+    """Register the decorated function as the handler of jobs called `name`."""
+    def register(func):
+        _registry[name] = func
+        return func
+    return register
+
+
+def handler(name):
+    """Return the handler registered for `name`."""
+    # Handlers live in api.tasks; importing it registers them.
+    from . import tasks  # noqa: F401
+    return _registry[name]
+
+
+def enqueue(name, payload=None, priority=0, run_at=None, unique_key=None, max_attempts=None):
+    """
+    Create a job.
+
+    With JOBS_ASYNC disabled (tests, local scripts) the handler runs
+    immediately instead, once the current transaction commits.
+
+    Parameters:
+        unique_key (str): Coalesce with a pending job holding the same key;
+            no new job is created if one exists.
+
+    Returns:
+        Job | None: The created job, or None when it was coalesced or run
+        synchronously.
+    """
+    payload = payload or {}
+    if not settings.JOBS_ASYNC:
+        transaction.on_commit(lambda: handler(name)(**payload))
+        return None
+
+    job = Job(
+        name=name,
+        payload=payload,
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        unique_key=unique_key,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+    try:
+        # Savepoint: a duplicate unique_key must not break the caller's transaction.
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        if unique_key is None:
+            raise
+        return None
+    return job
+
+
+def claim(worker):
+    """
+    Lock the next runnable job for `worker`.
+
+    Returns:
+        Job | None: The claimed job (status running), or None if the queue
+        is empty.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=JobStatus.PENDING, run_at__lte=now)
+                | Q(status=JobStatus.RUNNING, locked_at__lt=stale)
+            )
+            .order_by('-priority', 'run_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = JobStatus.RUNNING
+        job.locked_at = now
+        job.locked_by = worker
+        job.attempts += 1
+        job.save(update_fields=['status', 'locked_at', 'locked_by', 'attempts'])
+    return job
+
+
+def run(job):
+    """Run a claimed job and record its outcome."""
+    try:
+        result = handler(job.name)(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            backoff = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+            job.status = JobStatus.PENDING
+            job.run_at = timezone.now() + timedelta(seconds=backoff)
+        else:
+            job.status = JobStatus.FAILED
+            job.finished_at = timezone.now()
+        logger.exception('Job %s (%s) failed, attempt %s', job.id, job.name, job.attempts)
+    else:
+        job.status = JobStatus.DONE
+        job.result = result
+        job.finished_at = timezone.now()
+        job.last_error = ''
+
+    job.locked_at = None
+    job.save(update_fields=['status', 'run_at', 'result', 'last_error', 'finished_at', 'locked_at'])
+    return job
+
+
+def run_next(worker):
+    """
+    Claim and run one job.
+
+    Returns:
+        bool: False if there was nothing to run.
+    """
+    job = claim(worker)
+    if job is None:
+        return False
+    run(job)
+    return True
+
+
+def purge(older_than_days=None):
+    """Delete finished jobs older than JOB_RETENTION_DAYS. Returns the count."""
+    days = older_than_days if older_than_days is not None else settings.JOB_RETENTION_DAYS
+    deleted, _ = Job.objects.filter(
+        status__in=[JobStatus.DONE, JobStatus.FAILED],
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
@@ -0,0 +1,207 @@
+"""
+Management command that compares the throughput of the sync (WSGI) and
+async (ASGI, api/async_views.py) read endpoints under concurrent clients.
+
+Both servers must be running against the same database, e.g. with
+infra/docker-compose.yml (`docker compose --profile benchmark up`): the
+ASGI backend on port 8000 and the WSGI backend on port 8001. Then:
+
+    python manage.py benchmark_read_path --clients 100 500 1000 --duration 20
+
+Every client holds one keep-alive connection and sends GET requests back to
+back for `--duration` seconds after a short warm-up. Requests are
+authenticated with an access token minted for `--email` (default: the first
+admin). Responses of the list endpoints are cached (api.caching); use
+--bypass-cache to make every request miss it (adds a unique query
+parameter, so it also fills the cache with throwaway entries until they
+expire).
+
+Raise the open-files limit (`ulimit -n 4096`) before running 1000 clients.
+"""
+
+import asyncio
+import statistics
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import User, Station
+
+
+# endpoint -> (sync path, async path)
+ENDPOINTS = {
+    'stations': ('/api/stations/', '/api/async/stations/'),
+    'nearby': (
+        '/api/stations/nearby/?lat=3.45&lon=-76.53&k=10',
+        '/api/async/stations/nearby/?lat=3.45&lon=-76.53&k=10',
+    ),
+    'series': (
+        '/api/stations/{station}/series/?pollutant=PM25&bucket=1h',
+        '/api/async/stations/{station}/series/?pollutant=PM25&bucket=1h',
+    ),
+    'alerts': ('/api/alerts/', '/api/async/alerts/'),
+    'health': ('/health/', '/api/async/health/'),
+}
+
+REQUEST_TIMEOUT = 30
+
+
+async def _read_response(reader):
+    """Read one HTTP/1.1 response; returns (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('Connection closed')
+    status = int(status_line.split()[1])
+
+    length, chunked = None, False
+    keep_alive = status_line.startswith(b'HTTP/1.1')
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == 'content-length':
+            length = int(value)
+        elif name == 'transfer-encoding':
+            chunked = 'chunked' in value
+        elif name == 'connection':
+            keep_alive = value == 'keep-alive' or (keep_alive and value != 'close')
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()
+        keep_alive = False
+    return status, keep_alive
+
+
+class _Stats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+
+
+async def _client(number, url, path, token, deadline, record_after, stats, bypass_cache):
+    host, port = url.hostname, url.port or 80
+    loop = asyncio.get_running_loop()
+    reader = writer = None
+    sent = 0
+    while loop.time() < deadline:
+        target = path
+        if bypass_cache:
+            separator = '&' if '?' in path else '?'
+            target = f'{path}{separator}_bench={number}-{sent}'
+        sent += 1
+        request = (
+            f'GET {target} HTTP/1.1\r\nHost: {url.netloc}\r\n'
+            f'Authorization: Bearer {token}\r\nAccept: application/json\r\n\r\n'
+        ).encode()
+
+        started = loop.time()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), REQUEST_TIMEOUT)
+            writer.write(request)
+            status, keep_alive = await asyncio.wait_for(_read_response(reader), REQUEST_TIMEOUT)
+        except (OSError, ValueError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError):
+            if started >= record_after:
+                stats.errors += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.1)
+            continue
+
+        if started >= record_after:
+            if status == 200:
+                stats.latencies.append(loop.time() - started)
+            else:
+                stats.errors += 1
+        if not keep_alive:
+            writer.close()
+            reader = writer = None
+
+    if writer is not None:
+        writer.close()
+
+
+async def _run(url, path, token, clients, duration, warmup, bypass_cache):
+    loop = asyncio.get_running_loop()
+    stats = _Stats()
+    record_after = loop.time() + warmup
+    deadline = record_after + duration
+    await asyncio.gather(*[
+        _client(number, url, path, token, deadline, record_after, stats, bypass_cache)
+        for number in range(clients)
+    ])
+    return stats
+
+
+def _percentile(values, q):
+    if len(values) < 2:
+        return values[0] if values else 0
+    return statistics.quantiles(values, n=100, method='inclusive')[q - 1]
+
+
+class Command(BaseCommand):
+    help = "Benchmark the sync (WSGI) and async (ASGI) read endpoints at several concurrency levels."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', default='http://localhost:8001', help='Base URL of the WSGI server.')
+        parser.add_argument('--async-url', default='http://localhost:8000', help='Base URL of the ASGI server.')
+        parser.add_argument(
+            '--clients', type=int, nargs='+', default=[100, 500, 1000],
+            help='Concurrent clients per run.',
+        )
+        parser.add_argument('--duration', type=float, default=20, help='Measured seconds per run.')
+        parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before each run.')
+        parser.add_argument(
+            '--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS),
+            help='Endpoints to benchmark.',
+        )
+        parser.add_argument('--email', help='User the requests authenticate as (default: the first admin).')
+        parser.add_argument('--station', type=int, help='Station of the series endpoint (default: the first one).')
+        parser.add_argument('--bypass-cache', action='store_true', help='Make every request miss the response cache.')
+
+    def handle(self, *args, **options):
+        if options['email']:
+            user = User.objects.filter(email=options['email']).first()
+        else:
+            user = User.objects.filter(admin_profile__isnull=False).order_by('id').first()
+        if user is None:
+            raise CommandError("No user to authenticate as; pass --email")
+        token = str(RefreshToken.for_user(user).access_token)
+
+        station = options['station'] or Station.objects.order_by('id').values_list('id', flat=True).first()
+        if station is None and 'series' in options['endpoints']:
+            raise CommandError("No station for the series endpoint; pass --station")
+
+        servers = {'sync': urlsplit(options['sync_url']), 'async': urlsplit(options['async_url'])}
+        header = f"{'endpoint':<10}{'clients':>8}  {'path':<6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        for clients in options['clients']:
+            for endpoint in options['endpoints']:
+                for mode, path in zip(('sync', 'async'), ENDPOINTS[endpoint]):
+                    stats = asyncio.run(_run(
+                        servers[mode], path.format(station=station), token, clients,
+                        options['duration'], options['warmup'], options['bypass_cache'],
+                    ))
+                    latencies = [seconds * 1000 for seconds in stats.latencies]
+                    self.stdout.write(
+                        f"{endpoint:<10}{clients:>8}  {mode:<6}"
+                        f"{len(latencies) / options['duration']:>10.1f}"
+                        f"{_percentile(latencies, 50):>10.1f}"
+                        f"{_percentile(latencies, 95):>10.1f}"
+                        f"{_percentile(latencies, 99):>10.1f}"
+                        f"{stats.errors:>8}"
+                    )
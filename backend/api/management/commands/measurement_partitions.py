@@ -0,0 +1,53 @@
+"""
+Management command to maintain the monthly Measurement partitions.
+
+Creates the partitions for the coming months and detaches those that fall
+outside the retention window. Intended to run daily (cron or scheduler):
+
+    python manage.py measurement_partitions
+    python manage.py measurement_partitions --ahead 6 --retain 12 --drop
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api import partitions
+
+
+class Command(BaseCommand):
+    help = "Create upcoming Measurement partitions and detach expired ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=settings.MEASUREMENT_PARTITION_MONTHS_AHEAD,
+            help='Number of future months to pre-create (default from settings).',
+        )
+        parser.add_argument(
+            '--back', type=int, default=0,
+            help='Number of past months to create, useful before a backfill.',
+        )
+        parser.add_argument(
+            '--retain', type=int, default=settings.MEASUREMENT_RETENTION_MONTHS,
+            help='Number of past months to keep attached (default from settings).',
+        )
+        parser.add_argument(
+            '--drop', action='store_true',
+            help='Drop detached partitions instead of keeping them for archiving.',
+        )
+
+    def handle(self, *args, **options):
+        created = partitions.ensure_partitions(
+            months_ahead=options['ahead'],
+            months_back=options['back'],
+        )
+        self.stdout.write(f"Partitions ensured: {', '.join(created)}")
+
+        detached = partitions.detach_expired_partitions(
+            retain_months=options['retain'],
+            drop=options['drop'],
+        )
+        if detached:
+            action = 'Dropped' if options['drop'] else 'Detached'
+            self.stdout.write(self.style.WARNING(f"{action}: {', '.join(detached)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No expired partitions"))
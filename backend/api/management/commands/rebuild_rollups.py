@@ -0,0 +1,49 @@
+"""
+Management command to recompute measurement rollups for a time range.
+
+Ingestion keeps rollups current incrementally; this command is for
+backfills, bulk imports that bypass the ingest endpoint, and repairs. The
+rolling 1h/8h/24h windows are reseeded from the rebuilt hourly rollups and
+the heatmap surfaces recomputed from them. The range is widened to whole
+UTC hours:
+
+    python manage.py rebuild_rollups --start 2025-01-01 --end 2025-02-01
+"""
+
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date, parse_datetime
+
+from api import rollups, rolling, heatmap
+
+
+def _parse_bound(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Invalid date or datetime: {value}")
+        parsed = datetime.combine(day, time.min)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_timezone.utc)
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Recompute hourly and daily measurement rollups for [start, end)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='Start date/datetime (inclusive, UTC if naive).')
+        parser.add_argument('--end', required=True, help='End date/datetime (exclusive, UTC if naive).')
+
+    def handle(self, *args, **options):
+        start = _parse_bound(options['start'])
+        end = _parse_bound(options['end'])
+        if end <= start:
+            raise CommandError("--end must be after --start")
+
+        start, end = rollups.rebuild(start, end)
+        rolling.rebuild()
+        heatmap.refresh()
+        self.stdout.write(self.style.SUCCESS(f"Rollups rebuilt for {start} -> {end}"))
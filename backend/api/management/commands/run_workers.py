@@ -0,0 +1,72 @@
+"""
+Management command that runs background job workers (see api/jobs.py).
+
+Each worker is a thread with its own database connection that claims jobs
+with SELECT ... FOR UPDATE SKIP LOCKED, so several commands (containers)
+can run side by side:
+
+    python manage.py run_workers --concurrency 4
+
+SIGINT/SIGTERM stop claiming new jobs; running jobs are finished first.
+"""
+
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from api import jobs
+
+
+class Command(BaseCommand):
+    help = "Run background job workers backed by the api_job table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1, help='Number of worker threads.')
+        parser.add_argument(
+            '--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL_SECONDS,
+            help='Seconds to wait when the queue is empty.',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Exit once the queue is empty instead of polling.',
+        )
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        if concurrency < 1:
+            raise CommandError("--concurrency must be at least 1")
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Starting {concurrency} worker(s) as {prefix}")
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [
+                pool.submit(self._work, f"{prefix}:{i}", stop, options['poll_interval'], options['burst'])
+                for i in range(concurrency)
+            ]
+            processed = sum(future.result() for future in futures)
+        self.stdout.write(self.style.SUCCESS(f"Workers stopped after {processed} job(s)"))
+
+    def _work(self, worker, stop, poll_interval, burst):
+        processed = 0
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                if jobs.run_next(worker):
+                    processed += 1
+                elif burst:
+                    break
+                else:
+                    stop.wait(poll_interval)
+        finally:
+            connection.close()
+        return processed
@@ -0,0 +1,140 @@
+"""
+Creates the partitioned Measurement table.
+
+Django cannot declare partitioned tables, so the database side is written in
+SQL while the model state is registered through SeparateDatabaseAndState:
+
+1. `api_measurement` is created with `PARTITION BY RANGE (recorded_at)` and a
+   composite primary key (id, recorded_at), as required by PostgreSQL for
+   partitioned tables.
+2. Foreign keys to devices and stations cascade in the database, so deleting
+   a station never loads its readings into Python.
+3. Indexes are declared on the parent and inherited by every partition.
+4. Partitions for the previous, current and next three months are created;
+   later months are handled by `manage.py measurement_partitions`.
+"""
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+# -----------------------------
+# SQL: Partitioned parent table
+# -----------------------------
+SQL_CREATE_MEASUREMENT = """
+CREATE TABLE IF NOT EXISTS api_measurement (
+    id bigserial NOT NULL,
+    device_id bigint NOT NULL REFERENCES api_device(id) ON DELETE CASCADE,
+    station_id bigint NOT NULL REFERENCES api_station(id) ON DELETE CASCADE,
+    pollutant varchar(10) NOT NULL,
+    value double precision NOT NULL,
+    recorded_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (id, recorded_at)
+) PARTITION BY RANGE (recorded_at);
+
+CREATE INDEX IF NOT EXISTS measurement_station_poll_ts
+    ON api_measurement (station_id, pollutant, recorded_at);
+CREATE INDEX IF NOT EXISTS measurement_device_ts
+    ON api_measurement (device_id, recorded_at);
+"""
+
+# -----------------------------
+# SQL: Initial monthly partitions
+# -----------------------------
+SQL_CREATE_INITIAL_PARTITIONS = """
+DO $$
+DECLARE
+    month_start timestamptz := date_trunc('month', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC' - interval '1 month';
+BEGIN
+    FOR i IN 0..4 LOOP
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF api_measurement FOR VALUES FROM (%L) TO (%L)',
+            'api_measurement_p' || to_char(month_start AT TIME ZONE 'UTC', 'YYYY_MM'),
+            month_start,
+            month_start + interval '1 month'
+        );
+        month_start := month_start + interval '1 month';
+    END LOOP;
+END$$;
+"""
+
+SQL_DROP_MEASUREMENT = "DROP TABLE IF EXISTS api_measurement CASCADE;"
+
+
+class Migration(migrations.Migration):
+    """
+    Adds the Measurement model backed by a monthly range-partitioned table.
+    """
+
+    dependencies = [
+        ("api", "0002_alter_admin_id_alter_admin_user_alter_alert_id_and_more"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(SQL_CREATE_MEASUREMENT, reverse_sql=SQL_DROP_MEASUREMENT),
+                migrations.RunSQL(SQL_CREATE_INITIAL_PARTITIONS, reverse_sql=migrations.RunSQL.noop),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name="Measurement",
+                    fields=[
+                        (
+                            "id",
+                            models.BigAutoField(
+                                auto_created=True,
+                                primary_key=True,
+                                serialize=False,
+                                verbose_name="ID",
+                            ),
+                        ),
+                        (
+                            "pollutant",
+                            models.CharField(
+                                choices=[
+                                    ("PM25", "PM25"),
+                                    ("PM10", "PM10"),
+                                    ("NO2", "NO2"),
+                                    ("O3", "O3"),
+                                    ("SO2", "SO2"),
+                                    ("CO", "CO"),
+                                ],
+                                max_length=10,
+                            ),
+                        ),
+                        ("value", models.FloatField()),
+                        ("recorded_at", models.DateTimeField(default=django.utils.timezone.now)),
+                        (
+                            "device",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="measurements",
+                                to="api.device",
+                            ),
+                        ),
+                        (
+                            "station",
+                            models.ForeignKey(
+                                on_delete=django.db.models.deletion.DO_NOTHING,
+                                related_name="measurements",
+                                to="api.station",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "indexes": [
+                            models.Index(
+                                fields=["station", "pollutant", "recorded_at"],
+                                name="measurement_station_poll_ts",
+                            ),
+                            models.Index(
+                                fields=["device", "recorded_at"],
+                                name="measurement_device_ts",
+                            ),
+                        ],
+                    },
+                ),
+            ],
+        ),
+    ]
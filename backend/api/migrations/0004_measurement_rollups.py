@@ -0,0 +1,80 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+POLLUTANT_CHOICES = [
+    ("PM25", "PM25"),
+    ("PM10", "PM10"),
+    ("NO2", "NO2"),
+    ("O3", "O3"),
+    ("SO2", "SO2"),
+    ("CO", "CO"),
+]
+
+
+def rollup_fields():
+    """Column definitions shared by the hourly and daily rollup tables."""
+    return [
+        (
+            "id",
+            models.BigAutoField(
+                auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+            ),
+        ),
+        ("pollutant", models.CharField(choices=POLLUTANT_CHOICES, max_length=10)),
+        ("bucket", models.DateTimeField()),
+        ("count", models.IntegerField()),
+        ("min", models.FloatField()),
+        ("max", models.FloatField()),
+        ("mean", models.FloatField()),
+        ("sum", models.FloatField()),
+        (
+            "station",
+            models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="api.station",
+            ),
+        ),
+    ]
+
+
+class Migration(migrations.Migration):
+    """
+    Creates the hourly and daily measurement rollup tables.
+
+    Each table is keyed by (station, pollutant, bucket); the unique
+    constraint doubles as the index used by series queries and as the
+    conflict target for incremental upserts.
+    """
+
+    dependencies = [
+        ("api", "0003_measurement"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MeasurementHourly",
+            fields=rollup_fields(),
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("station", "pollutant", "bucket"),
+                        name="measurement_hourly_key",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="MeasurementDaily",
+            fields=rollup_fields(),
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("station", "pollutant", "bucket"),
+                        name="measurement_daily_key",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Creates StationAQI, the current air quality index per station and
+    breakpoint standard, maintained by api.aqi on every ingest cycle.
+    """
+
+    dependencies = [
+        ("api", "0004_measurement_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StationAQI",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "standard",
+                    models.CharField(
+                        choices=[
+                            ("colombia", "Resolución 2254/2017 (Colombia)"),
+                            ("us_epa", "US EPA"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                ("aqi", models.IntegerField()),
+                ("category", models.CharField(max_length=64)),
+                (
+                    "dominant_pollutant",
+                    models.CharField(
+                        choices=[
+                            ("PM25", "PM25"),
+                            ("PM10", "PM10"),
+                            ("NO2", "NO2"),
+                            ("O3", "O3"),
+                            ("SO2", "SO2"),
+                            ("CO", "CO"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("sub_indices", models.JSONField(default=dict)),
+                ("computed_at", models.DateTimeField()),
+                (
+                    "station",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="aqi_values",
+                        to="api.station",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("station", "standard"), name="station_aqi_key"
+                    )
+                ],
+            },
+        ),
+    ]
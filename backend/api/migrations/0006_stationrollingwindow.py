@@ -0,0 +1,78 @@
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Creates StationRollingWindow, the persisted ring buffer and running sums
+    behind the rolling 1h/8h/24h averages maintained by api.rolling.
+    """
+
+    dependencies = [
+        ("api", "0005_stationaqi"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StationRollingWindow",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "pollutant",
+                    models.CharField(
+                        choices=[
+                            ("PM25", "PM25"),
+                            ("PM10", "PM10"),
+                            ("NO2", "NO2"),
+                            ("O3", "O3"),
+                            ("SO2", "SO2"),
+                            ("CO", "CO"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("head", models.DateTimeField()),
+                (
+                    "slot_sums",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.FloatField(), size=24
+                    ),
+                ),
+                (
+                    "slot_counts",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.IntegerField(), size=24
+                    ),
+                ),
+                ("sum_8h", models.FloatField(default=0)),
+                ("hours_8h", models.IntegerField(default=0)),
+                ("sum_24h", models.FloatField(default=0)),
+                ("hours_24h", models.IntegerField(default=0)),
+                ("avg_1h", models.FloatField(blank=True, null=True)),
+                ("avg_8h", models.FloatField(blank=True, null=True)),
+                ("avg_24h", models.FloatField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "station",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rolling_windows",
+                        to="api.station",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("station", "pollutant"), name="station_rolling_key"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Creates AlertThreshold, the per-pollutant (and optionally per-station)
+    levels evaluated by api.alerting on every ingested batch.
+    """
+
+    dependencies = [
+        ("api", "0006_stationrollingwindow"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AlertThreshold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "pollutant",
+                    models.CharField(
+                        choices=[
+                            ("PM25", "PM25"),
+                            ("PM10", "PM10"),
+                            ("NO2", "NO2"),
+                            ("O3", "O3"),
+                            ("SO2", "SO2"),
+                            ("CO", "CO"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("level", models.FloatField()),
+                ("clear_level", models.FloatField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "station",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alert_thresholds",
+                        to="api.station",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("station", "pollutant"), name="alert_threshold_station_key"
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("station__isnull", True)),
+                        fields=("pollutant",),
+                        name="alert_threshold_default_key",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes backing keyset pagination of alerts and alert pollutants on
+    (alert_date, id) and (recorded_at, id).
+    """
+
+    dependencies = [
+        ("api", "0007_alertthreshold"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(fields=["alert_date", "id"], name="alert_date_id"),
+        ),
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                fields=["station", "alert_date", "id"], name="alert_station_date_id"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="alertpollutant",
+            index=models.Index(fields=["recorded_at", "id"], name="alert_pollutant_ts_id"),
+        ),
+    ]
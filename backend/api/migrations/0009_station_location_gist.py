@@ -0,0 +1,49 @@
+import django.contrib.gis.db.models.fields
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Replaces the implicit spatial index on Station.location with an explicit,
+    named GiST index (station_location_gist) used for KNN ordering.
+
+    The schema editor cannot drop the implicit index when `spatial_index`
+    changes, so the database side is done in SQL.
+    """
+
+    dependencies = [
+        ("api", "0008_alert_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="station",
+                    name="location",
+                    field=django.contrib.gis.db.models.fields.PointField(
+                        geography=True, spatial_index=False, srid=4326
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="station",
+                    index=django.contrib.postgres.indexes.GistIndex(
+                        fields=["location"], name="station_location_gist"
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    sql="DROP INDEX IF EXISTS api_station_location_id",
+                    reverse_sql="CREATE INDEX IF NOT EXISTS api_station_location_id "
+                                "ON api_station USING GIST (location)",
+                ),
+                migrations.RunSQL(
+                    sql="CREATE INDEX IF NOT EXISTS station_location_gist "
+                        "ON api_station USING GIST (location)",
+                    reverse_sql="DROP INDEX IF EXISTS station_location_gist",
+                ),
+            ],
+        ),
+    ]
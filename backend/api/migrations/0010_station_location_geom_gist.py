@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    GiST index on the geometry cast of Station.location.
+
+    Vector tiles select stations with a planar bounding-box test
+    (`location::geometry && envelope`, see api/tiles.py) because a tile
+    envelope spanning the antimeridian is not a valid geography polygon.
+    The expression cannot be declared on the model, so only the database
+    is changed.
+    """
+
+    dependencies = [
+        ("api", "0009_station_location_gist"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS station_location_geom_gist "
+                "ON api_station USING GIST ((location::geometry))",
+            reverse_sql="DROP INDEX IF EXISTS station_location_geom_gist",
+        ),
+    ]
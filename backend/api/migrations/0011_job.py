@@ -0,0 +1,75 @@
+from django.db import migrations, models
+import django.db.models.expressions
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    """
+    Creates Job, the PostgreSQL-backed background job queue consumed by
+    `manage.py run_workers` (see api/jobs.py).
+    """
+
+    dependencies = [
+        ("api", "0010_station_location_geom_gist"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Done"),
+                            ("failed", "Failed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("priority", models.SmallIntegerField(default=0)),
+                ("unique_key", models.CharField(blank=True, max_length=200, null=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("max_attempts", models.PositiveSmallIntegerField(default=3)),
+                ("run_at", models.DateTimeField(default=django.utils.timezone.now)),
+                ("locked_at", models.DateTimeField(blank=True, null=True)),
+                ("locked_by", models.CharField(blank=True, max_length=100)),
+                ("last_error", models.TextField(blank=True)),
+                ("result", models.JSONField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        django.db.models.expressions.OrderBy(
+                            django.db.models.expressions.F("priority"), descending=True
+                        ),
+                        models.F("run_at"),
+                        models.F("id"),
+                        condition=models.Q(("status", "pending")),
+                        name="job_pending_claim",
+                    ),
+                    models.Index(fields=["status", "locked_at"], name="job_status_locked"),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("status", "pending")),
+                        fields=("unique_key",),
+                        name="job_pending_unique_key",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes backing the dashboard summary (see api/dashboard.py): unattended
+    alerts per station and hourly rollups by bucket.
+    """
+
+    dependencies = [
+        ("api", "0011_job"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="alert",
+            index=models.Index(
+                condition=models.Q(attended=False),
+                fields=["station"],
+                name="alert_unattended_station",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="measurementhourly",
+            index=models.Index(fields=["bucket"], name="measurement_hourly_bucket"),
+        ),
+    ]
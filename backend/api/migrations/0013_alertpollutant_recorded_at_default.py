@@ -0,0 +1,21 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    """
+    AlertPollutant.recorded_at defaults to the current time instead of being
+    forced to it, so the alert engine can store the time of the peak reading.
+    """
+
+    dependencies = [
+        ("api", "0012_dashboard_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="alertpollutant",
+            name="recorded_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
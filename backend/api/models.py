@@ -1,5 +1,10 @@
 from django.contrib.gis.db import models as geomodels
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GistIndex
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 
 
@@ -57,6 +62,22 @@ class UserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 
+def related_count(model, field):
+    """
+    Correlated subquery counting the `model` rows whose `field` points to the
+    outer row. Unlike Count() over a join, several of these can be combined in
+    one query without multiplying rows.
+    """
+    rows = (
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by()
+        .values(field)
+        .annotate(total=Count('*'))
+        .values('total')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
 class PollutantType(models.TextChoices):
     """Enumeration of pollutant types."""
     PM25 = 'PM25', 'PM25'
@@ -67,6 +88,12 @@ class PollutantType(models.TextChoices):
     CO   = 'CO',   'CO'
 
 
+class AQIStandard(models.TextChoices):
+    """Enumeration of supported air quality index breakpoint tables."""
+    COLOMBIA = 'colombia', 'Resolución 2254/2017 (Colombia)'
+    US_EPA   = 'us_epa',   'US EPA'
+
+
 class DeviceType(models.TextChoices):
     """Enumeration of device types."""
     SENSOR = 'SENSOR', 'SENSOR'
@@ -178,6 +205,14 @@ class AuthUser(models.Model):
         return f"AuthUser {self.user.email}"
 
 
+class InstitutionQuerySet(models.QuerySet):
+    """QuerySet helpers for Institution."""
+
+    def with_counts(self):
+        """Annotate `stations_count` without a query per institution."""
+        return self.annotate(stations_count=related_count(Station, 'institution'))
+
+
 class Institution(models.Model):
     """
     Model representing an institution that manages stations.
@@ -189,10 +224,23 @@ class Institution(models.Model):
     admin = models.ForeignKey(Admin, on_delete=models.RESTRICT, related_name='institutions')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = InstitutionQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
 
+class StationQuerySet(models.QuerySet):
+    """QuerySet helpers for Station."""
+
+    def with_counts(self):
+        """Annotate `devices_count` and `alerts_count` without a query per station."""
+        return self.annotate(
+            devices_count=related_count(Device, 'station'),
+            alerts_count=related_count(Alert, 'station'),
+        )
+
+
 class Station(models.Model):
     """
     Represents a monitoring station with geospatial location,
@@ -216,12 +264,20 @@ class Station(models.Model):
         blank=True,
         related_name='stations'
     )
-    location = geomodels.PointField(geography=True, srid=4326)
+    # Indexed explicitly in Meta (GiST, used for KNN ordering in api.spatial)
+    location = geomodels.PointField(geography=True, srid=4326, spatial_index=False)
     installed_at = models.DateField(blank=True, null=True)
     status = models.CharField(max_length=32, default='inactive')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GistIndex(fields=['location'], name='station_location_gist'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -254,6 +310,18 @@ class Alert(models.Model):
     station = models.ForeignKey(Station, on_delete=models.CASCADE, related_name='alerts')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination key (see api.pagination.KeysetPagination)
+            models.Index(fields=['alert_date', 'id'], name='alert_date_id'),
+            models.Index(fields=['station', 'alert_date', 'id'], name='alert_station_date_id'),
+            # Unattended alerts per station (see api.dashboard)
+            models.Index(
+                fields=['station'], name='alert_unattended_station',
+                condition=models.Q(attended=False),
+            ),
+        ]
+
     def __str__(self):
         return f"Alert {self.id} @ {self.station.name} - {self.alert_date}"
 
@@ -266,12 +334,59 @@ class AlertPollutant(models.Model):
     alert = models.ForeignKey(Alert, on_delete=models.CASCADE, related_name='pollutants')
     pollutant = models.CharField(max_length=10, choices=PollutantType.choices)
     level = models.FloatField()
-    recorded_at = models.DateTimeField(auto_now_add=True)
+    # Time of the reading (the alert engine sets the peak reading's time)
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination key (see api.pagination.KeysetPagination)
+            models.Index(fields=['recorded_at', 'id'], name='alert_pollutant_ts_id'),
+        ]
 
     def __str__(self):
         return f"{self.pollutant}: {self.level} ({self.alert_id})"
 
 
+class AlertThreshold(models.Model):
+    """
+    Level at which readings of a pollutant raise an alert.
+
+    A row without station is the network-wide default for the pollutant and
+    station rows override it; settings.ALERT_DEFAULT_THRESHOLDS applies when
+    neither exists. After an alert, readings must fall below `clear_level`
+    (default: level * ALERT_CLEAR_RATIO) before the pair can alert again.
+    """
+
+    station = models.ForeignKey(
+        Station,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='alert_thresholds'
+    )
+    pollutant = models.CharField(max_length=10, choices=PollutantType.choices)
+    level = models.FloatField()
+    clear_level = models.FloatField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'pollutant'], name='alert_threshold_station_key'
+            ),
+            models.UniqueConstraint(
+                fields=['pollutant'],
+                condition=models.Q(station__isnull=True),
+                name='alert_threshold_default_key'
+            ),
+        ]
+
+    def __str__(self):
+        scope = self.station_id or 'default'
+        return f"{self.pollutant} >= {self.level} ({scope})"
+
+
 class AlertReceive(models.Model):
     """
     Join table representing which authenticated users received a specific alert.
@@ -306,4 +421,199 @@ class StationConsult(models.Model):
         unique_together = (('auth_user','station'),)
         indexes = [
             models.Index(fields=['auth_user','station']),
-        ]
\ No newline at end of file
+        ]
+
+
+class Measurement(models.Model):
+    """
+    Continuous pollutant reading reported by a device.
+
+    The table is declaratively range-partitioned by month on `recorded_at`
+    (see migration 0003 and `api.partitions`), so in PostgreSQL its primary
+    key is (id, recorded_at). Station is denormalized from the device so
+    station/time queries can be served from a single partition-pruned index.
+
+    Foreign keys cascade at the database level; Django does not collect
+    measurements when a station or device is deleted.
+    """
+
+    device = models.ForeignKey(Device, on_delete=models.DO_NOTHING, related_name='measurements')
+    station = models.ForeignKey(Station, on_delete=models.DO_NOTHING, related_name='measurements')
+    pollutant = models.CharField(max_length=10, choices=PollutantType.choices)
+    value = models.FloatField()
+    recorded_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['station', 'pollutant', 'recorded_at'], name='measurement_station_poll_ts'),
+            models.Index(fields=['device', 'recorded_at'], name='measurement_device_ts'),
+        ]
+
+    def __str__(self):
+        return f"{self.pollutant}: {self.value} @ {self.station_id} ({self.recorded_at})"
+
+
+class MeasurementRollup(models.Model):
+    """
+    Abstract aggregate of measurements per station, pollutant and time bucket.
+
+    Rows are maintained incrementally by `api.rollups` after each ingested
+    batch: only the buckets touched by the batch are recomputed.
+    """
+
+    station = models.ForeignKey(Station, on_delete=models.CASCADE, related_name='+')
+    pollutant = models.CharField(max_length=10, choices=PollutantType.choices)
+    bucket = models.DateTimeField()
+    count = models.IntegerField()
+    min = models.FloatField()
+    max = models.FloatField()
+    mean = models.FloatField()
+    sum = models.FloatField()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return f"{self.pollutant} @ {self.station_id} {self.bucket}: {self.mean}"
+
+
+class MeasurementHourly(MeasurementRollup):
+    """Hourly rollup of measurements (bucket = start of the UTC hour)."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'pollutant', 'bucket'], name='measurement_hourly_key'
+            ),
+        ]
+        indexes = [
+            # Recent hours of every station (see api.dashboard)
+            models.Index(fields=['bucket'], name='measurement_hourly_bucket'),
+        ]
+
+
+class MeasurementDaily(MeasurementRollup):
+    """Daily rollup of measurements (bucket = local midnight in STATION_TIME_ZONE)."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['station', 'pollutant', 'bucket'], name='measurement_daily_key'
+            ),
+        ]
+
+
+class StationAQI(models.Model):
+    """
+    Current air quality index of a station for one breakpoint standard.
+
+    Recomputed for every station after each ingest cycle by `api.aqi`.
+    `sub_indices` maps each pollutant to its own sub-index.
+    """
+
+    station = models.ForeignKey(Station, on_delete=models.CASCADE, related_name='aqi_values')
+    standard = models.CharField(max_length=16, choices=AQIStandard.choices)
+    aqi = models.IntegerField()
+    category = models.CharField(max_length=64)
+    dominant_pollutant = models.CharField(max_length=10, choices=PollutantType.choices)
+    sub_indices = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['station', 'standard'], name='station_aqi_key'),
+        ]
+
+    def __str__(self):
+        return f"AQI {self.aqi} ({self.standard}) @ {self.station_id}"
+
+
+class StationRollingWindow(models.Model):
+    """
+    Rolling 1h/8h/24h averages of one pollutant at a station.
+
+    Maintained incrementally by `api.rolling` as readings are ingested. The
+    last 24 hours are kept as a ring buffer of hourly sums and counts
+    (slot = hour % 24, `head` = newest hour in the buffer) together with
+    running sums of the hourly means for the 8h and 24h windows, so each
+    batch only touches the hours it contains. Averages are relative to
+    `head`, i.e. to the latest reading of the pair.
+    """
+
+    station = models.ForeignKey(Station, on_delete=models.CASCADE, related_name='rolling_windows')
+    pollutant = models.CharField(max_length=10, choices=PollutantType.choices)
+    head = models.DateTimeField()
+    slot_sums = ArrayField(models.FloatField(), size=24)
+    slot_counts = ArrayField(models.IntegerField(), size=24)
+    sum_8h = models.FloatField(default=0)
+    hours_8h = models.IntegerField(default=0)
+    sum_24h = models.FloatField(default=0)
+    hours_24h = models.IntegerField(default=0)
+    avg_1h = models.FloatField(null=True, blank=True)
+    avg_8h = models.FloatField(null=True, blank=True)
+    avg_24h = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['station', 'pollutant'], name='station_rolling_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.pollutant} @ {self.station_id}: 1h={self.avg_1h} 8h={self.avg_8h} 24h={self.avg_24h}"
+
+
+class JobStatus(models.TextChoices):
+    """Lifecycle of a background job."""
+    PENDING = 'pending', 'Pending'
+    RUNNING = 'running', 'Running'
+    DONE    = 'done',    'Done'
+    FAILED  = 'failed',  'Failed'
+
+
+class Job(models.Model):
+    """
+    Background job stored in PostgreSQL (see api/jobs.py).
+
+    Workers claim pending jobs with SELECT ... FOR UPDATE SKIP LOCKED, so
+    any number of them can poll the table without blocking each other.
+    Failed attempts are retried with exponential backoff until
+    `max_attempts`. `unique_key` lets producers coalesce work: at most one
+    pending job can hold a given key.
+    """
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=JobStatus.choices, default=JobStatus.PENDING)
+    priority = models.SmallIntegerField(default=0)
+    unique_key = models.CharField(max_length=200, null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Claim order of pending jobs
+            models.Index(
+                models.F('priority').desc(), 'run_at', 'id',
+                name='job_pending_claim',
+                condition=models.Q(status='pending'),
+            ),
+            models.Index(fields=['status', 'locked_at'], name='job_status_locked'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['unique_key'],
+                condition=models.Q(status='pending'),
+                name='job_pending_unique_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id} {self.name} ({self.status})"
@@ -0,0 +1,76 @@
+"""
+Alert notification fan-out.
+
+Recording who received an alert used to cost two queries per recipient.
+`fan_out` writes the AlertReceive rows of any number of recipients with
+one INSERT per NOTIFY_BATCH_SIZE rows (`ON CONFLICT DO NOTHING`, so users
+already notified are skipped by the database), and reports counts instead
+of the created rows.
+
+Recipients are either an explicit list of AuthUser ids (unknown ids are
+dropped in the same query that resolves them) or every AuthUser with
+StationConsult access to the alert's station.
+"""
+
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import AuthUser, AlertReceive, StationConsult
+from . import caching
+
+
+def subscribers(alert):
+    """Ids of the AuthUsers granted access to the alert's station."""
+    return StationConsult.objects.filter(station_id=alert.station_id).values_list(
+        'auth_user_id', flat=True
+    )
+
+
+def existing_auth_users(auth_user_ids):
+    """Ids among `auth_user_ids` that belong to an AuthUser."""
+    return AuthUser.objects.filter(id__in=list(auth_user_ids)).values_list('id', flat=True)
+
+
+def _chunks(values, size):
+    values = iter(values)
+    while chunk := list(islice(values, size)):
+        yield chunk
+
+
+def fan_out(alert, recipient_ids):
+    """
+    Record that `recipient_ids` received `alert`.
+
+    Parameters:
+        recipient_ids (iterable | QuerySet): AuthUser ids; a values_list
+            queryset is streamed in chunks.
+
+    Returns:
+        dict: `recipients` (ids processed), `created` (new receipts) and
+        `already_notified`.
+    """
+    size = settings.NOTIFY_BATCH_SIZE
+    if hasattr(recipient_ids, 'iterator'):
+        recipient_ids = recipient_ids.iterator(chunk_size=size)
+
+    receives = AlertReceive.objects.filter(alert=alert)
+    recipients = 0
+    with transaction.atomic():
+        before = receives.count()
+        for chunk in _chunks(recipient_ids, size):
+            AlertReceive.objects.bulk_create(
+                [AlertReceive(alert=alert, auth_user_id=auth_user_id) for auth_user_id in chunk],
+                ignore_conflicts=True,
+            )
+            recipients += len(chunk)
+        created = receives.count() - before
+        # Bulk inserts do not send signals.
+        caching.invalidate(caching.ALERTS, [alert.pk], lists=False)
+
+    return {
+        'recipients': recipients,
+        'created': created,
+        'already_notified': recipients - created,
+    }
@@ -1,5 +1,15 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import BooleanField, F, Func, Value
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -22,12 +32,14 @@ class StandardResultsSetPagination(PageNumberPagination):
             Response: paginated response including
             - count
             - next / previous links
+            - count_is_estimate (see EstimatedCountPaginator)
             - total pages
             - current page
             - results
         """
         return Response({
             'count': self.page.paginator.count,
+            'count_is_estimate': getattr(self.page.paginator, 'is_estimate', False),
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'total_pages': self.page.paginator.num_pages,
@@ -36,6 +48,96 @@ class StandardResultsSetPagination(PageNumberPagination):
         })
 
 
+SQL_TABLE_ESTIMATE = """
+SELECT sum(c.reltuples)::bigint, min(c.reltuples)
+FROM pg_class c
+WHERE c.oid = %(table)s::regclass
+   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = %(table)s::regclass)
+"""
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids exact COUNT(*) on very large tables.
+
+    - Unfiltered querysets use the planner statistics in pg_class.reltuples
+      (summed over partitions for partitioned tables).
+    - Filtered querysets use the row estimate of EXPLAIN.
+    - When the estimate is below settings.PAGINATION_ESTIMATE_THRESHOLD, or
+      the table has never been analyzed, the exact count is used instead.
+
+    `is_estimate` tells whether `count` is approximate. Since an estimate
+    can be low, pages past the estimated last page are still served.
+    Also used by the Django admin changelists of the large models.
+    """
+
+    is_estimate = False
+
+    def _database(self):
+        return connections[getattr(self.object_list, 'db', 'default')]
+
+    def _table_estimate(self):
+        with self._database().cursor() as cursor:
+            cursor.execute(SQL_TABLE_ESTIMATE, {'table': self.object_list.model._meta.db_table})
+            total, smallest = cursor.fetchone()
+        # reltuples is -1 for tables that were never analyzed
+        if total is None or smallest is None or smallest < 0:
+            return None
+        return total
+
+    def _explain_estimate(self):
+        sql, params = self.object_list.query.sql_with_params()
+        with self._database().cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query') or self._database().vendor != 'postgresql':
+            return super().count
+
+        if queryset.query.where:
+            estimate = self._explain_estimate()
+        else:
+            estimate = self._table_estimate()
+
+        if estimate is None or estimate < settings.PAGINATION_ESTIMATE_THRESHOLD:
+            return super().count
+        self.is_estimate = True
+        return estimate
+
+    def validate_number(self, number):
+        if not self.count or not self.is_estimate:
+            return super().validate_number(number)
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        """Slice without clamping to the (estimated) count."""
+        number = self.validate_number(number)
+        if not self.is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+
+class EstimatedCountPagination(StandardResultsSetPagination):
+    """
+    StandardResultsSetPagination backed by EstimatedCountPaginator, for
+    tables where an exact count per page dominates response time.
+    """
+    django_paginator_class = EstimatedCountPaginator
+
+
 class LargeResultsSetPagination(PageNumberPagination):
     """
     Pagination for large datasets (e.g., measurements, logs).
@@ -57,4 +159,136 @@ class SmallResultsSetPagination(PageNumberPagination):
     """
     page_size = 10
     page_size_query_param = 'page_size'
-    max_page_size = 50
\ No newline at end of file
+    max_page_size = 50
+
+
+class _Row(Func):
+    """SQL row constructor: ROW(a, b, ...)."""
+    function = 'ROW'
+
+
+class _RowCompare(Func):
+    """
+    Row-value comparison `ROW(a, b) < ROW(x, y)` usable as a filter.
+    PostgreSQL resolves it with a single index range scan.
+    """
+    template = '%(expressions)s'
+    output_field = BooleanField()
+
+    def __init__(self, left, operator, right):
+        self.arg_joiner = f' {operator} '
+        super().__init__(left, right)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination for tables that grow without bound.
+
+    Pages are selected with a row-value comparison on an ordering key such
+    as (alert_date, id) instead of OFFSET, and no COUNT(*) is run, so the
+    cost of a page does not depend on how deep it is. The cursor is an
+    opaque token holding the key of the last row returned.
+
+    - Selected per request with ?pagination=cursor (or by sending ?cursor=)
+    - ?page_size=X (default 20, max 100)
+    - Response: next (URL or null), page_size, results
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+
+    def __init__(self, ordering):
+        """
+        Parameters:
+            ordering (tuple[str]): Unique ordering key, all fields in the same
+                direction, e.g. ('-alert_date', '-id').
+        """
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.operator = '<' if self.ordering[0].startswith('-') else '>'
+
+    @classmethod
+    def requested(cls, request):
+        """Return True if the request asks for keyset pagination."""
+        params = request.query_params
+        return params.get(cls.mode_query_param) == 'cursor' or cls.cursor_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def encode_cursor(self, obj):
+        values = [getattr(obj, name) for name in self.fields]
+        raw = json.dumps([v.isoformat() if hasattr(v, 'isoformat') else v for v in values])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def decode_cursor(self, queryset, token):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(token.encode()))
+            if len(values) != len(self.fields):
+                raise ValueError
+            opts = queryset.model._meta
+            return [opts.get_field(name).to_python(value) for name, value in zip(self.fields, values)]
+        except Exception:
+            raise NotFound('Invalid cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            key = self.decode_cursor(queryset, token)
+            queryset = queryset.filter(_RowCompare(
+                _Row(*[F(name) for name in self.fields]),
+                self.operator,
+                _Row(*[Value(value) for value in key]),
+            ))
+
+        rows = list(queryset[:size + 1])
+        self.has_next = len(rows) > size
+        rows = rows[:size]
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        self.size = size
+        return rows
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        """
+        Returns:
+            Response: next link, page size and results (no total count).
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'page_size': self.size,
+            'results': data,
+        })
+
+
+class KeysetSelectableMixin:
+    """
+    ViewSet mixin that switches from the page-number paginator to
+    KeysetPagination on `keyset_ordering` when the request asks for it.
+    """
+    keyset_ordering = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.keyset_ordering and KeysetPagination.requested(self.request):
+                self._paginator = KeysetPagination(self.keyset_ordering)
+            else:
+                self._paginator = super().paginator
+        return self._paginator
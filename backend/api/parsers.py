@@ -0,0 +1,63 @@
+"""
+Additional DRF parsers for bulk measurement uploads.
+
+Both parsers return a list of dictionaries, the same shape a JSON array body
+produces through `JSONParser`, so views can treat every format uniformly.
+"""
+
+import codecs
+import csv
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON (one object per line).
+
+    Blank lines are ignored.
+    """
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        rows = []
+        reader = codecs.getreader(encoding)(stream)
+        line_number = 0
+        try:
+            # Lines are decoded while iterating, so decode errors surface here too.
+            for line_number, line in enumerate(reader, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                rows.append(json.loads(line))
+        except UnicodeDecodeError as exc:
+            raise ParseError(f'NDJSON parse error after line {line_number}: {exc}')
+        except ValueError as exc:
+            raise ParseError(f'NDJSON parse error on line {line_number}: {exc}')
+        return rows
+
+
+class CSVParser(BaseParser):
+    """
+    Parses CSV with a header row into a list of dictionaries.
+
+    Empty cells are returned as None so they are treated as missing values.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            reader = csv.DictReader(codecs.getreader(encoding)(stream))
+            return [
+                {key.strip(): (value if value != '' else None) for key, value in row.items() if key}
+                for row in reader
+            ]
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f'CSV parse error: {exc}')
@@ -0,0 +1,198 @@
+"""
+Monthly range partitions for the Measurement table.
+
+`api_measurement` is declared as `PARTITION BY RANGE (recorded_at)` and each
+calendar month (UTC) lives in its own child table named
+`api_measurement_pYYYY_MM`. This module creates upcoming partitions and
+detaches (optionally drops) expired ones. It is driven by the
+`measurement_partitions` management command, which should run daily.
+"""
+
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+PARENT_TABLE = 'api_measurement'
+PARTITION_PREFIX = PARENT_TABLE + '_p'
+PARTITION_NAME_RE = re.compile(r'^' + PARTITION_PREFIX + r'(\d{4})_(\d{2})$')
+
+
+class PartitionUnavailable(Exception):
+    """Raised for readings in a month that cannot take rows (expired or detached)."""
+
+
+def month_start(value):
+    """
+    Return the first instant (UTC) of the month containing `value`.
+
+    Parameters:
+        value (datetime): Aware or naive (assumed UTC) datetime.
+
+    Returns:
+        datetime: Aware UTC datetime at 00:00 on day 1 of the month.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(dt_timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    """Shift a month start by a (possibly negative) number of months."""
+    index = value.year * 12 + (value.month - 1) + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def retention_cutoff(retain_months=None, now=None):
+    """
+    Return the start of the oldest month kept by the retention window.
+
+    Parameters:
+        retain_months (int): Number of full months to keep (defaults to
+            settings.MEASUREMENT_RETENTION_MONTHS).
+    """
+    if retain_months is None:
+        retain_months = settings.MEASUREMENT_RETENTION_MONTHS
+    return add_months(month_start(now or datetime.now(dt_timezone.utc)), -retain_months)
+
+
+def partition_name(start):
+    """Return the child table name for the month starting at `start`."""
+    return f"{PARTITION_PREFIX}{start.year:04d}_{start.month:02d}"
+
+
+def list_partitions(using=None):
+    """
+    List the monthly partitions currently attached to the parent table.
+
+    Returns:
+        list[tuple[str, datetime]]: (table name, month start) sorted by month.
+    """
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [PARENT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_NAME_RE.match(name)
+        if match:
+            start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)
+            partitions.append((name, start))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def create_partition(start, using=None):
+    """
+    Create the partition for the month starting at `start` if it is missing.
+
+    Raises:
+        PartitionUnavailable: If the month's table exists but was detached
+            (archived); it is not re-attached implicitly.
+
+    Returns:
+        str: Name of the partition table.
+    """
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    start = month_start(start)
+    name = partition_name(start)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT to_regclass(%s) IS NOT NULL,
+                   EXISTS (
+                       SELECT 1 FROM pg_inherits
+                       WHERE inhrelid = to_regclass(%s) AND inhparent = %s::regclass
+                   )
+            """,
+            [name, name, PARENT_TABLE],
+        )
+        exists, attached = cursor.fetchone()
+        if attached:
+            return name
+        if exists:
+            raise PartitionUnavailable(f'Partition {name} is detached from {PARENT_TABLE}')
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF "{PARENT_TABLE}" '
+            f'FOR VALUES FROM (%s) TO (%s)',
+            [start, add_months(start, 1)],
+        )
+    return name
+
+
+def ensure_partitions(months_ahead=None, months_back=0, now=None, using=None):
+    """
+    Make sure partitions exist from `months_back` before the current month
+    up to `months_ahead` months after it.
+
+    Returns:
+        list[str]: Names of every partition in the requested range.
+    """
+    if months_ahead is None:
+        months_ahead = settings.MEASUREMENT_PARTITION_MONTHS_AHEAD
+    current = month_start(now or datetime.now(dt_timezone.utc))
+    return [
+        create_partition(add_months(current, offset), using=using)
+        for offset in range(-months_back, months_ahead + 1)
+    ]
+
+
+def ensure_partitions_for(timestamps, now=None, using=None):
+    """
+    Create partitions covering every month spanned by `timestamps`.
+
+    Used by ingestion so late or backfilled readings never hit a missing
+    partition. Attachment is read from pg_inherits on every call: another
+    process may have detached a month since.
+
+    Raises:
+        PartitionUnavailable: If a month is older than the retention window
+            or its partition was detached.
+    """
+    months = {month_start(ts) for ts in timestamps}
+    cutoff = retention_cutoff(now=now)
+    if any(start < cutoff for start in months):
+        raise PartitionUnavailable(
+            f'Readings before {cutoff:%Y-%m} are older than the retention window'
+        )
+    attached = {start for _, start in list_partitions(using=using)}
+    for start in sorted(months - attached):
+        create_partition(start, using=using)
+
+
+def detach_expired_partitions(retain_months=None, drop=False, now=None, using=None):
+    """
+    Detach partitions whose whole month is older than the retention window.
+
+    Parameters:
+        retain_months (int): Number of full months to keep (defaults to
+            settings.MEASUREMENT_RETENTION_MONTHS).
+        drop (bool): Drop the detached tables instead of keeping them for
+            archiving.
+
+    Returns:
+        list[str]: Names of the detached partitions.
+    """
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    cutoff = retention_cutoff(retain_months, now)
+
+    detached = []
+    for name, start in list_partitions(using=conn.alias):
+        if start >= cutoff:
+            continue
+        with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"')
+            if drop:
+                cursor.execute(f'DROP TABLE "{name}"')
+        detached.append(name)
+    return detached
@@ -1,5 +1,7 @@
 from rest_framework import permissions
 
+from . import access
+
 
 class IsAdmin(permissions.BasePermission):
     """
@@ -113,7 +115,7 @@ class CanAccessStation(permissions.BasePermission):
 
     - Admin users have full access.
     - Auth users can only access stations they've been explicitly granted
-      via StationConsult.
+      via StationConsult (cached set, see api.access).
     """
 
     def has_object_permission(self, request, view, obj):
@@ -123,11 +125,7 @@ class CanAccessStation(permissions.BasePermission):
 
         # Auth users need explicit access via station_consults
         if hasattr(request.user, 'auth_profile'):
-            from .models import StationConsult
-            return StationConsult.objects.filter(
-                auth_user=request.user.auth_profile,
-                station=obj
-            ).exists()
+            return obj.pk in access.station_scope(request.user)
 
         return False
 
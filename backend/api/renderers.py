@@ -0,0 +1,34 @@
+"""
+Additional DRF renderers for binary map responses.
+
+They let clients that send the binary media type in Accept pass content
+negotiation. Successful responses are plain HttpResponses with the encoded
+bytes; errors of the same views carry a dictionary, rendered as JSON.
+"""
+
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class BinaryRenderer(BaseRenderer):
+    """Passes bytes through untouched; anything else is rendered as JSON."""
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        return json.dumps(data).encode()
+
+
+class MVTRenderer(BinaryRenderer):
+    """Mapbox Vector Tile (protobuf)."""
+    media_type = 'application/vnd.mapbox-vector-tile'
+    format = 'mvt'
+
+
+class PNGRenderer(BinaryRenderer):
+    """PNG image."""
+    media_type = 'image/png'
+    format = 'png'
@@ -0,0 +1,242 @@
+"""
+Incremental rolling-window averages per station and pollutant.
+
+Regulatory limits are stated over moving averages (24 h for PM2.5/PM10,
+8 h for O3/CO, 1 h for NO2/SO2). Instead of re-reading the window for every
+request, each (station, pollutant) pair keeps a StationRollingWindow row:
+
+- a 24-slot ring buffer of hourly sums and counts (slot = hour % 24);
+- running sums of the hourly means inside the 8 h and 24 h windows.
+
+A batch is first reduced to hourly totals with NumPy. Applying an hour
+either moves the head forward (evicting the hours that leave each window
+from the running sums) or updates a slot in place (replacing its old mean
+with the new one), so the cost per batch depends on the hours it touches,
+not on the window length. State is persisted after every batch, so a
+restarted process resumes where the previous one stopped. Updates of a
+station are serialized with an advisory lock (see api.locks), which also
+covers windows that do not exist yet.
+
+Window averages are means of hourly means (every hour weighs the same,
+whatever the device sampling rate). `hours_8h`/`hours_24h` tell how many
+hours actually have data, for completeness checks.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db import transaction
+from django.utils import timezone
+
+from .models import StationRollingWindow, MeasurementHourly, PollutantType
+from . import caching, locks
+
+
+SLOTS = 24
+
+WINDOWS = {'1h': 1, '8h': 8, '24h': 24}
+
+# Averaging period used for regulatory comparison and for the AQI.
+REGULATORY_WINDOW = {
+    PollutantType.PM25: '24h',
+    PollutantType.PM10: '24h',
+    PollutantType.O3: '8h',
+    PollutantType.CO: '8h',
+    PollutantType.NO2: '1h',
+    PollutantType.SO2: '1h',
+}
+
+UPDATE_FIELDS = [
+    'head', 'slot_sums', 'slot_counts', 'sum_8h', 'hours_8h', 'sum_24h', 'hours_24h',
+    'avg_1h', 'avg_8h', 'avg_24h', 'updated_at',
+]
+
+_KEY_DTYPE = [('station', np.int64), ('pollutant', 'U10'), ('hour', np.int64)]
+_HOUR = timedelta(hours=1)
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def _to_hour(value):
+    return (value - _EPOCH) // _HOUR
+
+
+def _from_hour(hour):
+    return _EPOCH + hour * _HOUR
+
+
+def hourly_totals(batch):
+    """
+    Reduce a batch to per-hour totals.
+
+    Returns:
+        tuple: (keys, sums, counts) where `keys` is a sorted structured array
+        of (station, pollutant, hour since epoch).
+    """
+    keys = np.empty(len(batch), dtype=_KEY_DTYPE)
+    keys['station'] = batch.station_ids
+    keys['pollutant'] = batch.pollutants
+    keys['hour'] = batch.recorded_at.astype('datetime64[h]').astype(np.int64)
+    keys, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=batch.values, minlength=keys.size)
+    counts = np.bincount(inverse, minlength=keys.size)
+    return keys, sums, counts
+
+
+def _empty(station_id, pollutant, hour):
+    return StationRollingWindow(
+        station_id=station_id,
+        pollutant=pollutant,
+        head=_from_hour(hour),
+        slot_sums=[0.0] * SLOTS,
+        slot_counts=[0] * SLOTS,
+    )
+
+
+def _mean(state, hour):
+    slot = hour % SLOTS
+    count = state.slot_counts[slot]
+    return state.slot_sums[slot] / count if count else None
+
+
+def _advance(state, head, hour):
+    """Move the head forward to `hour`, evicting hours that leave each window."""
+    if hour - head >= SLOTS:
+        state.slot_sums = [0.0] * SLOTS
+        state.slot_counts = [0] * SLOTS
+        state.sum_8h = state.sum_24h = 0.0
+        state.hours_8h = state.hours_24h = 0
+        return
+
+    for new in range(head + 1, hour + 1):
+        leaving = _mean(state, new - WINDOWS['8h'])
+        if leaving is not None:
+            state.sum_8h -= leaving
+            state.hours_8h -= 1
+        # The slot of the new hour still holds the hour leaving the 24h window.
+        leaving = _mean(state, new)
+        if leaving is not None:
+            state.sum_24h -= leaving
+            state.hours_24h -= 1
+        slot = new % SLOTS
+        state.slot_sums[slot] = 0.0
+        state.slot_counts[slot] = 0
+
+
+def _add(state, head, hour, total, count):
+    """Add readings of `hour` (at or before the head) to the buffer."""
+    if hour <= head - SLOTS:
+        return
+    old = _mean(state, hour)
+    slot = hour % SLOTS
+    state.slot_sums[slot] += total
+    state.slot_counts[slot] += count
+    new = _mean(state, hour)
+
+    delta = new - (old or 0.0)
+    added = int(old is None)
+    state.sum_24h += delta
+    state.hours_24h += added
+    if hour > head - WINDOWS['8h']:
+        state.sum_8h += delta
+        state.hours_8h += added
+
+
+def _finish(state, head):
+    """Store the head and derive the averages exposed to the API."""
+    # Reset running sums when a window empties so float error cannot accumulate.
+    if state.hours_8h == 0:
+        state.sum_8h = 0.0
+    if state.hours_24h == 0:
+        state.sum_24h = 0.0
+    state.head = _from_hour(head)
+    state.avg_1h = _mean(state, head)
+    state.avg_8h = state.sum_8h / state.hours_8h if state.hours_8h else None
+    state.avg_24h = state.sum_24h / state.hours_24h if state.hours_24h else None
+
+
+def _apply(states, keys, sums, counts):
+    """
+    Apply sorted hourly totals to the states in `states`, creating missing
+    ones. Returns the touched states.
+    """
+    touched = {}
+    heads = {}
+    for station_id, pollutant, hour, total, count in zip(
+        keys['station'].tolist(), keys['pollutant'].tolist(), keys['hour'].tolist(),
+        sums.tolist(), counts.tolist(),
+    ):
+        pair = (station_id, pollutant)
+        state = touched.get(pair)
+        if state is None:
+            state = states.get(pair) or _empty(station_id, pollutant, hour)
+            touched[pair] = state
+            heads[pair] = _to_hour(state.head)
+        head = heads[pair]
+        if hour > head:
+            _advance(state, head, hour)
+            heads[pair] = head = hour
+        _add(state, head, hour, total, count)
+
+    for pair, state in touched.items():
+        _finish(state, heads[pair])
+    return list(touched.values())
+
+
+def _save(states):
+    StationRollingWindow.objects.bulk_create(
+        states,
+        update_conflicts=True,
+        unique_fields=['station', 'pollutant'],
+        update_fields=UPDATE_FIELDS,
+    )
+
+
+def update_for_batch(batch):
+    """
+    Fold an ingested batch into the rolling windows of the pairs it touches.
+
+    The batch's stations are locked before their windows are read, so
+    concurrent batches for a station apply one after the other, including
+    when they both create the same window (a row lock would not exist yet).
+    """
+    keys, sums, counts = hourly_totals(batch)
+    if keys.size == 0:
+        return
+
+    station_ids = np.unique(keys['station']).tolist()
+    with transaction.atomic():
+        locks.lock_stations(locks.ROLLING, station_ids)
+        rows = StationRollingWindow.objects.filter(
+            station_id__in=station_ids,
+            pollutant__in=np.unique(keys['pollutant']).tolist(),
+        )
+        states = {(row.station_id, row.pollutant): row for row in rows}
+        _save(_apply(states, keys, sums, counts))
+        # Station detail embeds the rolling averages.
+        caching.invalidate(caching.STATIONS, station_ids, lists=False)
+
+
+def rebuild(now=None):
+    """
+    Recompute every rolling window from the hourly rollups of the last 24
+    hours. Used after backfills and repairs.
+    """
+    now = now or timezone.now()
+    rows = list(
+        MeasurementHourly.objects.filter(bucket__gt=now - SLOTS * _HOUR)
+        .order_by('station_id', 'pollutant', 'bucket')
+        .values_list('station_id', 'pollutant', 'bucket', 'sum', 'count')
+    )
+    if not rows:
+        return
+
+    stations, pollutants, buckets, sums, counts = zip(*rows)
+    keys = np.empty(len(rows), dtype=_KEY_DTYPE)
+    keys['station'] = stations
+    keys['pollutant'] = pollutants
+    keys['hour'] = [_to_hour(bucket) for bucket in buckets]
+
+    with transaction.atomic():
+        locks.lock_stations(locks.ROLLING, set(stations))
+        _save(_apply({}, keys, np.array(sums), np.array(counts)))
+        caching.invalidate(caching.STATIONS, set(stations), lists=False)
@@ -0,0 +1,227 @@
+"""
+Incremental hourly and daily rollups of measurements.
+
+After a batch is ingested, the distinct (station, pollutant, bucket) keys it
+touched are computed with NumPy and only those buckets are recomputed in
+SQL: hourly rows from raw measurements, then daily rows from the hourly
+table. Recomputing a whole bucket (instead of adding deltas) keeps the
+upserts idempotent and correct for late or re-sent readings.
+
+Hourly buckets start at the UTC hour. Daily buckets start at local midnight
+in settings.STATION_TIME_ZONE.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+
+
+SQL_REFRESH_HOURLY = """
+INSERT INTO api_measurementhourly (station_id, pollutant, bucket, "count", "min", "max", mean, "sum")
+SELECT t.station_id, t.pollutant, t.bucket,
+       count(*), min(m.value), max(m.value), avg(m.value), sum(m.value)
+FROM unnest(%(stations)s::bigint[], %(pollutants)s::varchar[], %(buckets)s::timestamptz[])
+     AS t(station_id, pollutant, bucket)
+JOIN api_measurement m
+  ON m.station_id = t.station_id
+ AND m.pollutant = t.pollutant
+ AND m.recorded_at >= t.bucket
+ AND m.recorded_at < t.bucket + interval '1 hour'
+WHERE m.recorded_at >= %(start)s AND m.recorded_at < %(end)s
+GROUP BY t.station_id, t.pollutant, t.bucket
+ON CONFLICT (station_id, pollutant, bucket) DO UPDATE SET
+    "count" = EXCLUDED."count",
+    "min" = EXCLUDED."min",
+    "max" = EXCLUDED."max",
+    mean = EXCLUDED.mean,
+    "sum" = EXCLUDED."sum"
+"""
+
+SQL_REFRESH_DAILY = """
+INSERT INTO api_measurementdaily (station_id, pollutant, bucket, "count", "min", "max", mean, "sum")
+SELECT t.station_id, t.pollutant, t.bucket,
+       sum(h."count"), min(h."min"), max(h."max"), sum(h."sum") / sum(h."count"), sum(h."sum")
+FROM unnest(%(stations)s::bigint[], %(pollutants)s::varchar[], %(buckets)s::timestamptz[])
+     AS t(station_id, pollutant, bucket)
+JOIN api_measurementhourly h
+  ON h.station_id = t.station_id
+ AND h.pollutant = t.pollutant
+ AND h.bucket >= t.bucket
+ AND h.bucket < ((t.bucket AT TIME ZONE %(tz)s) + interval '1 day') AT TIME ZONE %(tz)s
+GROUP BY t.station_id, t.pollutant, t.bucket
+ON CONFLICT (station_id, pollutant, bucket) DO UPDATE SET
+    "count" = EXCLUDED."count",
+    "min" = EXCLUDED."min",
+    "max" = EXCLUDED."max",
+    mean = EXCLUDED.mean,
+    "sum" = EXCLUDED."sum"
+"""
+
+SQL_REBUILD_HOURLY = """
+INSERT INTO api_measurementhourly (station_id, pollutant, bucket, "count", "min", "max", mean, "sum")
+SELECT station_id, pollutant, date_trunc('hour', recorded_at),
+       count(*), min(value), max(value), avg(value), sum(value)
+FROM api_measurement
+WHERE recorded_at >= %(start)s AND recorded_at < %(end)s
+GROUP BY station_id, pollutant, date_trunc('hour', recorded_at)
+ON CONFLICT (station_id, pollutant, bucket) DO UPDATE SET
+    "count" = EXCLUDED."count",
+    "min" = EXCLUDED."min",
+    "max" = EXCLUDED."max",
+    mean = EXCLUDED.mean,
+    "sum" = EXCLUDED."sum"
+"""
+
+SQL_REBUILD_DAILY = """
+INSERT INTO api_measurementdaily (station_id, pollutant, bucket, "count", "min", "max", mean, "sum")
+SELECT station_id, pollutant, date_trunc('day', bucket, %(tz)s),
+       sum("count"), min("min"), max("max"), sum("sum") / sum("count"), sum("sum")
+FROM api_measurementhourly
+WHERE bucket >= date_trunc('day', %(start)s::timestamptz, %(tz)s)
+  AND bucket < ((date_trunc('day', %(end)s::timestamptz - interval '1 microsecond', %(tz)s)
+                 AT TIME ZONE %(tz)s) + interval '1 day') AT TIME ZONE %(tz)s
+GROUP BY station_id, pollutant, date_trunc('day', bucket, %(tz)s)
+ON CONFLICT (station_id, pollutant, bucket) DO UPDATE SET
+    "count" = EXCLUDED."count",
+    "min" = EXCLUDED."min",
+    "max" = EXCLUDED."max",
+    mean = EXCLUDED.mean,
+    "sum" = EXCLUDED."sum"
+"""
+
+SQL_PRUNE_HOURLY = """
+DELETE FROM api_measurementhourly h
+WHERE h.bucket >= %(start)s AND h.bucket < %(end)s
+  AND NOT EXISTS (
+      SELECT 1 FROM api_measurement m
+      WHERE m.station_id = h.station_id
+        AND m.pollutant = h.pollutant
+        AND m.recorded_at >= h.bucket
+        AND m.recorded_at < h.bucket + interval '1 hour'
+        AND m.recorded_at >= %(start)s AND m.recorded_at < %(end)s
+  )
+"""
+
+SQL_PRUNE_DAILY = """
+DELETE FROM api_measurementdaily d
+WHERE d.bucket >= date_trunc('day', %(start)s::timestamptz, %(tz)s)
+  AND d.bucket < ((date_trunc('day', %(end)s::timestamptz - interval '1 microsecond', %(tz)s)
+                   AT TIME ZONE %(tz)s) + interval '1 day') AT TIME ZONE %(tz)s
+  AND NOT EXISTS (
+      SELECT 1 FROM api_measurementhourly h
+      WHERE h.station_id = d.station_id
+        AND h.pollutant = d.pollutant
+        AND h.bucket >= d.bucket
+        AND h.bucket < ((d.bucket AT TIME ZONE %(tz)s) + interval '1 day') AT TIME ZONE %(tz)s
+  )
+"""
+
+_KEY_DTYPE = [('station', np.int64), ('pollutant', 'U10'), ('bucket', 'datetime64[h]')]
+
+
+def local_midnight(value, tz=None):
+    """
+    Return the local midnight (as an aware UTC datetime) of the day
+    containing `value` in the given time zone.
+    """
+    tz = ZoneInfo(tz or settings.STATION_TIME_ZONE)
+    local = value.astimezone(tz)
+    return datetime(local.year, local.month, local.day, tzinfo=tz).astimezone(dt_timezone.utc)
+
+
+def touched_hours(batch):
+    """
+    Return the distinct (station, pollutant, hour) keys touched by a batch.
+
+    Returns:
+        np.ndarray: Structured array with fields station, pollutant, bucket.
+    """
+    keys = np.empty(len(batch), dtype=_KEY_DTYPE)
+    keys['station'] = batch.station_ids
+    keys['pollutant'] = batch.pollutants
+    keys['bucket'] = batch.recorded_at.astype('datetime64[h]')
+    return np.unique(keys)
+
+
+def _as_datetimes(hours):
+    return [
+        datetime(*value.timetuple()[:4], tzinfo=dt_timezone.utc)
+        for value in hours.astype('datetime64[s]').astype(datetime)
+    ]
+
+
+def refresh_keys(keys):
+    """
+    Recompute the hourly buckets in `keys` and the daily buckets that
+    contain them.
+
+    Parameters:
+        keys (np.ndarray): Output of `touched_hours`.
+    """
+    if keys.size == 0:
+        return
+
+    tz = settings.STATION_TIME_ZONE
+    hours = _as_datetimes(keys['bucket'])
+    stations = keys['station'].tolist()
+    pollutants = keys['pollutant'].tolist()
+
+    # Local days only depend on the distinct hours, not on every key.
+    day_of_hour = {hour: local_midnight(hour, tz) for hour in set(hours)}
+    days = sorted(set(zip(stations, pollutants, (day_of_hour[h] for h in hours))))
+
+    with connection.cursor() as cursor:
+        cursor.execute(SQL_REFRESH_HOURLY, {
+            'stations': stations,
+            'pollutants': pollutants,
+            'buckets': hours,
+            'start': min(hours),
+            'end': max(hours) + timedelta(hours=1),
+        })
+        cursor.execute(SQL_REFRESH_DAILY, {
+            'stations': [key[0] for key in days],
+            'pollutants': [key[1] for key in days],
+            'buckets': [key[2] for key in days],
+            'tz': tz,
+        })
+
+
+def refresh_for_batch(batch):
+    """Recompute every rollup bucket touched by an ingested batch."""
+    refresh_keys(touched_hours(batch))
+
+
+def floor_hour(value):
+    """Start of the UTC hour containing `value`."""
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def ceil_hour(value):
+    """`value` itself if it starts a UTC hour, else the start of the next hour."""
+    floored = floor_hour(value)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
+def rebuild(start, end):
+    """
+    Recompute all rollups for readings in [start, end) with set-based
+    statements. Used for backfills and repairs.
+
+    The range is widened to whole hours, since a partial hour would
+    overwrite its bucket with part of its readings. Hourly and daily rows in
+    the range that no longer have readings are deleted.
+
+    Returns:
+        tuple[datetime, datetime]: The range actually rebuilt.
+    """
+    start, end = floor_hour(start), ceil_hour(end)
+    params = {'start': start, 'end': end, 'tz': settings.STATION_TIME_ZONE}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(SQL_PRUNE_HOURLY, params)
+        cursor.execute(SQL_REBUILD_HOURLY, params)
+        cursor.execute(SQL_PRUNE_DAILY, params)
+        cursor.execute(SQL_REBUILD_DAILY, params)
+    return start, end
@@ -0,0 +1,167 @@
+"""
+Read-replica routing.
+
+Read-only endpoints (list/retrieve of the heavy viewsets, `nearby`,
+station `alerts` and `series`, measurements and rollups, tiles and the
+async read path) run inside `replica_reads()`, set up by
+`ReplicaReadMixin` or the async views. There, `ReplicaRouter` sends ORM
+reads to one of settings.DATABASE_REPLICAS, chosen once per request so
+that all of its queries see the same snapshot. Raw SQL on those paths uses
+`read_connection`.
+
+The primary (`default`) is used instead:
+
+- for every write, and for every read of the same request after a write
+  (the router pins the request to the primary on its first write);
+- inside transaction.atomic() blocks on the primary;
+- outside `replica_reads()` (ingestion, jobs, admin, every other endpoint);
+- for the authenticated user and its station access set (api.auth_cache,
+  api.access), which are cached far longer than a replica may lag;
+- when no replica is configured or, with REPLICA_MAX_LAG_SECONDS set, when
+  every replica lags more than that or cannot be reached (the lag of each
+  replica is checked at most every REPLICA_LAG_CHECK_SECONDS per process).
+
+The request state lives in a ContextVar, so it follows the request into
+sync_to_async threads and never leaks between requests of one thread.
+Responses read from a replica are cached for at most
+REPLICA_CACHE_TIMEOUT (`cache_timeout`): a lagging replica must not pin an
+outdated response under a fresh cache stamp.
+"""
+
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, router
+
+
+logger = logging.getLogger(__name__)
+
+SQL_REPLICA_LAG = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class _ReadState:
+    """Routing state of one request."""
+
+    __slots__ = ('alias', 'pinned')
+
+    def __init__(self):
+        self.alias = None
+        self.pinned = False
+
+
+_state = ContextVar('replica_reads', default=None)
+
+# alias -> (monotonic time of the check, lag in seconds or None if unreachable)
+_lag = {}
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Allow the reads of the enclosed block to go to a replica."""
+    token = _state.set(_ReadState() if enabled else None)
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def replica_lag(alias):
+    """Replication lag of a replica in seconds (None if unreachable), cached briefly."""
+    now = time.monotonic()
+    checked = _lag.get(alias)
+    if checked is not None and now - checked[0] < settings.REPLICA_LAG_CHECK_SECONDS:
+        return checked[1]
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(SQL_REPLICA_LAG)
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning('Replica %s is unreachable', alias, exc_info=True)
+        lag = None
+    _lag[alias] = (now, lag)
+    return lag
+
+
+def choose_replica():
+    """A replica within the allowed lag, or None to read from the primary."""
+    replicas = list(settings.DATABASE_REPLICAS)
+    random.shuffle(replicas)
+    max_lag = settings.REPLICA_MAX_LAG_SECONDS
+    for alias in replicas:
+        if max_lag is None:
+            return alias
+        lag = replica_lag(alias)
+        if lag is not None and lag <= max_lag:
+            return alias
+    return None
+
+
+def read_from_replica():
+    """True if the current request has read from a replica."""
+    state = _state.get()
+    return state is not None and state.alias not in (None, DEFAULT_DB_ALIAS)
+
+
+def cache_timeout(timeout):
+    """Cache timeout for data read in the current request."""
+    if read_from_replica():
+        return min(timeout, settings.REPLICA_CACHE_TIMEOUT)
+    return timeout
+
+
+def read_connection(model):
+    """Connection raw SQL reading `model` should use."""
+    return connections[router.db_for_read(model)]
+
+
+class ReplicaRouter:
+    """Database router implementing the rules of this module."""
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None:
+            return None
+        if state.pinned or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state.alias is None:
+            state.alias = choose_replica() or DEFAULT_DB_ALIAS
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaReadMixin:
+    """
+    View mixin running `replica_actions` inside `replica_reads()`.
+
+    For ViewSets the entries are action names; for plain APIViews, HTTP
+    method names in lower case.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        method = request.method.lower()
+        action = getattr(self, 'action_map', {}).get(method, method)
+        with replica_reads(action in self.replica_actions):
+            return super().dispatch(request, *args, **kwargs)
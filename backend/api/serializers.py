@@ -4,8 +4,10 @@ from django.contrib.gis.geos import Point
 from django.contrib.auth.hashers import make_password
 from .models import (
     User, Admin, AuthUser, Institution, Station, Device,
-    Alert, AlertPollutant, AlertReceive, StationConsult
+    Alert, AlertPollutant, AlertReceive, StationConsult, Measurement, AlertThreshold,
+    MeasurementHourly, MeasurementDaily, StationAQI, StationRollingWindow, Job,
 )
+from .rolling import REGULATORY_WINDOW
 
 
 # ==================== USER SERIALIZERS ====================
@@ -161,8 +163,12 @@ class InstitutionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
     def get_stations_count(self, obj):
-        """Return the number of stations owned by the institution."""
-        return obj.stations.count()
+        """
+        Return the number of stations owned by the institution.
+        Uses the `with_counts()` annotation when present.
+        """
+        count = getattr(obj, 'stations_count', None)
+        return obj.stations.count() if count is None else count
 
 
 class InstitutionDetailSerializer(InstitutionSerializer):
@@ -176,8 +182,10 @@ class InstitutionDetailSerializer(InstitutionSerializer):
         fields = InstitutionSerializer.Meta.fields + ['stations']
 
     def get_stations(self, obj):
-        """Return serialized stations belonging to this institution."""
-        from .serializers import StationListSerializer
+        """
+        Return serialized stations belonging to this institution.
+        The view prefetches them together with their admin users.
+        """
         return StationListSerializer(obj.stations.all(), many=True).data
 
 
@@ -218,6 +226,28 @@ class AlertPollutantCreateSerializer(serializers.ModelSerializer):
         fields = ['pollutant', 'level']
 
 
+class AlertThresholdSerializer(serializers.ModelSerializer):
+    """
+    Serializer for alert thresholds.
+    A null station makes the threshold the network-wide default.
+    """
+    station_name = serializers.CharField(source='station.name', read_only=True, allow_null=True)
+
+    class Meta:
+        model = AlertThreshold
+        fields = ['id', 'station', 'station_name', 'pollutant', 'level', 'clear_level',
+                  'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate(self, attrs):
+        """Ensure the clear level does not exceed the alert level."""
+        level = attrs.get('level', getattr(self.instance, 'level', None))
+        clear_level = attrs.get('clear_level', getattr(self.instance, 'clear_level', None))
+        if clear_level is not None and level is not None and clear_level > level:
+            raise serializers.ValidationError({'clear_level': 'Must not exceed level'})
+        return attrs
+
+
 # ==================== ALERT SERIALIZERS ====================
 
 class AlertSerializer(serializers.ModelSerializer):
@@ -300,12 +330,20 @@ class StationSerializer(GeoFeatureModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_devices_count(self, obj):
-        """Return number of devices in the station."""
-        return obj.devices.count()
+        """
+        Return number of devices in the station.
+        Uses the `with_counts()` annotation when present.
+        """
+        count = getattr(obj, 'devices_count', None)
+        return obj.devices.count() if count is None else count
 
     def get_alerts_count(self, obj):
-        """Return number of alerts reported by this station."""
-        return obj.alerts.count()
+        """
+        Return number of alerts reported by this station.
+        Uses the `with_counts()` annotation when present.
+        """
+        count = getattr(obj, 'alerts_count', None)
+        return obj.alerts.count() if count is None else count
 
 
 class StationCreateSerializer(serializers.ModelSerializer):
@@ -351,19 +389,47 @@ class StationCreateSerializer(serializers.ModelSerializer):
         return rep
 
 
+class StationRollingWindowSerializer(serializers.ModelSerializer):
+    """
+    Rolling 1h/8h/24h averages of one pollutant at a station.
+    `regulatory_window` is the averaging period used for limits and AQI.
+    """
+    regulatory_window = serializers.SerializerMethodField()
+
+    class Meta:
+        model = StationRollingWindow
+        fields = ['pollutant', 'head', 'avg_1h', 'avg_8h', 'avg_24h',
+                  'hours_8h', 'hours_24h', 'regulatory_window']
+        read_only_fields = fields
+
+    def get_regulatory_window(self, obj):
+        """Return the regulatory averaging period of the pollutant."""
+        return REGULATORY_WINDOW.get(obj.pollutant)
+
+
+RECENT_ALERTS = 10
+
+
 class StationDetailSerializer(StationSerializer):
     """
-    Full detail of a station, including devices and recent alerts.
+    Full detail of a station, including devices, recent alerts and
+    rolling pollutant averages.
     """
     devices = DeviceSerializer(many=True, read_only=True)
     recent_alerts = serializers.SerializerMethodField()
+    rolling_averages = StationRollingWindowSerializer(source='rolling_windows', many=True, read_only=True)
 
     class Meta(StationSerializer.Meta):
-        fields = StationSerializer.Meta.fields + ['devices', 'recent_alerts']
+        fields = StationSerializer.Meta.fields + ['devices', 'recent_alerts', 'rolling_averages']
 
     def get_recent_alerts(self, obj):
-        """Return the latest 10 alerts sorted by date."""
-        alerts = obj.alerts.order_by('-alert_date')[:10]
+        """
+        Return the latest RECENT_ALERTS alerts sorted by date.
+        Uses the `recent_alerts` prefetch when present.
+        """
+        alerts = getattr(obj, 'recent_alerts', None)
+        if alerts is None:
+            alerts = obj.alerts.order_by('-alert_date').prefetch_related('pollutants')[:RECENT_ALERTS]
         return AlertSerializer(alerts, many=True).data
 
 
@@ -402,4 +468,60 @@ class StationConsultSerializer(serializers.ModelSerializer):
     class Meta:
         model = StationConsult
         fields = ['auth_user', 'auth_user_name', 'station', 'station_name', 'granted_at']
-        read_only_fields = ['granted_at']
\ No newline at end of file
+        read_only_fields = ['granted_at']
+
+
+# ==================== MEASUREMENT SERIALIZERS ====================
+
+class MeasurementSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for continuous device readings.
+    Bulk writes go through the ingest endpoint (see api/ingest.py).
+    """
+    class Meta:
+        model = Measurement
+        fields = ['id', 'device', 'station', 'pollutant', 'value', 'recorded_at']
+        read_only_fields = fields
+
+
+class MeasurementHourlySerializer(serializers.ModelSerializer):
+    """
+    Serializer for hourly measurement rollups.
+    """
+    class Meta:
+        model = MeasurementHourly
+        fields = ['station', 'pollutant', 'bucket', 'count', 'min', 'max', 'mean', 'sum']
+        read_only_fields = fields
+
+
+class MeasurementDailySerializer(MeasurementHourlySerializer):
+    """
+    Serializer for daily measurement rollups (bucket = local midnight).
+    """
+    class Meta(MeasurementHourlySerializer.Meta):
+        model = MeasurementDaily
+
+
+class StationAQISerializer(serializers.ModelSerializer):
+    """
+    Serializer for the current AQI of a station.
+    Includes station name and per-pollutant sub-indices.
+    """
+    station_name = serializers.CharField(source='station.name', read_only=True)
+
+    class Meta:
+        model = StationAQI
+        fields = ['station', 'station_name', 'standard', 'aqi', 'category',
+                  'dominant_pollutant', 'sub_indices', 'computed_at']
+        read_only_fields = fields
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for background jobs (read-only status for polling).
+    """
+    class Meta:
+        model = Job
+        fields = ['id', 'name', 'payload', 'status', 'priority', 'attempts', 'max_attempts',
+                  'run_at', 'last_error', 'result', 'created_at', 'finished_at']
+        read_only_fields = fields
@@ -0,0 +1,217 @@
+"""
+Time-bucketed pollutant series for a station.
+
+Buckets are aligned to local time in settings.STATION_TIME_ZONE
+(America/Bogota). Bucket sizes covered by rollup tables are read from them
+(`1h` from MeasurementHourly, `1d` from MeasurementDaily); finer sizes are
+aggregated from raw measurements in SQL with `date_bin`, so the client never
+receives individual readings.
+"""
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Measurement, MeasurementHourly, MeasurementDaily, PollutantType
+from . import downsampling, routing
+
+
+BUCKETS = {
+    '1m': timedelta(minutes=1),
+    '5m': timedelta(minutes=5),
+    '1h': timedelta(hours=1),
+    '1d': timedelta(days=1),
+}
+
+ROLLUP_MODELS = {
+    '1h': MeasurementHourly,
+    '1d': MeasurementDaily,
+}
+
+DEFAULT_RANGE = timedelta(days=1)
+
+SQL_RAW_SERIES = """
+SELECT date_bin(%(step)s, recorded_at, %(origin)s) AS bucket,
+       count(*), min(value), max(value), avg(value)
+FROM api_measurement
+WHERE station_id = %(station)s
+  AND pollutant = %(pollutant)s
+  AND recorded_at >= %(start)s
+  AND recorded_at < %(end)s
+GROUP BY 1
+ORDER BY 1
+"""
+
+
+def local_zone():
+    """Return the station time zone."""
+    return ZoneInfo(settings.STATION_TIME_ZONE)
+
+
+def _origin(tz):
+    """Local midnight of 2000-01-01, the alignment origin for all buckets."""
+    return datetime(2000, 1, 1, tzinfo=tz)
+
+
+def align(value, bucket, tz=None):
+    """
+    Floor `value` to the start of its bucket in local time.
+
+    Parameters:
+        value (datetime): Aware datetime.
+        bucket (str): One of BUCKETS.
+    """
+    tz = tz or local_zone()
+    local = value.astimezone(tz)
+    if bucket == '1d':
+        return datetime(local.year, local.month, local.day, tzinfo=tz)
+    step = BUCKETS[bucket]
+    origin = _origin(tz)
+    return origin + ((local - origin) // step) * step
+
+
+def align_up(value, bucket, tz=None):
+    """`value` if it starts a bucket, else the start of the next bucket."""
+    tz = tz or local_zone()
+    floored = align(value, bucket, tz)
+    if floored == value:
+        return floored
+    if bucket == '1d':
+        day = floored.date() + timedelta(days=1)
+        return datetime(day.year, day.month, day.day, tzinfo=tz)
+    return floored + BUCKETS[bucket]
+
+
+def parse_params(params, now=None):
+    """
+    Validate series query parameters.
+
+    Parameters:
+        params (QueryDict): pollutant, bucket, start, end. Naive datetimes
+            are interpreted in the station time zone.
+
+    Raises:
+        ValueError: With a client-facing message.
+
+    Returns:
+        dict: pollutant, bucket, start, end (aware). The range is widened
+        to whole buckets, so rollup and raw series cover the same readings.
+    """
+    tz = local_zone()
+
+    pollutant = (params.get('pollutant') or '').upper()
+    if pollutant not in PollutantType.values:
+        raise ValueError(f"pollutant must be one of {', '.join(PollutantType.values)}")
+
+    bucket = params.get('bucket', '1h')
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+
+    def parse(name):
+        raw = params.get(name)
+        if raw is None:
+            return None
+        value = parse_datetime(raw)
+        if value is None:
+            raise ValueError(f"{name} must be an ISO 8601 datetime")
+        if timezone.is_naive(value):
+            value = value.replace(tzinfo=tz)
+        return value
+
+    end = parse('end') or (now or timezone.now())
+    start = parse('start') or end - DEFAULT_RANGE
+    if start >= end:
+        raise ValueError("start must be before end")
+
+    start = align(start, bucket, tz)
+    end = align_up(end, bucket, tz)
+    max_buckets = settings.SERIES_MAX_BUCKETS
+    if (end - start) / BUCKETS[bucket] > max_buckets:
+        raise ValueError(
+            f"Range too large for bucket {bucket} (max {max_buckets} buckets); use a larger bucket"
+        )
+
+    return {'pollutant': pollutant, 'bucket': bucket, 'start': start, 'end': end}
+
+
+def station_series(station_id, pollutant, bucket, start, end):
+    """
+    Compute the bucketed series for one station and pollutant.
+
+    Returns:
+        tuple[str, list[tuple]]: Source ('rollup' or 'raw') and rows of
+        (bucket, count, min, max, mean) ordered by bucket.
+    """
+    model = ROLLUP_MODELS.get(bucket)
+    if model is not None:
+        rows = list(
+            model.objects.filter(
+                station_id=station_id,
+                pollutant=pollutant,
+                bucket__gte=start,
+                bucket__lt=end,
+            )
+            .order_by('bucket')
+            .values_list('bucket', 'count', 'min', 'max', 'mean')
+        )
+        return 'rollup', rows
+
+    with routing.read_connection(Measurement).cursor() as cursor:
+        cursor.execute(SQL_RAW_SERIES, {
+            'step': BUCKETS[bucket],
+            'origin': _origin(local_zone()),
+            'station': station_id,
+            'pollutant': pollutant,
+            'start': start,
+            'end': end,
+        })
+        return 'raw', cursor.fetchall()
+
+
+def format_points(rows, tz=None):
+    """Convert series rows into JSON-ready points with local timestamps."""
+    tz = tz or local_zone()
+    return [
+        {
+            't': bucket.astimezone(tz).isoformat(),
+            'count': count,
+            'min': minimum,
+            'max': maximum,
+            'mean': mean,
+        }
+        for bucket, count, minimum, maximum, mean in rows
+    ]
+
+
+def series_payload(station_id, params, max_points=None):
+    """
+    Response body of the series endpoint.
+
+    Parameters:
+        params (dict): Output of `parse_params`.
+        max_points (int | None): Downsample the buckets with LTTB; the
+            bucket holding the highest maximum is always kept.
+    """
+    source, rows = station_series(station_id, **params)
+    total = len(rows)
+    if max_points is not None and total > max_points:
+        x = [row[0].timestamp() for row in rows]
+        y = [row[4] for row in rows]
+        keep = [max(range(total), key=lambda i: rows[i][3])]
+        rows = [rows[i] for i in downsampling.downsample(x, y, max_points, keep=keep)]
+
+    return {
+        'station': station_id,
+        'pollutant': params['pollutant'],
+        'bucket': params['bucket'],
+        'start': params['start'],
+        'end': params['end'],
+        'timezone': local_zone().key,
+        'source': source,
+        'points_total': total,
+        'downsampled': total > len(rows),
+        'points': format_points(rows),
+    }
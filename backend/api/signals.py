@@ -0,0 +1,132 @@
+"""
+Model signal handlers.
+
+Maps every model change to the cached API responses it affects (see
+`api.caching`). Each handler invalidates the changed object's own detail
+and lists, plus the entries of other namespaces that embed its data:
+
+- Station: its institution (stations list and count), every device and
+  alert (`station_name`), and the vector tiles.
+- Institution / Admin: every station (`institution_name`, `admin_name`).
+- Device, Alert: the detail of their station (nested devices, counts,
+  recent alerts).
+- AlertPollutant, AlertReceive: their alert.
+
+User, Admin and AuthUser changes also drop the user's cached
+authentication record (see `api.auth_cache`), and StationConsult changes
+the cached station set of its AuthUser (see `api.access`).
+
+New alerts and alert pollutants are also published to the live alert
+stream (see `api.streams`).
+"""
+
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from . import caching, tiles, auth_cache, access, streams
+from .models import (
+    User, Admin, AuthUser, Institution, Station, Device, Alert, AlertPollutant, AlertReceive,
+    StationConsult,
+)
+
+
+def _previous(model, instance, field):
+    """Store the persisted value of `field` before an update."""
+    if instance.pk is None:
+        return None
+    return model.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(pre_save, sender=Station)
+def remember_station_institution(sender, instance, **kwargs):
+    instance._previous_institution_id = _previous(Station, instance, 'institution_id')
+
+
+@receiver(pre_save, sender=Device)
+def remember_device_station(sender, instance, **kwargs):
+    instance._previous_station_id = _previous(Device, instance, 'station_id')
+
+
+@receiver([post_save, post_delete], sender=Station)
+def invalidate_station(sender, instance, **kwargs):
+    caching.invalidate(caching.STATIONS, [instance.pk])
+    caching.invalidate(caching.INSTITUTIONS, {
+        instance.institution_id, getattr(instance, '_previous_institution_id', None)
+    })
+    caching.invalidate(caching.DEVICES, everything=True)
+    caching.invalidate(caching.ALERTS, everything=True)
+    tiles.invalidate()
+
+
+@receiver([post_save, post_delete], sender=Institution)
+def invalidate_institution(sender, instance, **kwargs):
+    caching.invalidate(caching.INSTITUTIONS, [instance.pk])
+    caching.invalidate(caching.STATIONS, everything=True)
+
+
+@receiver([post_save, post_delete], sender=Admin)
+def invalidate_admin(sender, instance, **kwargs):
+    caching.invalidate(caching.STATIONS, everything=True)
+    caching.invalidate(caching.INSTITUTIONS, everything=True)
+
+
+@receiver([post_save, post_delete], sender=Admin)
+@receiver([post_save, post_delete], sender=AuthUser)
+def invalidate_profile_user(sender, instance, **kwargs):
+    auth_cache.invalidate_user(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    auth_cache.invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def invalidate_admin_user(sender, instance, **kwargs):
+    # Admin names are shown on stations and institutions.
+    if Admin.objects.filter(user_id=instance.pk).exists():
+        invalidate_admin(Admin, instance)
+
+
+@receiver([post_save, post_delete], sender=Device)
+def invalidate_device(sender, instance, **kwargs):
+    caching.invalidate(caching.DEVICES, [instance.pk])
+    caching.invalidate(caching.STATIONS, {
+        instance.station_id, getattr(instance, '_previous_station_id', None)
+    }, lists=False)
+
+
+@receiver([post_save, post_delete], sender=Alert)
+def invalidate_alert(sender, instance, **kwargs):
+    caching.invalidate(caching.ALERTS, [instance.pk])
+    caching.invalidate(caching.STATIONS, [instance.station_id], lists=False)
+
+
+@receiver([post_save, post_delete], sender=AlertPollutant)
+def invalidate_alert_pollutant(sender, instance, **kwargs):
+    caching.invalidate(caching.ALERTS, [instance.alert_id])
+    station_id = Alert.objects.filter(pk=instance.alert_id).values_list('station_id', flat=True).first()
+    caching.invalidate(caching.STATIONS, [station_id], lists=False)
+
+
+@receiver([post_save, post_delete], sender=AlertReceive)
+def invalidate_alert_receive(sender, instance, **kwargs):
+    caching.invalidate(caching.ALERTS, [instance.alert_id], lists=False)
+
+
+@receiver([post_save, post_delete], sender=StationConsult)
+def invalidate_station_access(sender, instance, **kwargs):
+    access.invalidate(instance.auth_user_id)
+
+
+@receiver(post_save, sender=Alert)
+def publish_new_alert(sender, instance, created, **kwargs):
+    if created:
+        streams.publish_alert(instance)
+
+
+@receiver(post_save, sender=AlertPollutant)
+def publish_new_alert_pollutant(sender, instance, created, **kwargs):
+    if created:
+        station_id = Alert.objects.filter(pk=instance.alert_id).values_list('station_id', flat=True).first()
+        streams.publish_alert_pollutant(instance, station_id)
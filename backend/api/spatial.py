@@ -0,0 +1,92 @@
+"""
+Spatial query helpers for stations.
+
+`Station.location` is a geography(Point, 4326) column with a GiST index
+(`station_location_gist`, migration 0009). Nearest-station lookups order by
+the `<->` operator, which PostgreSQL answers by walking that index in
+distance order (KNN), so "the k nearest" costs O(k log n) instead of a
+distance computation for every station. On geography columns `<->` returns
+the spherical distance in metres.
+"""
+
+from django.contrib.gis.db.models import PointField
+from django.contrib.gis.geos import Point
+from django.db.models import F, FloatField, Func, Value
+from django.db.models.functions import Cast
+
+
+STATION_LOCATION_INDEX = 'station_location_gist'
+
+
+def geography_point(lon, lat):
+    """Return a geography-typed point expression for query parameters."""
+    return Cast(
+        Value(Point(lon, lat, srid=4326), output_field=PointField(srid=4326)),
+        PointField(geography=True, srid=4326),
+    )
+
+
+class KNNDistance(Func):
+    """
+    `field <-> point`: index-assisted KNN distance.
+
+    Use it in order_by (optionally annotated) together with a LIMIT; the
+    GiST index is only used when the query is ordered by this expression.
+    """
+    arg_joiner = ' <-> '
+    template = '%(expressions)s'
+    output_field = FloatField()
+
+    def __init__(self, field, lon, lat):
+        super().__init__(F(field), geography_point(lon, lat))
+
+
+def parse_nearby_params(params, max_k):
+    """
+    Read the `lat`, `lon`, `k` and `radius` query parameters of a nearby
+    lookup; radius defaults to 5000 m when k is not given.
+
+    Raises:
+        ValueError: With a message suitable for a 400 response.
+
+    Returns:
+        tuple: (lon, lat, k | None, radius | None)
+    """
+    lat = params.get('lat')
+    lon = params.get('lon')
+    k = params.get('k')
+    radius = params.get('radius')
+
+    if not lat or not lon:
+        raise ValueError('lat and lon parameters are required')
+
+    try:
+        lat = float(lat)
+        lon = float(lon)
+        if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+            raise ValueError
+        k = int(k) if k else None
+        if radius is None and k is None:
+            radius = 5000  # default 5km
+        radius = float(radius) if radius is not None else None
+    except (ValueError, TypeError):
+        raise ValueError('Invalid coordinates, k or radius')
+
+    if k is not None and not 1 <= k <= max_k:
+        raise ValueError(f'k must be between 1 and {max_k}')
+    return lon, lat, k, radius
+
+
+def nearby(queryset, lon, lat, k=None, radius=None):
+    """
+    Order `queryset` by KNN distance to the point, annotated as `distance`
+    (metres), optionally within `radius` metres and limited to `k` rows.
+    """
+    from django.contrib.gis.measure import D
+
+    queryset = queryset.annotate(distance=KNNDistance('location', lon, lat)).order_by('distance')
+    if radius is not None:
+        queryset = queryset.filter(location__dwithin=(Point(lon, lat, srid=4326), D(m=radius)))
+    if k is not None:
+        queryset = queryset[:k]
+    return queryset
@@ -0,0 +1,344 @@
+"""
+Live streams served as plain ASGI applications (routed in core/asgi.py):
+
+- GET /api/alerts/stream/: Server-Sent Events of new alerts;
+- /ws/readings/: WebSocket of new readings per station.
+
+They are not Django views because they have to notice client disconnects
+to release their subscription, which Django's ASGI handler does not report
+for streaming responses. Events come from the process-wide LISTEN
+connection in api.broadcast, so an idle client costs a queue, not
+database queries.
+
+Alert stream event types (the `data:` line is JSON):
+
+- `alert`: {"type", "id", "station", "alert_date", "attended", "pollutants"}
+  with `pollutants` = [{"pollutant", "level"}]; the SSE id is the alert id;
+- `alert_pollutant`: {"type", "id", "alert", "station", "pollutant",
+  "level", "recorded_at"}, for pollutants added to an existing alert.
+
+Clients authenticate with the access token in the Authorization header or,
+for EventSource (which cannot set headers), in `?token=`. Auth users only
+receive alerts of their granted stations (see api.access). On reconnect,
+alerts newer than Last-Event-ID (header or `?last_event_id=`) are replayed
+from the database first.
+
+Readings socket protocol (JSON text frames):
+
+- client: {"subscribe": [station ids]} / {"unsubscribe": [station ids]};
+  the server answers {"type": "subscribed", "stations": [...]} with the
+  stations actually followed (auth users are limited to their grants, at
+  most LIVE_MAX_STATIONS per connection);
+- server: {"type": "readings", "station": id, "t": "<ISO 8601>",
+  "values": {"PM25": 12.4, ...}}, the latest value of each pollutant of the
+  station in an ingested batch.
+
+Readings only matter while they are fresh: when a client falls behind,
+its oldest queued messages are dropped (see api.broadcast.Subscription).
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+
+from .auth_cache import CachedJWTAuthentication
+from .broadcast import (
+    broadcaster, encode, publish, publish_many, ALERTS_CHANNEL, READINGS_CHANNEL, OVERFLOW,
+)
+from .models import Alert
+from . import access
+
+
+STREAM_PATH = '/api/alerts/stream/'
+READINGS_PATH = '/ws/readings/'
+
+# WebSocket close codes
+CLOSE_UNAUTHORIZED = 4401
+
+
+# ---------------------------------------------------------------- events
+
+def alert_event(alert, pollutants=()):
+    """Event for a new alert and the (pollutant, level) pairs it carries."""
+    return {
+        'type': 'alert',
+        'id': alert.id,
+        'station': alert.station_id,
+        'alert_date': alert.alert_date,
+        'attended': alert.attended,
+        'pollutants': [{'pollutant': p, 'level': level} for p, level in pollutants],
+    }
+
+
+def alert_pollutant_event(alert_pollutant, station_id):
+    """Event for a pollutant added to an existing alert."""
+    return {
+        'type': 'alert_pollutant',
+        'id': alert_pollutant.id,
+        'alert': alert_pollutant.alert_id,
+        'station': station_id,
+        'pollutant': alert_pollutant.pollutant,
+        'level': alert_pollutant.level,
+        'recorded_at': alert_pollutant.recorded_at,
+    }
+
+
+def publish_alert(alert, pollutants=()):
+    publish(ALERTS_CHANNEL, alert_event(alert, pollutants))
+
+
+def publish_alerts(alerts_with_pollutants):
+    """Publish (alert, [(pollutant, level), ...]) pairs in one statement."""
+    publish_many(ALERTS_CHANNEL, [
+        alert_event(alert, pollutants) for alert, pollutants in alerts_with_pollutants
+    ])
+
+
+def publish_alert_pollutant(alert_pollutant, station_id):
+    publish(ALERTS_CHANNEL, alert_pollutant_event(alert_pollutant, station_id))
+
+
+def reading_events(batch):
+    """
+    One event per station of an ingested batch with the latest value of
+    each of its pollutants (keeps every NOTIFY payload small).
+    """
+    if len(batch) == 0:
+        return []
+    order = np.lexsort((batch.recorded_at, batch.pollutants, batch.station_ids))
+    stations = batch.station_ids[order]
+    pollutants = batch.pollutants[order]
+    # Last row of each (station, pollutant) group
+    last = np.flatnonzero(np.append(
+        (stations[1:] != stations[:-1]) | (pollutants[1:] != pollutants[:-1]), True
+    ))
+    timestamps = np.datetime_as_string(batch.recorded_at[order][last], unit='s', timezone='UTC')
+
+    events = {}
+    for station_id, pollutant, value, timestamp in zip(
+        stations[last].tolist(), pollutants[last].tolist(),
+        batch.values[order][last].tolist(), timestamps.tolist(),
+    ):
+        event = events.setdefault(station_id, {
+            'type': 'readings', 'station': station_id, 't': timestamp, 'values': {},
+        })
+        event['values'][pollutant] = round(value, 3)
+        event['t'] = max(event['t'], timestamp)
+    return list(events.values())
+
+
+def publish_readings(batch):
+    """Publish the readings of a batch (call inside the writing transaction)."""
+    publish_many(READINGS_CHANNEL, reading_events(batch))
+
+
+# ---------------------------------------------------------------- ASGI
+
+def _query(scope):
+    return {key: values[-1] for key, values in parse_qs(scope['query_string'].decode()).items()}
+
+
+def _header(scope, name):
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def _cors_headers(scope):
+    origin = _header(scope, b'origin')
+    if origin and (settings.CORS_ALLOW_ALL_ORIGINS or origin in settings.CORS_ALLOWED_ORIGINS):
+        return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    return []
+
+
+def _authenticate(scope, query):
+    """Return the user of the request token, or None."""
+    authorization = _header(scope, b'authorization') or ''
+    raw = authorization[7:] if authorization.startswith('Bearer ') else query.get('token')
+    if not raw:
+        return None
+    close_old_connections()
+    authentication = CachedJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+    finally:
+        close_old_connections()
+
+
+def _replay(last_id, station_ids):
+    """Alerts newer than `last_id` (at most LIVE_REPLAY_LIMIT), oldest first."""
+    close_old_connections()
+    try:
+        alerts = Alert.objects.filter(id__gt=last_id).prefetch_related('pollutants').order_by('id')
+        if station_ids is not None:
+            alerts = alerts.filter(station_id__in=station_ids)
+        return [
+            alert_event(alert, [(p.pollutant, p.level) for p in alert.pollutants.all()])
+            for alert in alerts[:settings.LIVE_REPLAY_LIMIT]
+        ]
+    finally:
+        close_old_connections()
+
+
+def _frame(event, payload=None):
+    lines = [f"event: {event['type']}"]
+    if event['type'] == 'alert':
+        lines.append(f"id: {event['id']}")
+    lines.append(f"data: {payload or encode(event)}")
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+async def _respond(send, status, body):
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json')],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def alert_stream(scope, receive, send):
+    """ASGI application serving the alert event stream."""
+    if scope['method'] != 'GET':
+        return await _respond(send, 405, b'{"error": "Method not allowed"}')
+
+    query = _query(scope)
+    user = await sync_to_async(_authenticate)(scope, query)
+    if user is None:
+        return await _respond(send, 401, b'{"error": "Authentication credentials were not provided or are invalid"}')
+    station_ids = await sync_to_async(access.station_scope)(user)
+
+    last_event_id = _header(scope, b'last-event-id') or query.get('last_event_id')
+    last_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    # Subscribe before replaying so nothing committed in between is lost.
+    subscription = broadcaster.subscribe(
+        ALERTS_CHANNEL,
+        accept=None if station_ids is None else (lambda event: event['station'] in station_ids),
+    )
+    disconnected = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+                *_cors_headers(scope),
+            ],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': f"retry: {settings.LIVE_RETRY_MILLISECONDS}\n\n".encode(),
+            'more_body': True,
+        })
+
+        if last_id is not None:
+            for event in await sync_to_async(_replay)(last_id, station_ids):
+                last_id = event['id']
+                await send({'type': 'http.response.body', 'body': _frame(event), 'more_body': True})
+
+        while not disconnected.done():
+            getter = asyncio.ensure_future(subscription.get(settings.LIVE_HEARTBEAT_SECONDS))
+            await asyncio.wait([getter, disconnected], return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                break
+            item = getter.result()
+            if item is OVERFLOW:
+                break
+            if item is None:
+                body = b': ping\n\n'
+            else:
+                event, payload = item
+                # Already sent by the replay
+                if event['type'] == 'alert' and last_id is not None and event['id'] <= last_id:
+                    continue
+                body = _frame(event, payload)
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    finally:
+        subscription.close()
+        disconnected.cancel()
+
+
+async def _close(send, code):
+    await send({'type': 'websocket.close', 'code': code})
+
+
+async def _send_readings(subscription, send):
+    while True:
+        item = await subscription.get()
+        if item is OVERFLOW:
+            return
+        event, payload = item
+        await send({'type': 'websocket.send', 'text': payload})
+
+
+async def readings_socket(scope, receive, send):
+    """ASGI application serving live readings over a WebSocket."""
+    if (await receive())['type'] != 'websocket.connect':
+        return
+
+    query = _query(scope)
+    user = await sync_to_async(_authenticate)(scope, query)
+    if user is None:
+        return await _close(send, CLOSE_UNAUTHORIZED)
+    allowed = await sync_to_async(access.station_scope)(user)
+    await send({'type': 'websocket.accept'})
+
+    followed = set()
+    subscription = broadcaster.subscribe(
+        READINGS_CHANNEL, accept=lambda event: event['station'] in followed, drop_oldest=True,
+    )
+    sender = asyncio.ensure_future(_send_readings(subscription, send))
+    try:
+        while True:
+            receiver = asyncio.ensure_future(receive())
+            await asyncio.wait([receiver, sender], return_when=asyncio.FIRST_COMPLETED)
+            if not receiver.done():
+                receiver.cancel()
+                break
+            message = receiver.result()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message['type'] != 'websocket.receive':
+                continue
+
+            try:
+                request = json.loads(message.get('text') or message.get('bytes') or '')
+                subscribe = {int(i) for i in request.get('subscribe', [])}
+                unsubscribe = {int(i) for i in request.get('unsubscribe', [])}
+            except (ValueError, TypeError, AttributeError):
+                await send({'type': 'websocket.send', 'text': '{"type":"error","error":"Invalid message"}'})
+                continue
+            if allowed is not None:
+                subscribe &= allowed
+            followed.difference_update(unsubscribe)
+            room = max(settings.LIVE_MAX_STATIONS - len(followed), 0)
+            followed.update(sorted(subscribe - followed)[:room])
+            await send({
+                'type': 'websocket.send',
+                'text': encode({'type': 'subscribed', 'stations': sorted(followed)}),
+            })
+    finally:
+        subscription.close()
+        sender.cancel()
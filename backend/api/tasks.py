@@ -0,0 +1,49 @@
+"""
+Background job handlers (see api/jobs.py).
+
+Payloads are JSON, so handlers take ids and plain values and load what
+they need themselves. Return values are stored in `Job.result`.
+"""
+
+from .jobs import task
+from .models import Alert
+from . import aqi, dashboard, heatmap, notifications, jobs
+
+
+@task('aqi.refresh')
+def refresh_aqi():
+    """Recompute the current AQI of every station."""
+    return {'rows': aqi.refresh()}
+
+
+@task('heatmap.refresh')
+def refresh_heatmap(pollutants=None):
+    """Recompute the interpolated surfaces of the given pollutants (all by default)."""
+    return {'pollutants': heatmap.refresh(pollutants)}
+
+
+@task('dashboard.refresh')
+def refresh_dashboard(station_ids=None, standard=None):
+    """Recompute the cached dashboard summary of a station scope."""
+    scope = frozenset(station_ids) if station_ids is not None else None
+    data = dashboard.refresh(scope, standard)
+    return {'stations': data['totals']['stations']}
+
+
+@task('alerts.notify')
+def notify_alert(alert_id, subscribers=False, auth_user_ids=None):
+    """Record the receivers of an alert (see api.notifications.fan_out)."""
+    alert = Alert.objects.filter(pk=alert_id).first()
+    if alert is None:
+        return None
+    if subscribers:
+        recipients = notifications.subscribers(alert)
+    else:
+        recipients = notifications.existing_auth_users(auth_user_ids or [])
+    return notifications.fan_out(alert, recipients)
+
+
+@task('jobs.purge')
+def purge_jobs(older_than_days=None):
+    """Delete old finished jobs."""
+    return {'deleted': jobs.purge(older_than_days)}
@@ -1,3 +1,1534 @@
-from django.test import TestCase
+import asyncio
+import io
+import os
+import runpy
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+import psycopg2
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import (
+    User, Admin, AuthUser, Institution, Station, Device, Alert, AlertPollutant,
+    AlertReceive, StationConsult, Job, JobStatus, AlertThreshold, Measurement, MeasurementHourly,
+    MeasurementDaily, StationAQI, StationRollingWindow,
+)
+from .spatial import KNNDistance, STATION_LOCATION_INDEX
+from . import (
+    access, heatmap, auth_cache, jobs, broadcast, streams, routing, dashboard, partitions, aqi,
+    alerting, rolling, downsampling, rollups, series,
+)
+from .ingest import MeasurementBatch, IngestValidationError, build_batch, ingest
+from .pagination import EstimatedCountPaginator, KeysetPagination
+from .parsers import CSVParser, NDJSONParser
+from .views import ALERT_KEYSET
+
+
+# Response caching would hide the queries being measured.
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+LOCAL_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+# Upper bound for any list/detail endpoint, whatever the page size.
+MAX_QUERIES = 8
+
+
+def create_institution(admin_user=None):
+    """
+    The DAGMA institution of the fixtures, administered by `admin_user`
+    (default: a new 'Owner' user).
+    """
+    if admin_user is None:
+        admin_user = User.objects.create_user('owner@vrisa.test', 'secret', name='Owner')
+    admin = Admin.objects.create(user=admin_user, access_level=1)
+    return Institution.objects.create(name='DAGMA', admin=admin)
+
+
+def create_station(institution, name='Station', north=0, **fields):
+    """A station in Cali, `north` steps of ~1.1 km north of the reference point."""
+    fields.setdefault('location', Point(-76.53, 3.45 + north * 0.01, srid=4326))
+    return Station.objects.create(name=name, institution=institution, **fields)
+
+
+@override_settings(CACHES=NO_CACHE)
+class QueryCountContractTests(APITestCase):
+    """
+    Query-count contract for the read endpoints.
+
+    Each endpoint must run the same number of queries for a small and a
+    large page (or a small and a large related set), and stay under
+    MAX_QUERIES. A serializer that goes back to the database per row breaks
+    the first assertion.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin@vrisa.test', 'secret', name='Admin')
+        admin = Admin.objects.create(user=cls.user, access_level=1)
+
+        cls.small_institution = Institution.objects.create(name='Small', admin=admin)
+        cls.large_institution = Institution.objects.create(name='Large', admin=admin)
+        for i in range(12):
+            Institution.objects.create(name=f'Institution {i}', admin=admin)
+
+        cls.small_station = cls._station(cls.small_institution, admin, 'Small station', 2)
+        cls._station(cls.small_institution, admin, 'Other station', 1)
+        cls.large_station = cls._station(cls.large_institution, admin, 'Large station', 12)
+        for i in range(11):
+            cls._station(cls.large_institution, admin, f'Station {i}', 1)
+
+    @staticmethod
+    def _station(institution, admin, name, related):
+        station = Station.objects.create(
+            name=name, institution=institution, admin=admin,
+            location=Point(-76.53, 3.45, srid=4326),
+        )
+        for i in range(related):
+            Device.objects.create(serial_number=f'{name}-{i}', type='SENSOR', station=station)
+            alert = Alert.objects.create(station=station)
+            AlertPollutant.objects.create(alert=alert, pollutant='PM25', level=40 + i)
+            AlertPollutant.objects.create(alert=alert, pollutant='PM10', level=80 + i)
+        return station
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries)
+
+    def assertConstantQueries(self, small_url, large_url):
+        small, large = self._queries(small_url), self._queries(large_url)
+        self.assertEqual(small, large, f'{large_url} grows with the number of rows')
+        self.assertLessEqual(large, MAX_QUERIES)
+
+    def test_station_list(self):
+        self.assertConstantQueries('/api/stations/?page_size=2', '/api/stations/?page_size=12')
+
+    def test_station_detail(self):
+        self.assertConstantQueries(
+            f'/api/stations/{self.small_station.id}/', f'/api/stations/{self.large_station.id}/'
+        )
+
+    def test_institution_list(self):
+        self.assertConstantQueries('/api/institutions/?page_size=2', '/api/institutions/?page_size=12')
+
+    def test_institution_detail(self):
+        self.assertConstantQueries(
+            f'/api/institutions/{self.small_institution.id}/',
+            f'/api/institutions/{self.large_institution.id}/',
+        )
+
+    def test_device_list(self):
+        self.assertConstantQueries('/api/devices/?page_size=2', '/api/devices/?page_size=12')
+
+    def test_alert_list(self):
+        self.assertConstantQueries('/api/alerts/?page_size=2', '/api/alerts/?page_size=12')
+
+    def test_counts_are_annotated(self):
+        response = self.client.get(f'/api/stations/{self.large_station.id}/')
+        properties = response.data['properties']
+        self.assertEqual(properties['devices_count'], 12)
+        self.assertEqual(properties['alerts_count'], 12)
+        self.assertEqual(len(properties['recent_alerts']), 10)
+
+        response = self.client.get(f'/api/institutions/{self.large_institution.id}/')
+        self.assertEqual(response.data['stations_count'], 12)
+        self.assertEqual(len(response.data['stations']), 12)
+
+
+class NearestStationTests(APITestCase):
+    """KNN nearest-station lookups and the GiST index they rely on."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('citizen@vrisa.test', 'secret', name='Citizen')
+        institution = create_institution()
+        # Stations every ~1.1 km north of the origin point
+        for i in range(20):
+            create_station(institution, f'Station {i}', north=i)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_k_nearest_without_radius(self):
+        response = self.client.get('/api/stations/nearby/', {'lat': 3.45, 'lon': -76.53, 'k': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([s['name'] for s in response.data], [f'Station {i}' for i in range(5)])
+        distances = [s['distance'] for s in response.data]
+        self.assertEqual(distances, sorted(distances))
+
+    def test_k_nearest_within_radius(self):
+        response = self.client.get(
+            '/api/stations/nearby/', {'lat': 3.45, 'lon': -76.53, 'k': 5, 'radius': 2500}
+        )
+        self.assertEqual(len(response.data), 3)
+
+    def test_k_out_of_range(self):
+        response = self.client.get('/api/stations/nearby/', {'lat': 3.45, 'lon': -76.53, 'k': 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_knn_query_uses_gist_index(self):
+        queryset = Station.objects.order_by(KNNDistance('location', -76.53, 3.45))[:5]
+        with transaction.atomic(), connection.cursor() as cursor:
+            # The test table is tiny; make the planner show whether the index is usable.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertIn(STATION_LOCATION_INDEX, plan)
+
+
+@override_settings(CACHES=NO_CACHE)
+class StationTileTests(APITestCase):
+    """Vector tiles built with ST_AsMVT."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('map@vrisa.test', 'secret', name='Map')
+        institution = create_institution(cls.user)
+        create_station(institution, 'Cali')
+        granted = create_station(institution, 'Granted', location=Point(-76.52, 3.46, srid=4326))
+        cls.reader = User.objects.create_user('reader@vrisa.test', 'secret', name='Reader')
+        StationConsult.objects.create(auth_user=AuthUser.objects.create(user=cls.reader), station=granted)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_tile_with_station(self):
+        # z=8 tile containing Cali
+        response = self.client.get('/api/tiles/8/73/125.mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/vnd.mapbox-vector-tile')
+        self.assertIn(b'stations', response.content)
+
+    def test_tile_station_scope(self):
+        response = self.client.get('/api/tiles/8/73/125.mvt')
+        self.assertIn(b'Cali', response.content)
+        self.client.force_authenticate(self.reader)
+        response = self.client.get('/api/tiles/8/73/125.mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Granted', response.content)
+        self.assertNotIn(b'Cali', response.content)
+
+    def test_empty_tile(self):
+        response = self.client.get('/api/tiles/8/0/0.mvt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+
+    def test_tile_out_of_range(self):
+        response = self.client.get('/api/tiles/2/4/0.mvt')
+        self.assertEqual(response.status_code, 404)
+
+
+class HeatmapInterpolationTests(SimpleTestCase):
+    """IDW surface and tile sampling."""
+
+    lons = np.array([-76.53, -76.50])
+    lats = np.array([3.45, 3.40])
+    values = np.array([10.0, 50.0])
+
+    def test_surface_is_bounded_and_exact_at_stations(self):
+        grid_lons = np.array([-76.53, -76.515, -76.50])
+        grid_lats = np.array([3.45, 3.425, 3.40])
+        surface = heatmap.idw(self.lons, self.lats, self.values, grid_lons, grid_lats)
+        self.assertAlmostEqual(surface[0, 0], 10.0, places=2)
+        self.assertAlmostEqual(surface[2, 2], 50.0, places=2)
+        self.assertTrue(((surface >= 10.0) & (surface <= 50.0)).all())
+
+    def test_blocked_surface_matches_a_single_block(self):
+        grid_lons, grid_lats = np.linspace(-76.6, -76.45, 7), np.linspace(3.5, 3.33, 5)
+        whole = heatmap.idw(self.lons, self.lats, self.values, grid_lons, grid_lats)
+        with mock.patch.object(heatmap, 'IDW_BLOCK_ELEMENTS', 1):
+            blocked = heatmap.idw(self.lons, self.lats, self.values, grid_lons, grid_lats)
+        np.testing.assert_allclose(blocked, whole, rtol=1e-6)
+
+    def test_tile_outside_bbox_is_transparent(self):
+        grid_lons, grid_lats = heatmap.grid_axes()
+        surface = heatmap.idw(self.lons, self.lats, self.values, grid_lons, grid_lats)
+        tile = heatmap.sample_tile(surface, 8, 0, 0, 16)
+        self.assertTrue(np.isnan(tile).all())
+        png = heatmap.encode_png(heatmap.colorize(tile, 37))
+        self.assertTrue(png.startswith(b'\x89PNG'))
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class CachedAuthenticationTests(APITestCase):
+    """Users and profiles resolved from the cache by CachedJWTAuthentication."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('cached@vrisa.test', 'secret', name='Cached')
+        Admin.objects.create(user=self.user, access_level=1)
+
+    def test_cached_user_needs_no_queries(self):
+        auth_cache.get_user(self.user.pk)
+        with CaptureQueriesContext(connection) as context:
+            user = auth_cache.get_user(self.user.pk)
+            self.assertTrue(hasattr(user, 'admin_profile'))
+            self.assertFalse(hasattr(user, 'auth_profile'))
+        self.assertEqual(len(context.captured_queries), 0)
+        self.assertEqual(user.email, 'cached@vrisa.test')
+
+    def test_profile_change_invalidates(self):
+        auth_cache.get_user(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.admin_profile.delete()
+        self.assertFalse(hasattr(auth_cache.get_user(self.user.pk), 'admin_profile'))
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class StationAccessScopeTests(APITestCase):
+    """Auth users only see the stations granted to them."""
+
+    def setUp(self):
+        institution = create_institution()
+        self.granted, self.other = (create_station(institution, name) for name in ('Granted', 'Other'))
+        user = User.objects.create_user('reader@vrisa.test', 'secret', name='Reader')
+        self.auth_user = AuthUser.objects.create(user=user)
+        StationConsult.objects.create(auth_user=self.auth_user, station=self.granted)
+        self.client.force_authenticate(user)
+
+    def _names(self):
+        response = self.client.get('/api/stations/')
+        return {station['name'] for station in response.data['results']}
+
+    def test_list_is_scoped_to_grants(self):
+        self.assertEqual(self._names(), {'Granted'})
+        response = self.client.get(f'/api/stations/{self.other.id}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_access_sets_are_read_from_the_primary(self):
+        cache.clear()
+        # A routed read would go to an alias that does not exist.
+        with mock.patch.object(routing.ReplicaRouter, 'db_for_read', return_value='replica_0'):
+            self.assertEqual(access.granted_station_ids(self.auth_user.pk), {self.granted.id})
+            user = auth_cache.get_user(self.auth_user.user_id)
+        self.assertEqual(user.auth_profile.pk, self.auth_user.pk)
+
+    def test_new_grant_is_visible(self):
+        self._names()
+        with self.captureOnCommitCallbacks(execute=True):
+            StationConsult.objects.create(auth_user=self.auth_user, station=self.other)
+        self.assertEqual(self._names(), {'Granted', 'Other'})
+
+
+@override_settings(CACHES=NO_CACHE, NOTIFY_BATCH_SIZE=10)
+class AlertFanOutTests(APITestCase):
+    """Bulk alert notification."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('notifier@vrisa.test', 'secret', name='Notifier')
+        station = create_station(create_institution(cls.user))
+        cls.alert = Alert.objects.create(station=station)
+        cls.auth_users = [
+            AuthUser.objects.create(
+                user=User.objects.create_user(f'reader{i}@vrisa.test', 'secret', name=f'Reader {i}')
+            )
+            for i in range(25)
+        ]
+        for auth_user in cls.auth_users[:20]:
+            StationConsult.objects.create(auth_user=auth_user, station=station)
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_subscribers_fan_out(self):
+        AlertReceive.objects.create(alert=self.alert, auth_user=self.auth_users[0])
+        response = self.client.post(
+            f'/api/alerts/{self.alert.id}/notify/', {'subscribers': True}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['recipients'], 20)
+        self.assertEqual(response.data['created'], 19)
+        self.assertEqual(response.data['already_notified'], 1)
+
+    def test_explicit_ids_skip_unknown(self):
+        ids = [auth_user.id for auth_user in self.auth_users] + [0]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(
+                f'/api/alerts/{self.alert.id}/notify/', {'auth_user_ids': ids}, format='json'
+            )
+        self.assertEqual(response.data['created'], 25)
+        self.assertLessEqual(len(context.captured_queries), MAX_QUERIES + 3)
+
+
+@override_settings(JOBS_ASYNC=True, JOB_MAX_ATTEMPTS=2, JOB_RETRY_BACKOFF_SECONDS=0)
+class JobQueueTests(TestCase):
+    """Claiming, retries and coalescing of background jobs."""
+
+    def setUp(self):
+        # A fresh handler per test, so call counts never leak between tests.
+        calls = []
+
+        def flaky(fail_times):
+            calls.append(1)
+            if len(calls) <= fail_times:
+                raise RuntimeError('boom')
+            return {'calls': len(calls)}
+
+        registry = mock.patch.dict(jobs._registry)
+        registry.start()
+        self.addCleanup(registry.stop)
+        jobs.task('tests.flaky')(flaky)
+
+    def test_unique_key_coalesces_pending_jobs(self):
+        self.assertIsNotNone(jobs.enqueue('tests.flaky', {'fail_times': 0}, unique_key='k'))
+        self.assertIsNone(jobs.enqueue('tests.flaky', {'fail_times': 0}, unique_key='k'))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_priority_order(self):
+        low = jobs.enqueue('tests.flaky', {'fail_times': 0})
+        high = jobs.enqueue('tests.flaky', {'fail_times': 0}, priority=5)
+        self.assertEqual(jobs.claim('w').id, high.id)
+        self.assertEqual(jobs.claim('w').id, low.id)
+        self.assertIsNone(jobs.claim('w'))
+
+    def test_retry_then_done(self):
+        job = jobs.enqueue('tests.flaky', {'fail_times': 1})
+        self.assertTrue(jobs.run_next('w'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatus.PENDING)
+        self.assertIn('boom', job.last_error)
+        self.assertTrue(jobs.run_next('w'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (JobStatus.DONE, 2, {'calls': 2}))
+
+    def test_failed_after_max_attempts(self):
+        job = jobs.enqueue('tests.flaky', {'fail_times': 5})
+        while jobs.run_next('w'):
+            pass
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (JobStatus.FAILED, 2))
+
+
+class LiveSubscriptionTests(SimpleTestCase):
+    """Bounded per-client queues of the live broadcaster."""
+
+    def test_slow_subscriber_is_dropped(self):
+        async def scenario():
+            broadcaster = broadcast.Broadcaster()
+            subscription = broadcast.Subscription(broadcaster, 'test', maxsize=2)
+            broadcaster._subscriptions['test'] = {subscription}
+            for i in range(3):
+                subscription.offer({'id': i}, str(i))
+            return await subscription.get(0.1), broadcaster._subscriptions
+
+        item, subscriptions = asyncio.run(scenario())
+        self.assertIs(item, broadcast.OVERFLOW)
+        self.assertEqual(subscriptions, {})
+
+    def test_filtered_events_are_not_queued(self):
+        async def scenario():
+            subscription = broadcast.Subscription(
+                broadcast.Broadcaster(), 'test', accept=lambda event: event['station'] == 1, maxsize=5,
+            )
+            subscription.offer({'station': 2}, '')
+            subscription.offer({'station': 1}, 'kept')
+            return await subscription.get(0.1), await subscription.get(0.01)
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, ({'station': 1}, 'kept'))
+        self.assertIsNone(second)
+
+    def test_drop_oldest_keeps_latest_events(self):
+        async def scenario():
+            subscription = broadcast.Subscription(
+                broadcast.Broadcaster(), 'test', maxsize=2, drop_oldest=True,
+            )
+            for i in range(4):
+                subscription.offer({'id': i}, str(i))
+            return [(await subscription.get(0.1))[1] for _ in range(2)], subscription.dropped
+
+        payloads, dropped = asyncio.run(scenario())
+        self.assertEqual(payloads, ['2', '3'])
+        self.assertEqual(dropped, 2)
+
+    @override_settings(LIVE_RECONNECT_SECONDS=60)
+    def test_connecting_does_not_block_the_loop(self):
+        def slow_connect(**kwargs):
+            time.sleep(0.3)
+            raise psycopg2.OperationalError('database is down')
+
+        async def scenario():
+            broadcaster = broadcast.Broadcaster()
+            started = time.monotonic()
+            subscription = broadcaster.subscribe('test')
+            await asyncio.sleep(0)
+            elapsed = time.monotonic() - started
+            await broadcaster._connecting
+            connected = broadcaster._connection
+            subscription.close()
+            return elapsed, connected
+
+        with mock.patch.object(broadcast.psycopg2, 'connect', side_effect=slow_connect) as connect:
+            elapsed, connected = asyncio.run(scenario())
+        self.assertLess(elapsed, 0.1)
+        self.assertIsNone(connected)
+        self.assertIn('connect_timeout', connect.call_args.kwargs)
+
+    def test_connection_finished_after_the_last_client_left_is_closed(self):
+        listener = mock.Mock()
+
+        def slow_connect(**kwargs):
+            time.sleep(0.1)
+            return listener
+
+        async def scenario():
+            broadcaster = broadcast.Broadcaster()
+            subscription = broadcaster.subscribe('test')
+            connecting = broadcaster._connecting
+            subscription.close()
+            await connecting
+            return broadcaster._connection
+
+        with mock.patch.object(broadcast.psycopg2, 'connect', side_effect=slow_connect):
+            self.assertIsNone(asyncio.run(scenario()))
+        listener.close.assert_called_once_with()
+
+    def test_reading_events_keep_latest_value_per_pollutant(self):
+        batch = MeasurementBatch(
+            device_ids=np.array([1, 1, 2, 1]),
+            station_ids=np.array([1, 1, 2, 1]),
+            pollutants=np.array(['PM25', 'PM25', 'O3', 'CO']),
+            values=np.array([1.0, 2.0, 3.0, 4.0]),
+            recorded_at=np.array(
+                ['2025-01-01T10:00', '2025-01-01T11:00', '2025-01-01T09:00', '2025-01-01T10:30'],
+                dtype='datetime64[us]',
+            ),
+        )
+        events = {event['station']: event for event in streams.reading_events(batch)}
+        self.assertEqual(events[1]['values'], {'PM25': 2.0, 'CO': 4.0})
+        self.assertEqual(events[1]['t'], '2025-01-01T11:00:00Z')
+        self.assertEqual(events[2]['values'], {'O3': 3.0})
+
+
+@override_settings(CACHES=NO_CACHE)
+class AsyncReadPathTests(APITestCase):
+    """The async views answer exactly like their sync counterparts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        institution = create_institution()
+        cls.stations = [create_station(institution, f'Station {i}', north=i) for i in range(3)]
+        Alert.objects.create(station=cls.stations[0])
+        user = User.objects.create_user('reader@vrisa.test', 'secret', name='Reader')
+        StationConsult.objects.create(
+            auth_user=AuthUser.objects.create(user=user), station=cls.stations[1],
+        )
+        cls.admin_token = str(AccessToken.for_user(institution.admin.user))
+        cls.reader_token = str(AccessToken.for_user(user))
+
+    def _get(self, path, token, **params):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.client.get(path, params)
+
+    def test_same_responses_as_sync(self):
+        for sync_path, async_path, params in [
+            ('/api/stations/', '/api/async/stations/', {'search': 'Station', 'ordering': 'name'}),
+            ('/api/stations/nearby/', '/api/async/stations/nearby/', {'lat': 3.45, 'lon': -76.53, 'k': 2}),
+            ('/api/alerts/', '/api/async/alerts/', {}),
+        ]:
+            with self.subTest(path=async_path):
+                expected = self._get(sync_path, self.admin_token, **params)
+                response = self._get(async_path, self.admin_token, **params)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json(), expected.json())
+
+    def test_station_scope_applies(self):
+        response = self._get('/api/async/stations/', self.reader_token)
+        self.assertEqual([s['name'] for s in response.json()['results']], ['Station 1'])
+        response = self._get(
+            f'/api/async/stations/{self.stations[0].id}/series/', self.reader_token, pollutant='PM25',
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_errors(self):
+        self.assertEqual(self.client.get('/api/async/stations/').status_code, 401)
+        response = self._get('/api/async/stations/nearby/', self.admin_token, lat=3.45)
+        self.assertEqual(response.status_code, 400)
+        response = self._get('/api/async/stations/', self.admin_token, page=9)
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_0'], REPLICA_MAX_LAG_SECONDS=None)
+class ReplicaRouterTests(SimpleTestCase):
+    """Reads of read-only requests go to a replica until the first write."""
+
+    def setUp(self):
+        self.router = routing.ReplicaRouter()
+
+    def test_reads_outside_replica_requests_use_primary(self):
+        self.assertIsNone(self.router.db_for_read(Station))
+
+    def test_read_your_writes(self):
+        with routing.replica_reads():
+            self.assertEqual(self.router.db_for_read(Station), 'replica_0')
+            self.assertEqual(self.router.db_for_write(Alert), 'default')
+            self.assertEqual(self.router.db_for_read(Station), 'default')
+            self.assertTrue(routing.read_from_replica())
+        self.assertIsNone(self.router.db_for_read(Station))
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=1, REPLICA_CACHE_TIMEOUT=10)
+    def test_lagging_replica_falls_back_to_primary(self):
+        routing._lag['replica_0'] = (time.monotonic(), 30.0)  # fresh check: 30 s behind
+        self.addCleanup(routing._lag.clear)
+        with routing.replica_reads():
+            self.assertEqual(self.router.db_for_read(Station), 'default')
+            self.assertEqual(routing.cache_timeout(300), 300)
+
+    def test_replicas_are_not_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica_0', 'api'))
+        self.assertTrue(self.router.allow_migrate('direct', 'api'))
+
+
+@override_settings(CACHES=LOCAL_CACHE, JOBS_ASYNC=False, DASHBOARD_FRESH_SECONDS=30)
+class DashboardSummaryTests(APITestCase):
+    """The dashboard summary aggregates in a few queries and is served stale while refreshing."""
+
+    @classmethod
+    def setUpTestData(cls):
+        institution = create_institution()
+        cls.stations = [
+            create_station(institution, f'Station {i}', north=i, status=status)
+            for i, status in enumerate(['active', 'active', 'maintenance'])
+        ]
+        Device.objects.create(serial_number='D-1', type='SENSOR', station=cls.stations[0])
+        Alert.objects.create(station=cls.stations[0])
+        Alert.objects.create(station=cls.stations[0])
+        Alert.objects.create(station=cls.stations[1], attended=True)
+        # Station 1 has its own, higher PM2.5 threshold.
+        AlertThreshold.objects.create(station=cls.stations[1], pollutant='PM25', level=80)
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        for station, bucket, peak in [
+            (cls.stations[0], hour, 50),
+            (cls.stations[0], hour - timedelta(hours=1), 20),
+            (cls.stations[1], hour, 50),
+            (cls.stations[0], hour - timedelta(hours=30), 90),
+        ]:
+            MeasurementHourly.objects.create(
+                station=station, pollutant='PM25', bucket=bucket,
+                count=1, min=peak, max=peak, mean=peak, sum=peak,
+            )
+        user = User.objects.create_user('reader@vrisa.test', 'secret', name='Reader')
+        StationConsult.objects.create(
+            auth_user=AuthUser.objects.create(user=user), station=cls.stations[1],
+        )
+        cls.admin_token = str(AccessToken.for_user(institution.admin.user))
+        cls.reader_token = str(AccessToken.for_user(user))
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, token, **params):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.client.get('/api/dashboard/summary/', params)
+
+    def test_summary(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = dashboard.compute()
+        self.assertLessEqual(len(queries), 5)
+        self.assertEqual(data['totals'], {
+            'stations': 3, 'active_stations': 2, 'devices': 1,
+            'unattended_alerts': 2, 'attended_alerts': 1, 'exceedance_hours_24h': 1,
+        })
+        self.assertEqual(data['stations_by_status']['inactive'], {'stations': 0, 'devices': 0})
+        self.assertEqual(data['unattended_alerts']['by_institution'][0]['count'], 2)
+        self.assertEqual(data['exceedances_24h']['by_pollutant'], [
+            {'pollutant': 'PM25', 'hours': 1, 'stations': 1},
+        ])
+
+    def test_station_scope_applies(self):
+        response = self._get(self.reader_token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['totals']['stations'], 1)
+        self.assertEqual(response.json()['unattended_alerts']['by_station'], [])
+        self.assertIn('stale-while-revalidate', response['Cache-Control'])
+        self.assertEqual(self._get(self.reader_token, standard='who').status_code, 400)
+
+    def test_stale_summary_is_served_then_refreshed(self):
+        key = dashboard.cache_key(None, 'colombia')
+        dashboard.summary()
+        entry = cache.get(key)
+        entry['stored_at'] -= 60
+        entry['data']['totals']['stations'] = -1
+        cache.set(key, entry)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            data, age = dashboard.summary()
+        self.assertEqual(data['totals']['stations'], -1)
+        self.assertGreaterEqual(age, 60)
+        data, age = dashboard.summary()
+        self.assertEqual(data['totals']['stations'], 3)
+        self.assertLess(age, 30)
+
+
+class IngestValidationTests(TestCase):
+    """Bad rows reject the whole batch with per-row errors; good batches go through COPY."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.station = create_station(create_institution())
+        cls.device = Device.objects.create(serial_number='D-1', type='SENSOR', station=cls.station)
+        cls.now = timezone.now()
+
+    def _row(self, **fields):
+        row = {
+            'device': self.device.id, 'pollutant': 'PM25', 'value': 12.5,
+            'recorded_at': (self.now - timedelta(minutes=5)).isoformat(),
+        }
+        row.update(fields)
+        return row
+
+    def _errors(self, rows):
+        with self.assertRaises(IngestValidationError) as context:
+            build_batch(rows, now=self.now)
+        return {error['row']: error['errors'] for error in context.exception.errors}
+
+    def test_bad_rows_are_reported(self):
+        errors = self._errors([
+            self._row(),
+            self._row(device=999999),
+            self._row(pollutant='XX'),
+            self._row(value=-1),
+            'not a row',
+        ])
+        self.assertNotIn(0, errors)
+        self.assertEqual(errors[1], ['unknown device'])
+        self.assertIn('pollutant must be one of', errors[2][0])
+        self.assertEqual(errors[3], ['value must be non-negative'])
+        self.assertEqual(errors[4], ['row must be an object'])
+
+    def test_nan_and_out_of_range_values_are_rejected(self):
+        errors = self._errors([
+            self._row(value=float('nan')),
+            self._row(value='abc'),
+            self._row(recorded_at=1e300),
+            self._row(recorded_at=float('inf')),
+            self._row(recorded_at='yesterday'),
+            self._row(recorded_at=(self.now + timedelta(hours=1)).isoformat()),
+        ])
+        self.assertEqual(errors[0], ['value must be a finite number'])
+        self.assertEqual(errors[1], ['value must be a finite number'])
+        for row in (2, 3, 4):
+            self.assertEqual(errors[row], ['recorded_at must be an ISO 8601 datetime or epoch seconds'])
+        self.assertEqual(errors[5], ['recorded_at is in the future'])
+
+    def test_readings_past_retention_are_rejected(self):
+        errors = self._errors([self._row(recorded_at=0), self._row()])
+        self.assertEqual(errors, {0: ['recorded_at is older than the retention window']})
+
+    def test_duplicate_rows_are_rejected(self):
+        errors = self._errors([self._row(), self._row(pollutant='PM10'), self._row(value=13)])
+        self.assertEqual(list(errors), [2])
+        self.assertEqual(errors[2], ['duplicate reading in batch'])
+
+    def test_csv_epoch_seconds(self):
+        epoch = int((self.now - timedelta(hours=1)).timestamp())
+        body = f'device,pollutant,value,recorded_at\n{self.device.id},PM25,12.5,{epoch}\n'
+        rows = CSVParser().parse(io.BytesIO(body.encode()))
+        batch = build_batch(rows, now=self.now)
+        self.assertEqual(batch.recorded_at.astype('datetime64[s]').astype(np.int64).tolist(), [epoch])
+
+    def test_non_utf8_ndjson_is_a_parse_error(self):
+        body = b'{"device": 1, "pollutant": "PM25", "value": 1}\n{"pollutant": "\xff"}\n'
+        with self.assertRaises(ParseError):
+            NDJSONParser().parse(io.BytesIO(body))
+
+    def test_batch_is_copied(self):
+        batch = ingest([
+            self._row(),
+            self._row(pollutant='PM10', value=30, recorded_at=(self.now - timedelta(hours=2)).timestamp()),
+        ], now=self.now)
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(batch.station_ids.tolist(), [self.station.id] * 2)
+        stored = Measurement.objects.filter(station=self.station).order_by('recorded_at')
+        self.assertEqual([(m.pollutant, m.value) for m in stored], [('PM10', 30.0), ('PM25', 12.5)])
+
+
+class PartitionTests(TestCase):
+    """Monthly partitions are created on demand and never silently re-used once detached."""
+
+    def setUp(self):
+        self.current = partitions.month_start(timezone.now())
+
+    def _attached(self):
+        return {start for _, start in partitions.list_partitions()}
+
+    def test_partitions_are_created_for_new_months(self):
+        month = partitions.add_months(self.current, 6)
+        self.assertNotIn(month, self._attached())
+        partitions.ensure_partitions_for([month + timedelta(days=3)])
+        self.assertIn(month, self._attached())
+        # Idempotent
+        partitions.ensure_partitions_for([month])
+
+    def test_detached_month_is_unavailable(self):
+        month = partitions.add_months(self.current, -2)
+        partitions.create_partition(month)
+        detached = partitions.detach_expired_partitions(retain_months=1)
+        self.assertIn(partitions.partition_name(month), detached)
+        self.assertNotIn(month, self._attached())
+
+        with self.assertRaises(partitions.PartitionUnavailable):
+            partitions.ensure_partitions_for([month])
+
+    def test_months_past_retention_are_rejected(self):
+        epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+        with self.assertRaises(partitions.PartitionUnavailable):
+            partitions.ensure_partitions_for([epoch])
+        self.assertNotIn(epoch, self._attached())
+
+
+class AQIComputationTests(SimpleTestCase):
+    """Sub-indices interpolate between the breakpoints of each standard."""
+
+    # (standard, pollutant, µg/m³, expected sub-index)
+    CASES = [
+        # Resolución 2254 de 2017
+        ('colombia', 'PM25', 0, 0),
+        ('colombia', 'PM25', 12, 50),
+        ('colombia', 'PM25', 24.5, 75),
+        ('colombia', 'PM25', 37, 100),
+        ('colombia', 'PM25', 55, 150),
+        ('colombia', 'PM25', 600, 500),
+        ('colombia', 'PM10', 100, 73),
+        ('colombia', 'O3', 138, 100),
+        # US EPA (2024 PM2.5 table; O3 70 ppb = 137.4 µg/m³)
+        ('us_epa', 'PM25', 9.0, 50),
+        ('us_epa', 'PM25', 12.0, 56),
+        ('us_epa', 'PM25', 35.4, 100),
+        ('us_epa', 'PM25', 55.4, 150),
+        ('us_epa', 'PM10', 154, 100),
+        ('us_epa', 'O3', 137.4, 100),
+    ]
+
+    def test_sub_indices(self):
+        for standard, pollutant, value, expected in self.CASES:
+            with self.subTest(standard=standard, pollutant=pollutant, value=value):
+                index = aqi.sub_indices(np.array([pollutant]), np.array([value]), standard)[0]
+                self.assertEqual(round(index), expected)
+
+    def test_invalid_readings_have_no_index(self):
+        index = aqi.sub_indices(np.array(['PM25', 'XX']), np.array([-1.0, 10.0]))
+        self.assertTrue(np.isnan(index).all())
+
+    def test_categories(self):
+        self.assertEqual(aqi.category(50), 'Buena')
+        self.assertEqual(aqi.category(51), 'Aceptable')
+        self.assertEqual(aqi.category(600, 'us_epa'), 'Hazardous')
+
+    def test_dominant_pollutant(self):
+        stations, indices, dominant, _ = aqi.station_indices(
+            [2, 1, 1, 2], ['PM25', 'PM25', 'PM10', 'O3'], [12, 37, 54, 138],
+        )
+        self.assertEqual(stations.tolist(), [1, 2])
+        self.assertEqual(np.round(indices).tolist(), [100, 100])
+        self.assertEqual(dominant.tolist(), ['PM25', 'O3'])
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class AQIRefreshTests(TestCase):
+    """refresh() stores the current AQI and expires stations without recent readings."""
+
+    @classmethod
+    def setUpTestData(cls):
+        institution = create_institution()
+        cls.fresh, cls.silent = [create_station(institution, name) for name in ('Fresh', 'Silent')]
+
+    def test_stations_without_recent_readings_are_expired(self):
+        now = timezone.now()
+        window = StationRollingWindow.objects.create(
+            station=self.fresh, pollutant='PM25', head=now,
+            slot_sums=[0] * 24, slot_counts=[0] * 24, avg_24h=37,
+        )
+        StationAQI.objects.create(
+            station=self.silent, standard='colombia', aqi=80, category='Aceptable',
+            dominant_pollutant='PM25', computed_at=now - timedelta(days=2),
+        )
+
+        self.assertEqual(aqi.refresh(now), 2)
+        rows = StationAQI.objects.values_list('station_id', 'standard', 'aqi')
+        self.assertEqual(sorted(rows), [(self.fresh.id, 'colombia', 100), (self.fresh.id, 'us_epa', 104)])
+
+        window.head = now - timedelta(days=1)
+        window.save()
+        self.assertEqual(aqi.refresh(now), 0)
+        self.assertFalse(StationAQI.objects.exists())
+
+
+@override_settings(ALERT_COOLDOWN_MINUTES=60)
+class AlertDecisionTests(SimpleTestCase):
+    """Hysteresis and cooldown of the threshold alert engine."""
+
+    KEY = alerting.state_key(1, 'PM25')
+
+    def _decide(self, peak, latest, state=None, now=10_000, clear_level=33.3):
+        pairs = np.array([(1, 'PM25')], dtype=alerting._PAIR_DTYPE)
+        peak_time = np.datetime64('2025-01-01T10:00', 'us') if not np.isnan(peak) else np.datetime64('NaT')
+        return alerting.decide(
+            pairs, np.array([peak]), np.array([peak_time], dtype='datetime64[us]'),
+            np.array([latest]), np.array([clear_level]),
+            {self.KEY: state} if state else {}, now,
+        )
+
+    def test_breach_raises(self):
+        fired, changed = self._decide(peak=50, latest=50)
+        self.assertEqual([(s, p, peak) for s, p, peak, _ in fired], [(1, 'PM25', 50)])
+        self.assertEqual(fired[0][3], datetime(2025, 1, 1, 10, tzinfo=dt_timezone.utc))
+        self.assertEqual(changed, {self.KEY: {'active': True, 'last_alert': 10_000}})
+
+    def test_no_breach_keeps_state(self):
+        self.assertEqual(self._decide(peak=np.nan, latest=20), ([], {}))
+
+    def test_escalation_while_active_does_not_raise_again(self):
+        state = {'active': True, 'last_alert': 0}
+        fired, changed = self._decide(peak=120, latest=120, state=state)
+        self.assertEqual((fired, changed), ([], {}))
+
+    def test_hysteresis_clears_below_clear_level(self):
+        state = {'active': True, 'last_alert': 0}
+        # Below the threshold but above the clear level: still active
+        self.assertEqual(self._decide(peak=np.nan, latest=35, state=state), ([], {}))
+        fired, changed = self._decide(peak=np.nan, latest=30, state=state)
+        self.assertEqual(fired, [])
+        self.assertEqual(changed, {self.KEY: {'active': False, 'last_alert': 0}})
+
+    def test_cooldown_blocks_a_new_alert(self):
+        state = {'active': False, 'last_alert': 10_000 - 60}
+        self.assertEqual(self._decide(peak=50, latest=50, state=state)[0], [])
+        state = {'active': False, 'last_alert': 10_000 - 3600}
+        self.assertEqual(len(self._decide(peak=50, latest=50, state=state)[0]), 1)
+
+    def test_peak_time_is_the_time_of_the_highest_breach(self):
+        batch = MeasurementBatch(
+            device_ids=np.array([1, 1, 1]),
+            station_ids=np.array([1, 1, 1]),
+            pollutants=np.array(['PM25', 'PM25', 'PM25']),
+            values=np.array([40.0, 90.0, 10.0]),
+            recorded_at=np.array(
+                ['2025-01-01T09:00', '2025-01-01T10:00', '2025-01-01T11:00'], dtype='datetime64[us]',
+            ),
+        )
+        _, peaks, peak_times, latest, _ = alerting.evaluate(batch, {(None, 'PM25'): (37.0, 33.3)})
+        self.assertEqual(peaks.tolist(), [90.0])
+        self.assertEqual(peak_times.tolist(), [datetime(2025, 1, 1, 10)])
+        self.assertEqual(latest.tolist(), [10.0])
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class AlertStateCommitTests(TestCase):
+    """Alert state reaches the cache only when the batch commits."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.station = create_station(create_institution())
+
+    def setUp(self):
+        cache.clear()
+        self.key = alerting.state_key(self.station.id, 'PM25')
+
+    def _batch(self):
+        return MeasurementBatch(
+            device_ids=np.array([1]), station_ids=np.array([self.station.id]),
+            pollutants=np.array(['PM25']), values=np.array([500.0]),
+            recorded_at=np.array(['2025-01-01T10:00'], dtype='datetime64[us]'),
+        )
+
+    def test_state_is_written_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            alerts = alerting.process_batch(self._batch())
+            self.assertIsNone(cache.get(self.key))
+        self.assertEqual(len(alerts), 1)
+        self.assertTrue(cache.get(self.key)['active'])
+
+    def test_rolled_back_batch_leaves_no_state(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                alerting.process_batch(self._batch())
+                raise RuntimeError('ingest failed')
+        self.assertIsNone(cache.get(self.key))
+        self.assertFalse(Alert.objects.exists())
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class RollingWindowTests(TestCase):
+    """Incremental 1h/8h/24h averages match a full recomputation."""
+
+    HOUR = 480000  # hours since the epoch
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.station = create_station(create_institution())
+
+    def _apply(self, state, hours, values):
+        keys = np.empty(len(hours), dtype=rolling._KEY_DTYPE)
+        keys['station'] = 1
+        keys['pollutant'] = 'PM25'
+        keys['hour'] = [self.HOUR + hour for hour in hours]
+        states = {(1, 'PM25'): state} if state else {}
+        [state] = rolling._apply(states, keys, np.array(values, dtype=float), np.ones(len(hours), int))
+        return state
+
+    def _averages(self, state):
+        return state.avg_1h, state.avg_8h, state.avg_24h
+
+    def test_window_averages(self):
+        state = self._apply(None, range(10), range(10))
+        self.assertEqual(self._averages(state), (9.0, 5.5, 4.5))
+        self.assertEqual((state.hours_8h, state.hours_24h), (8, 10))
+
+    def test_incremental_matches_single_pass(self):
+        state = self._apply(None, range(5), range(5))
+        state = self._apply(state, range(5, 10), range(5, 10))
+        self.assertEqual(self._averages(state), (9.0, 5.5, 4.5))
+
+    def test_late_reading_updates_its_hour(self):
+        state = self._apply(None, range(10), range(10))
+        state = self._apply(state, [8], [18])  # hour 8 mean: 8 -> 13
+        self.assertEqual(self._averages(state), (9.0, 6.125, 5.0))
+
+    def test_gap_longer_than_window_resets(self):
+        state = self._apply(None, range(10), range(10))
+        state = self._apply(state, [40], [7])
+        self.assertEqual(self._averages(state), (7.0, 7.0, 7.0))
+        self.assertEqual(state.hours_24h, 1)
+
+    def test_batches_create_one_window(self):
+        def batch(hour, value):
+            return MeasurementBatch(
+                device_ids=np.array([1]), station_ids=np.array([self.station.id]),
+                pollutants=np.array(['PM25']), values=np.array([value]),
+                recorded_at=np.array([hour * 3600 * 10**6], dtype='datetime64[us]'),
+            )
+
+        rolling.update_for_batch(batch(self.HOUR, 10.0))
+        rolling.update_for_batch(batch(self.HOUR + 1, 20.0))
+        window = StationRollingWindow.objects.get(station=self.station, pollutant='PM25')
+        self.assertEqual((window.avg_1h, window.avg_24h, window.hours_24h), (20.0, 15.0, 2))
+
+
+class DownsamplingTests(SimpleTestCase):
+    """LTTB keeps the shape of a series within the requested size."""
+
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.x = 1.7e9 + np.arange(1000) * 60.0
+        self.y = rng.random(1000)
+        self.y[123] = 50.0
+        self.y[877] = -20.0
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        indices = downsampling.lttb(self.x, self.y, 50)
+        self.assertEqual(len(indices), 50)
+        self.assertEqual((indices[0], indices[-1]), (0, 999))
+        self.assertIn(123, indices)
+        self.assertIn(877, indices)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_forced_indices_stay_within_max_points(self):
+        # A flat series gives LTTB no reason to pick the forced points.
+        y = np.ones(1000)
+        for max_points in (3, 10, 50, 999):
+            with self.subTest(max_points=max_points):
+                indices = downsampling.downsample(self.x, y, max_points, keep=[500, 501])
+                self.assertLessEqual(len(indices), max(max_points, downsampling.MIN_POINTS + 2))
+                self.assertIn(500, indices)
+                self.assertIn(501, indices)
+                self.assertEqual((indices[0], indices[-1]), (0, 999))
+
+    def test_short_series_is_returned_whole(self):
+        indices = downsampling.downsample(self.x[:10], self.y[:10], 50, keep=[3])
+        self.assertEqual(list(indices), list(range(10)))
+
+    def test_parse_max_points(self):
+        self.assertIsNone(downsampling.parse_max_points({}))
+        self.assertEqual(downsampling.parse_max_points({'max_points': '200'}), 200)
+        for raw in ('abc', '2'):
+            with self.subTest(raw=raw), self.assertRaises(ValueError):
+                downsampling.parse_max_points({'max_points': raw})
+
+
+@override_settings(CACHES=NO_CACHE)
+class StationAlertLevelsTests(APITestCase):
+    """Alert levels chart endpoint, kept apart from the alerts list."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin@vrisa.test', 'secret', name='Admin')
+        cls.station = create_station(create_institution(cls.user))
+        start = datetime(2024, 5, 1, tzinfo=dt_timezone.utc)
+        for i in range(40):
+            alert = Alert.objects.create(station=cls.station)
+            AlertPollutant.objects.create(
+                alert=alert, pollutant='PM25', level=90.0 if i == 17 else 40.0 + i % 3,
+                recorded_at=start + timedelta(minutes=10 * i),
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _url(self, action):
+        return f'/api/stations/{self.station.id}/{action}/'
+
+    def test_unknown_pollutant_is_rejected(self):
+        for params in ({}, {'pollutant': 'XYZ'}):
+            with self.subTest(params=params):
+                response = self.client.get(self._url('alert-levels'), params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_invalid_max_points_is_rejected(self):
+        response = self.client.get(self._url('alert-levels'), {'pollutant': 'PM25', 'max_points': 1})
+        self.assertEqual(response.status_code, 400)
+
+    def test_full_series(self):
+        response = self.client.get(self._url('alert-levels'), {'pollutant': 'pm25'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['pollutant'], 'PM25')
+        self.assertEqual(response.data['points_total'], 40)
+        self.assertFalse(response.data['downsampled'])
+        times = [point['t'] for point in response.data['points']]
+        self.assertEqual(times, sorted(times))
+
+    def test_downsampled_series_keeps_the_peak(self):
+        response = self.client.get(
+            self._url('alert-levels'), {'pollutant': 'PM25', 'max_points': 10}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.data['downsampled'])
+        self.assertLessEqual(len(response.data['points']), 10)
+        self.assertIn(90.0, [point['level'] for point in response.data['points']])
+
+    def test_granted_auth_user_can_read(self):
+        reader = User.objects.create_user('reader@vrisa.test', 'secret', name='Reader')
+        StationConsult.objects.create(auth_user=AuthUser.objects.create(user=reader), station=self.station)
+        self.client.force_authenticate(reader)
+        response = self.client.get(self._url('alert-levels'), {'pollutant': 'PM25'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['points_total'], 40)
+
+    def test_alerts_list_ignores_max_points(self):
+        plain = self.client.get(self._url('alerts'))
+        with_max_points = self.client.get(self._url('alerts'), {'max_points': 10})
+        self.assertEqual(with_max_points.status_code, 200)
+        self.assertEqual(with_max_points.data, plain.data)
+
+
+@override_settings(CACHES=NO_CACHE)
+class KeysetPaginationTests(APITestCase):
+    """Cursor pages cover every row exactly once, ties on the date included."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin@vrisa.test', 'secret', name='Admin')
+        cls.station = create_station(create_institution(cls.user))
+        alerts = [Alert.objects.create(station=cls.station) for _ in range(11)]
+        # Three alerts share each date, so page boundaries fall inside ties.
+        start = datetime(2024, 5, 1, tzinfo=dt_timezone.utc)
+        for i, alert in enumerate(alerts):
+            Alert.objects.filter(pk=alert.pk).update(alert_date=start + timedelta(hours=i // 3))
+        cls.expected = list(Alert.objects.order_by('-alert_date', '-id').values_list('id', flat=True))
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def _walk(self, url):
+        ids, params, pages = [], {'pagination': 'cursor', 'page_size': 2}, 0
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids.extend(row['id'] for row in response.data['results'])
+            url, params, pages = response.data['next'], None, pages + 1
+        return ids, pages
+
+    def test_alerts_round_trip(self):
+        ids, pages = self._walk('/api/alerts/')
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 6)
+
+    def test_station_alerts_round_trip(self):
+        ids, _ = self._walk(f'/api/stations/{self.station.id}/alerts/')
+        self.assertEqual(ids, self.expected)
+
+    def test_cursor_encodes_the_ordering_key(self):
+        paginator = KeysetPagination(ALERT_KEYSET)
+        alert = Alert.objects.get(pk=self.expected[4])
+        key = paginator.decode_cursor(Alert.objects.all(), paginator.encode_cursor(alert))
+        self.assertEqual(key, [alert.alert_date, alert.id])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/alerts/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CACHES=LOCAL_CACHE)
+class ResponseCacheInvalidationTests(APITestCase):
+    """Cached list/retrieve responses are dropped when the models change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin@vrisa.test', 'secret', name='Admin')
+        cls.station = create_station(create_institution(cls.user))
+        cls.alert = Alert.objects.create(station=cls.station)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+
+    def _station_name(self):
+        return self.client.get(f'/api/stations/{self.station.id}/').data['name']
+
+    def _alert_list(self):
+        return self.client.get('/api/alerts/').data['results']
+
+    def test_station_save_invalidates_its_detail(self):
+        self.assertEqual(self._station_name(), 'Station')
+        # Bulk updates send no signals: the cached response is still served.
+        Station.objects.filter(pk=self.station.pk).update(name='Bulk')
+        self.assertEqual(self._station_name(), 'Station')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.station.name = 'Renamed'
+            self.station.save()
+        self.assertEqual(self._station_name(), 'Renamed')
+
+    def test_station_save_invalidates_alert_station_names(self):
+        self.assertEqual(self._alert_list()[0]['station_name'], 'Station')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.station.name = 'Renamed'
+            self.station.save()
+        self.assertEqual(self._alert_list()[0]['station_name'], 'Renamed')
+
+    def test_alert_save_invalidates_list_and_detail(self):
+        self.assertFalse(self._alert_list()[0]['attended'])
+        self.assertFalse(self.client.get(f'/api/alerts/{self.alert.id}/').data['attended'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.alert.attended = True
+            self.alert.save()
+        self.assertTrue(self._alert_list()[0]['attended'])
+        self.assertTrue(self.client.get(f'/api/alerts/{self.alert.id}/').data['attended'])
+
+    def test_no_invalidation_before_commit(self):
+        self._alert_list()
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.alert.attended = True
+            self.alert.save()
+        self.assertFalse(self._alert_list()[0]['attended'])
+        self.assertTrue(callbacks)
+
+
+@override_settings(CACHES=NO_CACHE)
+class EstimatedCountPaginatorTests(APITestCase):
+    """Planner estimates replace COUNT(*) only above the threshold."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('admin@vrisa.test', 'secret', name='Admin')
+        cls.station = create_station(create_institution(cls.user))
+        for i in range(30):
+            Alert.objects.create(station=cls.station, attended=i % 2 == 0)
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Alert._meta.db_table}')
+
+    def test_exact_count_below_threshold(self):
+        self._analyze()
+        paginator = EstimatedCountPaginator(Alert.objects.order_by('id'), 20)
+        self.assertEqual(paginator.count, 30)
+        self.assertFalse(paginator.is_estimate)
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=1)
+    def test_table_estimate_above_threshold(self):
+        self._analyze()
+        paginator = EstimatedCountPaginator(Alert.objects.order_by('id'), 20)
+        self.assertEqual(paginator.count, 30)  # reltuples is exact for a fully sampled table
+        self.assertTrue(paginator.is_estimate)
+
+    @override_settings(PAGINATION_ESTIMATE_THRESHOLD=1)
+    def test_filtered_estimate_serves_pages_past_the_estimate(self):
+        self._analyze()
+        paginator = EstimatedCountPaginator(Alert.objects.filter(attended=True).order_by('id'), 5)
+        self.assertGreater(paginator.count, 0)
+        self.assertTrue(paginator.is_estimate)
+        self.assertEqual(len(paginator.page(3).object_list), 5)
+        self.assertEqual(len(paginator.page(10).object_list), 0)
+
+    def test_response_flags_exact_counts(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get('/api/alerts/')
+        self.assertEqual(response.data['count'], 30)
+        self.assertFalse(response.data['count_is_estimate'])
+
+
+class RollupRefreshTests(TestCase):
+    """Hourly and daily rollups recompute exactly the buckets a batch touched."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.station = create_station(create_institution())
+        cls.device = Device.objects.create(serial_number='D-1', type='SENSOR', station=cls.station)
+        # 02:00 local time yesterday: the hours used below share one local day.
+        cls.hour = rollups.local_midnight(timezone.now() - timedelta(days=1)) + timedelta(hours=2)
+        cls.day = rollups.local_midnight(cls.hour)
+
+    def _insert(self, readings):
+        """Store (minutes after self.hour, value) readings and return their batch."""
+        times = [self.hour + timedelta(minutes=minutes) for minutes, _ in readings]
+        partitions.ensure_partitions_for(times)
+        Measurement.objects.bulk_create([
+            Measurement(device=self.device, station=self.station, pollutant='PM25', value=value, recorded_at=t)
+            for t, (_, value) in zip(times, readings)
+        ])
+        return MeasurementBatch(
+            device_ids=np.full(len(readings), self.device.id),
+            station_ids=np.full(len(readings), self.station.id),
+            pollutants=np.array(['PM25'] * len(readings)),
+            values=np.array([value for _, value in readings], dtype=float),
+            recorded_at=np.array([t.replace(tzinfo=None) for t in times], dtype='datetime64[us]'),
+        )
+
+    def _hourly(self):
+        return list(
+            MeasurementHourly.objects.filter(station=self.station)
+            .order_by('bucket').values_list('bucket', 'count', 'min', 'max', 'mean', 'sum')
+        )
+
+    def _daily(self):
+        return list(
+            MeasurementDaily.objects.filter(station=self.station)
+            .values_list('bucket', 'count', 'min', 'max', 'mean', 'sum')
+        )
+
+    def test_local_midnight(self):
+        value = datetime(2024, 5, 1, 3, tzinfo=dt_timezone.utc)  # 22:00 on April 30 in Bogota
+        self.assertEqual(
+            rollups.local_midnight(value, 'America/Bogota'),
+            datetime(2024, 4, 30, 5, tzinfo=dt_timezone.utc),
+        )
+
+    def test_touched_hours_are_distinct(self):
+        batch = self._insert([(10, 10.0), (40, 20.0), (70, 30.0)])
+        keys = rollups.touched_hours(batch)
+        self.assertEqual(len(keys), 2)
+        self.assertEqual(keys['station'].tolist(), [self.station.id] * 2)
+
+    def test_refresh_for_batch(self):
+        rollups.refresh_for_batch(self._insert([(10, 10.0), (40, 20.0), (70, 30.0)]))
+        next_hour = self.hour + timedelta(hours=1)
+        self.assertEqual(self._hourly(), [
+            (self.hour, 2, 10.0, 20.0, 15.0, 30.0),
+            (next_hour, 1, 30.0, 30.0, 30.0, 30.0),
+        ])
+        self.assertEqual(self._daily(), [(self.day, 3, 10.0, 30.0, 20.0, 60.0)])
+
+    def test_late_reading_recomputes_only_its_buckets(self):
+        rollups.refresh_for_batch(self._insert([(10, 10.0), (70, 30.0)]))
+        # Stored but not refreshed: the next hour's rollup must not change.
+        self._insert([(80, 50.0)])
+        rollups.refresh_for_batch(self._insert([(5, 40.0)]))
+
+        hourly = self._hourly()
+        self.assertEqual(hourly[0][1:], (2, 10.0, 40.0, 25.0, 50.0))
+        self.assertEqual(hourly[1][1:], (1, 30.0, 30.0, 30.0, 30.0))
+        # The daily row is rebuilt from the hourly rows, not from raw readings.
+        self.assertEqual(self._daily(), [(self.day, 3, 10.0, 40.0, 80.0 / 3, 80.0)])
+
+    def test_rebuild_widens_partial_hours(self):
+        rollups.refresh_for_batch(self._insert([(10, 10.0), (40, 20.0)]))
+        start, end = rollups.rebuild(self.hour + timedelta(minutes=30), self.hour + timedelta(minutes=45))
+        self.assertEqual((start, end), (self.hour, self.hour + timedelta(hours=1)))
+        self.assertEqual(self._hourly(), [(self.hour, 2, 10.0, 20.0, 15.0, 30.0)])
+        self.assertEqual(self._daily(), [(self.day, 2, 10.0, 20.0, 15.0, 30.0)])
+
+    def test_rebuild_removes_buckets_without_readings(self):
+        rollups.refresh_for_batch(self._insert([(10, 10.0), (70, 30.0)]))
+        Measurement.objects.filter(recorded_at__gte=self.hour + timedelta(hours=1)).delete()
+        rollups.rebuild(self.day, self.day + timedelta(days=1))
+        self.assertEqual(self._hourly(), [(self.hour, 1, 10.0, 10.0, 10.0, 10.0)])
+        self.assertEqual(self._daily(), [(self.day, 1, 10.0, 10.0, 10.0, 10.0)])
+
+        Measurement.objects.all().delete()
+        rollups.rebuild(self.day, self.day + timedelta(days=1))
+        self.assertEqual((self._hourly(), self._daily()), ([], []))
+
+    def test_rebuild_matches_incremental_refresh(self):
+        batch = self._insert([(10, 10.0), (40, 20.0), (70, 30.0)])
+        rollups.refresh_for_batch(batch)
+        hourly, daily = self._hourly(), self._daily()
+        MeasurementHourly.objects.all().delete()
+        MeasurementDaily.objects.all().delete()
+        rollups.rebuild(self.day, self.day + timedelta(days=1))
+        self.assertEqual(self._hourly(), hourly)
+        self.assertEqual(self._daily(), daily)
+
+
+@override_settings(STATION_TIME_ZONE='America/Bogota', SERIES_MAX_BUCKETS=1000)
+class SeriesParamsTests(SimpleTestCase):
+    """Bucket alignment in local time and validation of series parameters."""
+
+    NOW = datetime(2024, 5, 1, 12, tzinfo=dt_timezone.utc)
+
+    def test_align(self):
+        value = datetime(2024, 5, 1, 3, 7, 30, tzinfo=dt_timezone.utc)  # 22:07:30 on April 30 in Bogota
+        cases = [
+            ('1m', datetime(2024, 4, 30, 22, 7)),
+            ('5m', datetime(2024, 4, 30, 22, 5)),
+            ('1h', datetime(2024, 4, 30, 22)),
+            ('1d', datetime(2024, 4, 30)),
+        ]
+        tz = series.local_zone()
+        for bucket, expected in cases:
+            with self.subTest(bucket=bucket):
+                self.assertEqual(series.align(value, bucket), expected.replace(tzinfo=tz))
+
+    def test_defaults(self):
+        params = series.parse_params({'pollutant': 'pm25'}, now=self.NOW)
+        self.assertEqual((params['pollutant'], params['bucket'], params['end']), ('PM25', '1h', self.NOW))
+        self.assertEqual(params['start'], self.NOW - series.DEFAULT_RANGE)
+
+    def test_naive_datetimes_are_local(self):
+        params = series.parse_params(
+            {'pollutant': 'NO2', 'bucket': '1d', 'start': '2024-04-28T10:30:00', 'end': '2024-05-01T00:00:00'},
+        )
+        tz = series.local_zone()
+        self.assertEqual(params['start'], datetime(2024, 4, 28, tzinfo=tz))
+        self.assertEqual(params['end'], datetime(2024, 5, 1, tzinfo=tz))
+
+    def test_range_is_widened_to_whole_buckets(self):
+        tz = series.local_zone()
+        cases = [
+            ('1h', datetime(2024, 4, 30, 10), datetime(2024, 4, 30, 13)),
+            ('5m', datetime(2024, 4, 30, 10, 20), datetime(2024, 4, 30, 12, 10)),
+            ('1d', datetime(2024, 4, 30), datetime(2024, 5, 1)),
+        ]
+        for bucket, start, end in cases:
+            with self.subTest(bucket=bucket):
+                params = series.parse_params({
+                    'pollutant': 'PM25', 'bucket': bucket,
+                    'start': '2024-04-30T10:20:00', 'end': '2024-04-30T12:10:00',
+                })
+                self.assertEqual(
+                    (params['start'], params['end']), (start.replace(tzinfo=tz), end.replace(tzinfo=tz)),
+                )
+
+    def test_invalid_params(self):
+        cases = [
+            ({}, 'pollutant must be one of'),
+            ({'pollutant': 'XYZ'}, 'pollutant must be one of'),
+            ({'pollutant': 'PM25', 'bucket': '2h'}, 'bucket must be one of'),
+            ({'pollutant': 'PM25', 'start': 'yesterday'}, 'start must be an ISO 8601 datetime'),
+            ({'pollutant': 'PM25', 'start': '2024-05-02T00:00:00'}, 'start must be before end'),
+            ({'pollutant': 'PM25', 'bucket': '1m', 'start': '2024-04-29T00:00:00'}, 'Range too large'),
+        ]
+        for params, message in cases:
+            with self.subTest(params=params), self.assertRaisesMessage(ValueError, message):
+                series.parse_params(params, now=self.NOW)
+
+
+class SeriesPayloadTests(TestCase):
+    """Series are read from rollups for 1h/1d and aggregated from raw readings otherwise."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.station = create_station(create_institution())
+        cls.device = Device.objects.create(serial_number='D-1', type='SENSOR', station=cls.station)
+        cls.start = rollups.local_midnight(timezone.now() - timedelta(days=2))
+
+    def _params(self, bucket, hours):
+        return series.parse_params({
+            'pollutant': 'PM25', 'bucket': bucket,
+            'start': self.start.isoformat(), 'end': (self.start + timedelta(hours=hours)).isoformat(),
+        })
+
+    def test_raw_buckets(self):
+        readings = [(1, 10.0), (3, 20.0), (7, 5.0)]  # minutes after start
+        times = [self.start + timedelta(minutes=minutes) for minutes, _ in readings]
+        partitions.ensure_partitions_for(times)
+        Measurement.objects.bulk_create([
+            Measurement(device=self.device, station=self.station, pollutant='PM25', value=value, recorded_at=t)
+            for t, (_, value) in zip(times, readings)
+        ])
+
+        payload = series.series_payload(self.station.id, self._params('5m', 1))
+        self.assertEqual(payload['source'], 'raw')
+        tz = series.local_zone()
+        self.assertEqual(payload['points'], [
+            {'t': self.start.astimezone(tz).isoformat(), 'count': 2, 'min': 10.0, 'max': 20.0, 'mean': 15.0},
+            {'t': (self.start + timedelta(minutes=5)).astimezone(tz).isoformat(),
+             'count': 1, 'min': 5.0, 'max': 5.0, 'mean': 5.0},
+        ])
+
+    def test_rollup_buckets_are_downsampled_keeping_the_peak(self):
+        MeasurementHourly.objects.bulk_create([
+            MeasurementHourly(
+                station=self.station, pollutant='PM25', bucket=self.start + timedelta(hours=i),
+                count=1, min=10.0, max=500.0 if i == 13 else 10.0 + i % 4, mean=10.0, sum=10.0,
+            )
+            for i in range(48)
+        ])
+        params = self._params('1h', 48)
+
+        payload = series.series_payload(self.station.id, params)
+        self.assertEqual((payload['source'], payload['points_total']), ('rollup', 48))
+        self.assertFalse(payload['downsampled'])
+
+        payload = series.series_payload(self.station.id, params, max_points=10)
+        self.assertTrue(payload['downsampled'])
+        self.assertLessEqual(len(payload['points']), 10)
+        self.assertIn(500.0, [point['max'] for point in payload['points']])
+
+
+class ServerModeSettingsTests(SimpleTestCase):
+    """Database settings of the PgBouncer production mode and the gunicorn hooks."""
+
+    BASE_DIR = Path(__file__).resolve().parent.parent
+
+    def _databases(self, **env):
+        with mock.patch.dict(os.environ, env):
+            return runpy.run_module('core.settings')['DATABASES']
+
+    def test_persistent_health_checked_connections(self):
+        with mock.patch.dict(os.environ):
+            for name in ('DB_PGBOUNCER', 'DB_CONN_MAX_AGE'):
+                os.environ.pop(name, None)
+            databases = self._databases()
+        default = databases['default']
+        self.assertEqual((default['CONN_MAX_AGE'], default['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertFalse(default['DISABLE_SERVER_SIDE_CURSORS'])
+
+    def test_pgbouncer_mode(self):
+        databases = self._databases(
+            DB_PGBOUNCER='true', DB_HOST='pgbouncer', DB_PORT='6432',
+            DB_DIRECT_HOST='db', DB_DIRECT_PORT='5432',
+        )
+        default, direct = databases['default'], databases['direct']
+        self.assertEqual((default['HOST'], default['PORT']), ('pgbouncer', '6432'))
+        # Transaction pooling cannot keep server-side cursors across transactions.
+        self.assertTrue(default['DISABLE_SERVER_SIDE_CURSORS'])
+        # LISTEN and migrations bypass the pooler with a session of their own.
+        self.assertEqual((direct['HOST'], direct['PORT'], direct['CONN_MAX_AGE']), ('db', '5432', 0))
+        self.assertFalse(direct['DISABLE_SERVER_SIDE_CURSORS'])
+        self.assertIsNot(direct['OPTIONS'], default['OPTIONS'])
+
+    def test_gunicorn_config(self):
+        with mock.patch.dict(os.environ, {'WEB_CONCURRENCY': '3'}):
+            config = runpy.run_path(str(self.BASE_DIR / 'gunicorn.conf.py'))
+        self.assertEqual((config['workers'], config['preload_app']), (3, True))
+        self.assertEqual(config['worker_class'], 'uvicorn_worker.UvicornWorker')
+
+        # Forked workers must not share the master's database connections.
+        with mock.patch('django.db.connections.close_all') as close_all:
+            config['post_fork'](server=None, worker=None)
+        close_all.assert_called_once_with()
@@ -0,0 +1,91 @@
+"""
+Mapbox Vector Tiles of stations.
+
+Tiles are built in PostgreSQL with ST_AsMVT: stations inside the tile
+envelope (plus a small margin so symbols near the edges are not clipped)
+are projected to Web Mercator, clipped with ST_AsMVTGeom and encoded in a
+single `stations` layer. Each feature carries the station status and its
+current AQI (see api.aqi), so the map can be styled without extra requests.
+
+Stations are selected with a bounding-box test on `location::geometry`,
+answered by the station_location_geom_gist expression index (migration
+0010).
+
+Auth users only get the stations they were granted (see api.access).
+
+Encoded tiles are cached per (standard, station scope, z, x, y) in the
+`tiles` namespace of api.caching, which is invalidated when a station
+changes and after every AQI refresh.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Station
+from . import access, caching, routing
+
+
+EXTENT = 4096
+BUFFER = 64
+MAX_ZOOM = 22
+LAYER = 'stations'
+
+SQL_TILE = """
+WITH bounds AS (
+    SELECT ST_TileEnvelope(%(z)s, %(x)s, %(y)s) AS geom,
+           ST_Transform(ST_TileEnvelope(%(z)s, %(x)s, %(y)s, margin => %(margin)s), 4326) AS area
+),
+features AS (
+    SELECT s.id, s.name, s.status,
+           a.aqi, a.category AS aqi_category, a.dominant_pollutant,
+           ST_AsMVTGeom(ST_Transform(s.location::geometry, 3857), bounds.geom,
+                        %(extent)s, %(buffer)s, true) AS geom
+    FROM api_station s
+    CROSS JOIN bounds
+    LEFT JOIN api_stationaqi a ON a.station_id = s.id AND a.standard = %(standard)s
+    WHERE (s.location::geometry) && bounds.area
+      AND (%(stations)s::bigint[] IS NULL OR s.id = ANY(%(stations)s::bigint[]))
+)
+SELECT ST_AsMVT(features, %(layer)s, %(extent)s, 'geom', 'id') FROM features
+"""
+
+
+def valid_tile(z, x, y):
+    """Return True if (z, x, y) addresses an existing tile."""
+    return 0 <= z <= MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z
+
+
+def render_tile(z, x, y, standard, station_ids=None):
+    """
+    Build the MVT bytes of one tile (empty bytes if it has no station).
+
+    Parameters:
+        station_ids (frozenset | None): Stations to include (None: all).
+    """
+    with routing.read_connection(Station).cursor() as cursor:
+        cursor.execute(SQL_TILE, {
+            'z': z, 'x': x, 'y': y,
+            'margin': BUFFER / EXTENT,
+            'extent': EXTENT,
+            'buffer': BUFFER,
+            'standard': standard,
+            'layer': LAYER,
+            'stations': sorted(station_ids) if station_ids is not None else None,
+        })
+        row = cursor.fetchone()
+    return bytes(row[0]) if row and row[0] is not None else b''
+
+
+def station_tile(z, x, y, standard, station_ids=None):
+    """Return the cached tile of a station scope, rendering and caching it on a miss."""
+    key = caching.versioned_key(caching.TILES, standard, access.scope_key(station_ids), z, x, y)
+    tile = cache.get(key)
+    if tile is None:
+        tile = render_tile(z, x, y, standard, station_ids)
+        cache.set(key, tile, routing.cache_timeout(settings.TILE_CACHE_TIMEOUT))
+    return tile
+
+
+def invalidate():
+    """Drop every cached tile (after station or AQI changes)."""
+    caching.invalidate(caching.TILES, lists=False, everything=True)
@@ -20,8 +20,16 @@ from .views import (
     DeviceViewSet,
     AlertViewSet,
     AlertPollutantViewSet,
+    AlertThresholdViewSet,
     AlertReceiveViewSet,
     StationConsultViewSet,
+    MeasurementViewSet,
+    MeasurementHourlyViewSet,
+    MeasurementDailyViewSet,
+    JobViewSet,
+    StationTileView,
+    HeatmapTileView,
+    DashboardSummaryView,
 )
 from .authentication import (
     CustomTokenObtainPairView,
@@ -30,6 +38,7 @@ from .authentication import (
     change_password,
     verify_token,
 )
+from . import async_views
 
 # Create router and register viewsets
 router = DefaultRouter()
@@ -43,8 +52,13 @@ router.register(r'stations', StationViewSet, basename='station')
 router.register(r'devices', DeviceViewSet, basename='device')
 router.register(r'alerts', AlertViewSet, basename='alert')
 router.register(r'alert-pollutants', AlertPollutantViewSet, basename='alertpollutant')
+router.register(r'alert-thresholds', AlertThresholdViewSet, basename='alertthreshold')
 router.register(r'alert-receives', AlertReceiveViewSet, basename='alertreceive')
 router.register(r'station-consults', StationConsultViewSet, basename='stationconsult')
+router.register(r'measurements', MeasurementViewSet, basename='measurement')
+router.register(r'rollups/hourly', MeasurementHourlyViewSet, basename='measurementhourly')
+router.register(r'rollups/daily', MeasurementDailyViewSet, basename='measurementdaily')
+router.register(r'jobs', JobViewSet, basename='job')
 
 urlpatterns = [
     # Authentication endpoints
@@ -55,7 +69,24 @@ urlpatterns = [
     path('auth/logout/', logout_user, name='logout'),
     path('auth/change-password/', change_password, name='change_password'),
     path('auth/verify/', verify_token, name='verify_token'),
-    
+
+    # Dashboard
+    path('dashboard/summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
+
+    # Vector tiles
+    path('tiles/<int:z>/<int:x>/<int:y>.mvt', StationTileView.as_view(), name='station-tile'),
+    path('heatmap/<str:pollutant>/<int:z>/<int:x>/<int:y>.png', HeatmapTileView.as_view(),
+         {'fmt': 'png'}, name='heatmap-tile-png'),
+    path('heatmap/<str:pollutant>/<int:z>/<int:x>/<int:y>.json', HeatmapTileView.as_view(),
+         {'fmt': 'json'}, name='heatmap-tile-json'),
+
+    # Async read path (ASGI only; see api/async_views.py)
+    path('async/stations/', async_views.station_list, name='async-station-list'),
+    path('async/stations/nearby/', async_views.station_nearby, name='async-station-nearby'),
+    path('async/stations/<int:pk>/series/', async_views.station_series, name='async-station-series'),
+    path('async/alerts/', async_views.alert_list, name='async-alert-list'),
+    path('async/health/', async_views.health, name='async-health'),
+
     # Include router URLs
     path('', include(router.urls)),
 ]
@@ -109,8 +140,14 @@ Stations:
 - PUT    /api/stations/{id}/         - Update station
 - DELETE /api/stations/{id}/         - Delete station
 - GET    /api/stations/{id}/alerts/  - Get all alerts for station
+- GET    /api/stations/{id}/alert-levels/?pollutant=PM25  - Pollutant levels of the station's alerts
+- GET    /api/stations/{id}/series/?pollutant=PM25&bucket=1h&start=X&end=Y  - Bucketed pollutant series
+  (add &max_points=N to either series or alert-levels for an LTTB-downsampled chart payload)
+- GET    /api/stations/aqi/?standard=colombia  - Current AQI of every station
+- GET    /api/stations/{id}/aqi/     - Current AQI and sub-indices of a station
 - POST   /api/stations/{id}/grant-access/  - Grant access to auth_user
 - GET    /api/stations/nearby/?lat=X&lon=Y&radius=Z  - Find nearby stations
+- GET    /api/stations/nearby/?lat=X&lon=Y&k=5       - The 5 nearest stations (KNN, radius optional)
 
 Devices:
 - GET    /api/devices/               - List devices
@@ -127,7 +164,11 @@ Alerts:
 - DELETE /api/alerts/{id}/           - Delete alert
 - POST   /api/alerts/{id}/pollutants/  - Add pollutants to alert
 - POST   /api/alerts/{id}/mark-attended/  - Mark alert as attended
+- GET    /api/alerts/stream/         - Server-Sent Events of new alerts (ASGI only, ?token=,
+                                      resumes from Last-Event-ID; see api/streams.py)
 - POST   /api/alerts/{id}/notify/    - Record who received alert
+  ({"auth_user_ids": [...]} or {"subscribers": true} for every auth user with station access;
+  add "background": true to get 202 + job id)
 
 Alert Pollutants:
 - GET    /api/alert-pollutants/      - List all pollutants
@@ -136,6 +177,13 @@ Alert Pollutants:
 - PUT    /api/alert-pollutants/{id}/ - Update pollutant
 - DELETE /api/alert-pollutants/{id}/ - Delete pollutant
 
+Alert Thresholds (evaluated automatically on every ingested batch):
+- GET    /api/alert-thresholds/      - List thresholds (?station=X&pollutant=PM25)
+- POST   /api/alert-thresholds/      - Create threshold (no station = network default)
+- GET    /api/alert-thresholds/{id}/ - Get threshold detail
+- PUT    /api/alert-thresholds/{id}/ - Update threshold
+- DELETE /api/alert-thresholds/{id}/ - Delete threshold
+
 Alert Receives (M2M):
 - GET    /api/alert-receives/        - List who received which alerts
 - POST   /api/alert-receives/        - Record alert receipt
@@ -146,16 +194,53 @@ Station Consults (M2M):
 - POST   /api/station-consults/      - Grant access
 - DELETE /api/station-consults/{id}/ - Revoke access
 
+Measurements:
+- GET    /api/measurements/          - List readings (filter by station, device, pollutant, time range)
+- GET    /api/measurements/{id}/     - Get reading detail
+- POST   /api/measurements/ingest/   - Bulk ingest readings (JSON array, NDJSON or CSV)
+
+Jobs (background queue, run by `manage.py run_workers`):
+- GET    /api/jobs/                  - List jobs (admin only, ?status=pending&name=aqi.refresh)
+- GET    /api/jobs/{id}/             - Job status and result
+
+Live readings (WebSocket, ASGI only; see api/streams.py):
+- WS     /ws/readings/?token=X       - Send {"subscribe": [station ids]}; receive
+                                      {"type": "readings", "station", "t", "values"} per batch
+
+Dashboard:
+- GET    /api/dashboard/summary/     - Station counts by status, unattended alerts per station and
+                                      institution, current AQI per station and 24h exceedance hours
+                                      (?standard=; cached briefly, see api/dashboard.py)
+
+Tiles:
+- GET    /api/tiles/{z}/{x}/{y}.mvt  - Mapbox Vector Tile of stations (status + current AQI, ?standard=)
+- GET    /api/heatmap/{pollutant}/{z}/{x}/{y}.png   - IDW-interpolated pollutant surface (PNG tile)
+- GET    /api/heatmap/{pollutant}/{z}/{x}/{y}.json  - Same surface as values (64x64 per tile)
+
+Async read path (same responses, served without a thread per request; ASGI only):
+- GET    /api/async/stations/        - = /api/stations/
+- GET    /api/async/stations/nearby/ - = /api/stations/nearby/
+- GET    /api/async/stations/{id}/series/  - = /api/stations/{id}/series/
+- GET    /api/async/alerts/          - = /api/alerts/
+- GET    /api/async/health/          - = /health/
+
+Rollups:
+- GET    /api/rollups/hourly/        - Hourly count/min/max/mean/sum per station and pollutant
+- GET    /api/rollups/daily/         - Daily rollups (local day, America/Bogota)
+
 Filtering & Pagination:
 All list endpoints support:
 - ?page=N                 - Page number
 - ?page_size=N            - Items per page (max 100)
 - ?search=term            - Search in relevant fields
 - ?ordering=field         - Sort by field (use -field for descending)
+- ?pagination=cursor      - Keyset pagination (alerts, alert-pollutants, stations/{id}/alerts);
+                            follow the `next` link, which carries an opaque ?cursor=
 - Custom filters per endpoint (see filters.py)
 
 Examples:
 - GET /api/stations/?status=active&institution=5
+- GET /api/stations/?rolling_pollutant=PM25&rolling_min=37  (24h average >= 37)
 - GET /api/alerts/?station=10&attended=false&date_after=2024-01-01
 - GET /api/devices/?station=3&type=SENSOR
 """
\ No newline at end of file
@@ -4,14 +4,15 @@ Views and API ViewSets for VRISA.
 This module contains:
 - lightweight test endpoints (Redis test, health check)
 - DRF viewsets for Users, Admins, AuthUsers, Institutions, Stations, Devices, Alerts,
-  AlertPollutants, AlertReceives, and StationConsults
+  AlertPollutants, AlertReceives, StationConsults and Measurements
 - Custom actions for grant/revoke access, station nearby queries, alert management, etc.
 
 All viewsets use pagination, filtering and permissions defined in other modules.
 """
 
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import JsonResponse, HttpResponse
 from django.core.cache import cache
 
 def test_redis(request):
@@ -99,14 +100,18 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+from django.utils.cache import patch_cache_control
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Q
-from django.db import models
+from django.db.models import Q, Prefetch
 
 from .models import (
     User, Admin, AuthUser, Institution, Station, Device,
-    Alert, AlertPollutant, AlertReceive, StationConsult
+    Alert, AlertPollutant, AlertReceive, StationConsult, Measurement, AlertThreshold,
+    MeasurementHourly, MeasurementDaily, StationAQI, AQIStandard, Job, PollutantType,
 )
 from .serializers import (
     UserSerializer, UserDetailSerializer,
@@ -116,16 +121,31 @@ from .serializers import (
     StationSerializer, StationListSerializer, StationCreateSerializer, StationDetailSerializer,
     DeviceSerializer,
     AlertSerializer, AlertDetailSerializer,
-    AlertPollutantSerializer, AlertPollutantCreateSerializer,
+    AlertPollutantSerializer, AlertPollutantCreateSerializer, AlertThresholdSerializer,
     AlertReceiveSerializer,
     StationConsultSerializer,
+    MeasurementSerializer, MeasurementHourlySerializer, MeasurementDailySerializer,
+    StationAQISerializer, JobSerializer, RECENT_ALERTS,
 )
 from .permissions import (
     IsAdmin, IsAuthUser, IsAdminOrAuthUser, IsAdminOrReadOnly,
     IsInstitutionAdmin, IsStationAdmin, CanAccessStation, IsOwnerOrAdmin
 )
-from .pagination import StandardResultsSetPagination
-from .filters import StationFilter, AlertFilter, DeviceFilter
+from .pagination import (
+    StandardResultsSetPagination, EstimatedCountPagination, KeysetPagination, KeysetSelectableMixin,
+)
+from .filters import (
+    StationFilter, AlertFilter, DeviceFilter, MeasurementFilter, MeasurementRollupFilter
+)
+from .parsers import NDJSONParser, CSVParser
+from .renderers import MVTRenderer, PNGRenderer
+from . import ingest, series, downsampling, caching, spatial, tiles, heatmap, access, notifications, jobs, dashboard
+from .caching import CachedResponseMixin
+from .routing import ReplicaReadMixin
+
+
+# Keyset pagination order for alert listings (newest first).
+ALERT_KEYSET = ('-alert_date', '-id')
 
 
 # ==================== USER VIEWSETS ====================
@@ -328,7 +348,7 @@ class AuthUserViewSet(viewsets.ModelViewSet):
 
 # ==================== INSTITUTION VIEWSETS ====================
 
-class InstitutionViewSet(viewsets.ModelViewSet):
+class InstitutionViewSet(ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     ViewSet for Institution entities.
 
@@ -341,7 +361,9 @@ class InstitutionViewSet(viewsets.ModelViewSet):
     --------
     - Uses InstitutionDetailSerializer for detailed retrieve operations.
     - Supports filtering by verified and admin.
+    - List/retrieve responses are cached (see api.caching).
     """
+    cache_namespace = caching.INSTITUTIONS
     queryset = Institution.objects.select_related('admin__user').all()
     serializer_class = InstitutionSerializer
     permission_classes = [IsAuthenticated, IsAdminOrReadOnly]
@@ -358,26 +380,46 @@ class InstitutionViewSet(viewsets.ModelViewSet):
             return InstitutionDetailSerializer
         return InstitutionSerializer
 
+    def get_queryset(self):
+        """
+        Annotate station counts; for retrieve, prefetch the stations with
+        their admin users so the nested list costs one query.
+        """
+        queryset = super().get_queryset().with_counts()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(
+                Prefetch('stations', queryset=Station.objects.select_related('admin__user'))
+            )
+        return queryset
+
 
 # ==================== STATION VIEWSETS ====================
 
-class StationViewSet(viewsets.ModelViewSet):
+class StationViewSet(ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     Station management ViewSet with spatial capabilities.
 
     Responsibilities
     ----------------
-    - List/Retrieve: allowed for any authenticated user (read-only for non-admins)
+    - List/Retrieve: allowed for any authenticated user (read-only for non-admins);
+      auth users only see the stations granted to them (see api.access)
     - Create/Update: admins only
     - Delete: restricted to institution admin (permissions enforced elsewhere)
+    - List/Retrieve responses are cached (see api.caching)
+    - Read-only actions may be served by a read replica (see api.routing)
 
     Custom actions
     --------------
     - alerts (detail=True, GET): list alerts for a station
+    - alert_levels (detail=True, GET): pollutant levels of the station's alerts
+    - series (detail=True, GET): time-bucketed pollutant series for a station
+    - aqi (detail=False, GET) / current_aqi (detail=True, GET): current AQI
     - grant_access (detail=True, POST): grant station access to an auth_user
     - nearby (detail=False, GET): find nearby stations given lat/lon and radius
     """
-    queryset = Station.objects.select_related('institution', 'admin__user').prefetch_related('devices')
+    cache_namespace = caching.STATIONS
+    replica_actions = ('list', 'retrieve', 'alerts', 'alert_levels', 'series', 'aqi', 'current_aqi', 'nearby')
+    queryset = Station.objects.select_related('institution', 'admin__user')
     pagination_class = StandardResultsSetPagination
     filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
     filterset_class = StationFilter
@@ -389,10 +431,10 @@ class StationViewSet(viewsets.ModelViewSet):
         """
         Return permission classes based on action.
 
-        - list/retrieve/alerts/nearby: IsAuthenticated
+        - list/retrieve/alerts/alert_levels/series/aqi/current_aqi/nearby: IsAuthenticated
         - write operations: IsAuthenticated + IsAdmin
         """
-        if self.action in ['list', 'retrieve', 'alerts', 'nearby']:
+        if self.action in ['list', 'retrieve', 'alerts', 'alert_levels', 'series', 'aqi', 'current_aqi', 'nearby']:
             return [IsAuthenticated()]
         return [IsAuthenticated(), IsAdmin()]
 
@@ -412,9 +454,37 @@ class StationViewSet(viewsets.ModelViewSet):
             return StationListSerializer
         return StationSerializer
 
+    def get_cache_scope(self):
+        """Responses depend on the station set the requester is scoped to."""
+        return access.scope_key(access.station_scope(self.request.user))
+
     def get_queryset(self):
-        """All authenticated users can see all stations (further filtering done by filters)."""
-        return super().get_queryset()
+        """
+        Admins and citizens see all stations; auth users only the stations
+        granted to them (further filtering done by filters).
+        """
+        queryset = super().get_queryset()
+        scope = access.station_scope(self.request.user)
+        if scope is not None:
+            queryset = queryset.filter(id__in=scope)
+        if self.action == 'retrieve':
+            recent_alerts = (
+                Alert.objects.order_by('-alert_date')
+                .prefetch_related('pollutants')[:RECENT_ALERTS]
+            )
+            queryset = queryset.with_counts().prefetch_related(
+                'devices',
+                'rolling_windows',
+                Prefetch('alerts', queryset=recent_alerts, to_attr='recent_alerts'),
+            )
+        return queryset
+
+    def _station_alerts(self, request, station):
+        alerts = station.alerts.order_by('-alert_date')
+        attended = request.query_params.get('attended')
+        if attended is not None:
+            alerts = alerts.filter(attended=attended.lower() == 'true')
+        return alerts
 
     @action(detail=True, methods=['get'], url_path='alerts')
     def alerts(self, request, pk=None):
@@ -427,17 +497,19 @@ class StationViewSet(viewsets.ModelViewSet):
 
         Pagination
         ----------
-        Uses the viewset's paginator if the result set is large.
+        Page numbers by default; ?pagination=cursor switches to keyset
+        pagination on (alert_date, id).
         """
         station = self.get_object()
-        alerts = station.alerts.prefetch_related('pollutants').order_by('-alert_date')
-
-        # Apply filters
-        attended = request.query_params.get('attended')
-        if attended is not None:
-            alerts = alerts.filter(attended=attended.lower() == 'true')
+        alerts = self._station_alerts(request, station).prefetch_related('pollutants')
 
         # Pagination
+        if KeysetPagination.requested(request):
+            paginator = KeysetPagination(ALERT_KEYSET)
+            page = paginator.paginate_queryset(alerts, request, view=self)
+            serializer = AlertSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
+
         page = self.paginate_queryset(alerts)
         if page is not None:
             serializer = AlertSerializer(page, many=True)
@@ -446,6 +518,148 @@ class StationViewSet(viewsets.ModelViewSet):
         serializer = AlertSerializer(alerts, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'], url_path='alert-levels')
+    def alert_levels(self, request, pk=None):
+        """
+        Pollutant levels recorded in the station's alerts, as a chart series.
+
+        Query params
+        ------------
+        - pollutant (required): PM25, PM10, NO2, O3, SO2 or CO
+        - attended (optional): 'true' or 'false'
+        - max_points (optional): downsample with LTTB; the highest level is
+          always kept
+        """
+        station = self.get_object()
+
+        pollutant = (request.query_params.get('pollutant') or '').upper()
+        if pollutant not in PollutantType.values:
+            return Response(
+                {'error': f"pollutant must be one of {', '.join(PollutantType.values)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            max_points = downsampling.parse_max_points(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        alerts = self._station_alerts(request, station)
+        rows = list(
+            AlertPollutant.objects.filter(alert__in=alerts.values('id'), pollutant=pollutant)
+            .order_by('recorded_at', 'id')
+            .values_list('recorded_at', 'level', 'alert_id')
+        )
+        total = len(rows)
+        if max_points is not None and total > max_points:
+            x = [recorded_at.timestamp() for recorded_at, _, _ in rows]
+            y = [level for _, level, _ in rows]
+            keep = [max(range(total), key=y.__getitem__)]
+            rows = [rows[i] for i in downsampling.downsample(x, y, max_points, keep=keep)]
+
+        return Response({
+            'station': station.id,
+            'pollutant': pollutant,
+            'points_total': total,
+            'downsampled': total > len(rows),
+            'points': [
+                {'t': recorded_at, 'level': level, 'alert': alert_id}
+                for recorded_at, level, alert_id in rows
+            ],
+        })
+
+    @action(detail=True, methods=['get'])
+    def series(self, request, pk=None):
+        """
+        Time-bucketed series of one pollutant for the station.
+
+        Query params
+        ------------
+        - pollutant (required): PM25, PM10, NO2, O3, SO2 or CO
+        - bucket (optional): 1m, 5m, 1h or 1d (default 1h)
+        - start / end (optional): ISO 8601 datetimes; naive values are
+          America/Bogota local time (default: the last 24 hours). The range
+          is widened to whole buckets
+        - max_points (optional): downsample the buckets with LTTB; the
+          bucket holding the highest maximum is always kept
+
+        Returns
+        -------
+        Response with the aligned buckets. 1h and 1d are served from the
+        rollup tables, 1m and 5m are aggregated from raw measurements.
+        """
+        station = self.get_object()
+
+        try:
+            params = series.parse_params(request.query_params)
+            max_points = downsampling.parse_max_points(request.query_params)
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(series.series_payload(station.id, params, max_points))
+
+    def _aqi_standard(self, request):
+        """Return the requested AQI standard or None if it is not supported."""
+        standard = request.query_params.get('standard', settings.AQI_DEFAULT_STANDARD)
+        return standard if standard in AQIStandard.values else None
+
+    @action(detail=False, methods=['get'], url_path='aqi', url_name='aqi-list')
+    def aqi(self, request):
+        """
+        Current AQI and dominant pollutant of every station.
+
+        Query params
+        ------------
+        - standard (optional): 'colombia' (default) or 'us_epa'
+        """
+        standard = self._aqi_standard(request)
+        if standard is None:
+            return Response(
+                {'error': f"standard must be one of {', '.join(AQIStandard.values)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        values = StationAQI.objects.filter(
+            standard=standard,
+            station__in=self.get_queryset().values('id'),
+        ).select_related('station').order_by('-aqi')
+
+        serializer = StationAQISerializer(values, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['get'], url_path='aqi', url_name='aqi-detail')
+    def current_aqi(self, request, pk=None):
+        """
+        Current AQI of this station, with per-pollutant sub-indices.
+
+        Query params
+        ------------
+        - standard (optional): 'colombia' (default) or 'us_epa'
+
+        Responses
+        ---------
+        - 200: current AQI
+        - 404: no recent readings to compute it
+        """
+        station = self.get_object()
+        standard = self._aqi_standard(request)
+        if standard is None:
+            return Response(
+                {'error': f"standard must be one of {', '.join(AQIStandard.values)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            value = StationAQI.objects.select_related('station').get(
+                station=station, standard=standard
+            )
+        except StationAQI.DoesNotExist:
+            return Response(
+                {'error': 'AQI not available for this station'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        return Response(StationAQISerializer(value).data)
+
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, IsAdmin])
     def grant_access(self, request, pk=None):
         """
@@ -494,55 +708,42 @@ class StationViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def nearby(self, request):
         """
-        Spatial query: find stations within a radius from a point.
+        Spatial query: find the stations nearest to a point.
+
+        Ordering uses the KNN `<->` operator on the GiST index of
+        `location` (see api/spatial.py), so nearest-first lookups do not
+        compute the distance to every station.
 
         Query params
         ------------
         - lat (required): latitude
         - lon (required): longitude
-        - radius (optional): radius in meters (default 5000)
+        - k (optional): return only the k nearest stations (max NEARBY_MAX_K)
+        - radius (optional): radius in meters; defaults to 5000 when k is
+          not given, unlimited when it is
 
         Returns
         -------
-        Response: serialized StationListSerializer objects ordered by distance
+        Response: serialized StationListSerializer objects ordered by
+        distance, each with `distance` in meters
         """
-        from django.contrib.gis.geos import Point
-        from django.contrib.gis.measure import D
-
-        lat = request.query_params.get('lat')
-        lon = request.query_params.get('lon')
-        radius = request.query_params.get('radius', 5000)  # default 5km
-
-        if not lat or not lon:
-            return Response(
-                {'error': 'lat and lon parameters are required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
         try:
-            lat = float(lat)
-            lon = float(lon)
-            radius = float(radius)
-            point = Point(lon, lat, srid=4326)
-        except (ValueError, TypeError):
-            return Response(
-                {'error': 'Invalid coordinates or radius'},
-                status=status.HTTP_400_BAD_REQUEST
+            lon, lat, k, radius = spatial.parse_nearby_params(
+                request.query_params, settings.NEARBY_MAX_K
             )
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-        stations = self.get_queryset().filter(
-            location__distance_lte=(point, D(m=radius))
-        ).annotate(
-            distance=models.functions.Distance('location', point)
-        ).order_by('distance')
-
-        serializer = StationListSerializer(stations, many=True)
-        return Response(serializer.data)
+        stations = list(spatial.nearby(self.get_queryset(), lon, lat, k, radius))
+        data = StationListSerializer(stations, many=True).data
+        for item, station in zip(data, stations):
+            item['distance'] = station.distance
+        return Response(data)
 
 
 # ==================== DEVICE VIEWSETS ====================
 
-class DeviceViewSet(viewsets.ModelViewSet):
+class DeviceViewSet(ReplicaReadMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     Device management ViewSet.
 
@@ -552,7 +753,9 @@ class DeviceViewSet(viewsets.ModelViewSet):
     - create/update/delete: admins only
 
     Supports filtering by station and type, searching by serial_number and description.
+    List/retrieve responses are cached (see api.caching).
     """
+    cache_namespace = caching.DEVICES
     queryset = Device.objects.select_related('station').all()
     serializer_class = DeviceSerializer
     pagination_class = StandardResultsSetPagination
@@ -571,7 +774,7 @@ class DeviceViewSet(viewsets.ModelViewSet):
 
 # ==================== ALERT VIEWSETS ====================
 
-class AlertViewSet(viewsets.ModelViewSet):
+class AlertViewSet(ReplicaReadMixin, CachedResponseMixin, KeysetSelectableMixin, viewsets.ModelViewSet):
     """
     Alert management ViewSet.
 
@@ -583,10 +786,15 @@ class AlertViewSet(viewsets.ModelViewSet):
       - pollutants: add pollutant records to the alert
       - mark_attended: set alert.attended = True
       - notify: record auth_users that received the alert
+    - List/retrieve responses are cached (see api.caching)
+    - ?pagination=cursor: keyset pagination on (alert_date, id) for
+      infinite scroll (no OFFSET, no COUNT)
     """
+    cache_namespace = caching.ALERTS
+    keyset_ordering = ALERT_KEYSET
     queryset = Alert.objects.select_related('station').prefetch_related('pollutants').all()
     serializer_class = AlertSerializer
-    pagination_class = StandardResultsSetPagination
+    pagination_class = EstimatedCountPagination
     filter_backends = [SearchFilter, OrderingFilter, DjangoFilterBackend]
     filterset_class = AlertFilter
     search_fields = ['station__name']
@@ -662,47 +870,57 @@ class AlertViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'], url_path='notify')
     def notify_users(self, request, pk=None):
         """
-        Record that a list of auth_user ids received the alert.
+        Record that auth users received the alert (bulk, see api/notifications.py).
 
         Body
         ----
         {
             "auth_user_ids": [1, 2, 3]
         }
+        or, to notify every auth user with access to the alert's station:
+        {
+            "subscribers": true
+        }
+        Add "background": true to queue the fan-out as a job instead.
 
         Returns
         -------
-        Response with message and created receives.
+        Response with message and counts (recipients, created, already_notified),
+        or 202 with the queued job id (poll /api/jobs/{id}/).
+        Unknown auth_user ids are ignored.
         """
         alert = self.get_object()
-        auth_user_ids = request.data.get('auth_user_ids', [])
-
-        if not isinstance(auth_user_ids, list):
-            auth_user_ids = [auth_user_ids]
-
-        created = []
-        for auth_user_id in auth_user_ids:
-            try:
-                auth_user = AuthUser.objects.get(id=auth_user_id)
-                receive, was_created = AlertReceive.objects.get_or_create(
-                    auth_user=auth_user,
-                    alert=alert
-                )
-                if was_created:
-                    created.append(receive)
-            except AuthUser.DoesNotExist:
-                continue
-
-        serializer = AlertReceiveSerializer(created, many=True)
+        subscribers = request.data.get('subscribers') in (True, 'true')
+
+        if request.data.get('background') in (True, 'true'):
+            payload = {'alert_id': alert.id, 'subscribers': subscribers}
+            if not subscribers:
+                auth_user_ids = request.data.get('auth_user_ids', [])
+                payload['auth_user_ids'] = auth_user_ids if isinstance(auth_user_ids, list) else [auth_user_ids]
+            job = jobs.enqueue('alerts.notify', payload)
+            return Response({
+                'message': 'Notification queued',
+                'job': job.id if job else None,
+            }, status=status.HTTP_202_ACCEPTED)
+
+        if subscribers:
+            recipients = notifications.subscribers(alert)
+        else:
+            auth_user_ids = request.data.get('auth_user_ids', [])
+            if not isinstance(auth_user_ids, list):
+                auth_user_ids = [auth_user_ids]
+            recipients = notifications.existing_auth_users(set(auth_user_ids))
+
+        result = notifications.fan_out(alert, recipients)
         return Response({
-            'message': f'{len(created)} users notified',
-            'receives': serializer.data
+            'message': f"{result['created']} users notified",
+            **result,
         }, status=status.HTTP_201_CREATED)
 
 
 # ==================== ALERT POLLUTANT VIEWSETS ====================
 
-class AlertPollutantViewSet(viewsets.ModelViewSet):
+class AlertPollutantViewSet(ReplicaReadMixin, KeysetSelectableMixin, viewsets.ModelViewSet):
     """
     ViewSet to manage AlertPollutant entries.
 
@@ -710,17 +928,47 @@ class AlertPollutantViewSet(viewsets.ModelViewSet):
     -----------
     - Authenticated users with either Admin or AuthUser profiles can access.
     - Typically pollutants are added via Alert.add_pollutants action.
+
+    Pagination
+    ----------
+    Page numbers by default; ?pagination=cursor switches to keyset
+    pagination on (recorded_at, id).
     """
+    keyset_ordering = ('-recorded_at', '-id')
     queryset = AlertPollutant.objects.select_related('alert__station').all()
     serializer_class = AlertPollutantSerializer
     permission_classes = [IsAuthenticated, IsAdminOrAuthUser]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = EstimatedCountPagination
     filter_backends = [OrderingFilter, DjangoFilterBackend]
     filterset_fields = ['pollutant', 'alert']
     ordering_fields = ['recorded_at', 'level']
     ordering = ['-recorded_at']
 
 
+class AlertThresholdViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for the thresholds evaluated by the alert engine on ingest.
+
+    Permissions
+    -----------
+    - List/Retrieve: any authenticated user
+    - Create/Update/Delete: admins only
+    """
+    queryset = AlertThreshold.objects.select_related('station').all()
+    serializer_class = AlertThresholdSerializer
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [OrderingFilter, DjangoFilterBackend]
+    filterset_fields = ['station', 'pollutant']
+    ordering_fields = ['pollutant', 'level']
+    ordering = ['pollutant']
+
+    def get_permissions(self):
+        """List/retrieve allowed to authenticated users; other actions require admin privileges."""
+        if self.action in ['list', 'retrieve']:
+            return [IsAuthenticated()]
+        return [IsAuthenticated(), IsAdmin()]
+
+
 # ==================== MANY-TO-MANY VIEWSETS ====================
 
 class AlertReceiveViewSet(viewsets.ModelViewSet):
@@ -750,4 +998,223 @@ class StationConsultViewSet(viewsets.ModelViewSet):
     pagination_class = StandardResultsSetPagination
     filter_backends = [OrderingFilter, DjangoFilterBackend]
     filterset_fields = ['auth_user', 'station']
-    ordering = ['-granted_at']
\ No newline at end of file
+    ordering = ['-granted_at']
+
+
+# ==================== MEASUREMENT VIEWSETS ====================
+
+class MeasurementViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Continuous device readings.
+
+    Permissions
+    -----------
+    - list/retrieve: any authenticated user
+    - ingest: admins only
+
+    Notes
+    -----
+    Readings are written in bulk through the `ingest` action; there is no
+    per-row create endpoint. Filtering by station and a recorded_at range
+    lets PostgreSQL prune partitions.
+    """
+    queryset = Measurement.objects.all()
+    serializer_class = MeasurementSerializer
+    pagination_class = EstimatedCountPagination
+    filter_backends = [OrderingFilter, DjangoFilterBackend]
+    filterset_class = MeasurementFilter
+    ordering_fields = ['recorded_at', 'value']
+    ordering = ['-recorded_at']
+
+    def get_permissions(self):
+        """Read access for authenticated users; ingestion requires admin privileges."""
+        if self.action == 'ingest':
+            return [IsAuthenticated(), IsAdmin()]
+        return [IsAuthenticated()]
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser, CSVParser])
+    def ingest(self, request):
+        """
+        Bulk-ingest readings in a single transaction using COPY.
+
+        Body
+        ----
+        One of:
+        - application/json: `[{...}, ...]` or `{"readings": [{...}, ...]}`
+        - application/x-ndjson: one reading object per line
+        - text/csv: header `device,station,pollutant,value,recorded_at`
+
+        Each reading: device (required), station (optional, must match the
+        device), pollutant, value, recorded_at (optional, ISO 8601 or epoch
+        seconds).
+
+        Responses
+        ---------
+        - 201: {"inserted": N}
+        - 400: invalid payload; no reading is stored
+        """
+        rows = request.data
+        if isinstance(rows, dict):
+            rows = rows.get('readings')
+
+        try:
+            batch = ingest.ingest(rows)
+        except ingest.IngestValidationError as exc:
+            return Response({
+                'error': exc.message,
+                'invalid_rows': exc.invalid_rows,
+                'details': exc.errors,
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'inserted': len(batch)}, status=status.HTTP_201_CREATED)
+
+
+class MeasurementHourlyViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Hourly rollups (count, min, max, mean, sum) per station and pollutant.
+
+    Charts and reports should read these instead of aggregating raw
+    measurements. Rows are maintained on ingest (see api/rollups.py).
+    """
+    queryset = MeasurementHourly.objects.all()
+    serializer_class = MeasurementHourlySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [OrderingFilter, DjangoFilterBackend]
+    filterset_class = MeasurementRollupFilter
+    ordering_fields = ['bucket', 'mean', 'max']
+    ordering = ['-bucket']
+
+
+class MeasurementDailyViewSet(MeasurementHourlyViewSet):
+    """
+    Daily rollups per station and pollutant, bucketed by local day
+    (settings.STATION_TIME_ZONE).
+    """
+    queryset = MeasurementDaily.objects.all()
+    serializer_class = MeasurementDailySerializer
+
+# ==================== JOB VIEWSETS ====================
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Background jobs (see api/jobs.py), read-only.
+
+    Endpoints that answer 202 return a job id to poll here.
+    Only Admins can list jobs.
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = StandardResultsSetPagination
+    filter_backends = [OrderingFilter, DjangoFilterBackend]
+    filterset_fields = ['name', 'status']
+    ordering = ['-created_at']
+
+
+class StationTileView(ReplicaReadMixin, APIView):
+    """
+    Mapbox Vector Tile of stations: GET /api/tiles/{z}/{x}/{y}.mvt
+
+    One `stations` layer with a point per station and the properties id,
+    name, status, aqi, aqi_category and dominant_pollutant. Auth users only
+    see their granted stations. Tiles are built by PostGIS (ST_AsMVT) and
+    cached per tile and station scope (see api/tiles.py).
+
+    Query params
+    ------------
+    - standard (optional): AQI standard, 'colombia' (default) or 'us_epa'
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [MVTRenderer, JSONRenderer]
+    replica_actions = ('get',)
+
+    def get(self, request, z, x, y):
+        if not tiles.valid_tile(z, x, y):
+            return Response({'error': 'Tile out of range'}, status=status.HTTP_404_NOT_FOUND)
+
+        standard = request.query_params.get('standard', settings.AQI_DEFAULT_STANDARD)
+        if standard not in AQIStandard.values:
+            return Response(
+                {'error': f"standard must be one of {', '.join(AQIStandard.values)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        tile = tiles.station_tile(z, x, y, standard, access.station_scope(request.user))
+        response = HttpResponse(tile, content_type=MVTRenderer.media_type)
+        patch_cache_control(response, private=True, max_age=settings.TILE_CACHE_TIMEOUT)
+        return response
+
+
+class DashboardSummaryView(ReplicaReadMixin, APIView):
+    """
+    Everything the dashboard shows in one call: GET /api/dashboard/summary/
+
+    Station and device counts by status, unattended alerts per station and
+    per institution, the current AQI of every station and the exceedance
+    hours of the last 24 hours per pollutant, limited to the stations the
+    user can see. Served from a short-lived cache refreshed in the
+    background (see api/dashboard.py); the Age header tells how old it is.
+
+    Query params
+    ------------
+    - standard (optional): AQI standard, 'colombia' (default) or 'us_epa'
+    """
+    permission_classes = [IsAuthenticated]
+    replica_actions = ('get',)
+
+    def get(self, request):
+        standard = request.query_params.get('standard', settings.AQI_DEFAULT_STANDARD)
+        if standard not in AQIStandard.values:
+            return Response(
+                {'error': f"standard must be one of {', '.join(AQIStandard.values)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        data, age = dashboard.summary(access.station_scope(request.user), standard)
+        response = Response(data, headers={'Age': str(int(age))})
+        patch_cache_control(
+            response, private=True,
+            max_age=max(settings.DASHBOARD_FRESH_SECONDS - int(age), 0),
+            stale_while_revalidate=settings.DASHBOARD_STALE_SECONDS,
+        )
+        return response
+
+
+class HeatmapTileView(APIView):
+    """
+    Interpolated pollutant surface as web map tiles:
+    GET /api/heatmap/{pollutant}/{z}/{x}/{y}.png|.json
+
+    The surface is computed once per ingest cycle (see api/heatmap.py);
+    PNG tiles are coloured relative to the pollutant alert threshold, JSON
+    tiles carry the interpolated values (null outside the covered area).
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, PNGRenderer]
+
+    def get(self, request, pollutant, z, x, y, fmt):
+        if pollutant not in settings.ALERT_DEFAULT_THRESHOLDS:
+            return Response(
+                {'error': f"pollutant must be one of {', '.join(settings.ALERT_DEFAULT_THRESHOLDS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not tiles.valid_tile(z, x, y):
+            return Response({'error': 'Tile out of range'}, status=status.HTTP_404_NOT_FOUND)
+
+        if fmt == 'png':
+            tile = heatmap.png_tile(pollutant, z, x, y)
+        else:
+            tile = heatmap.json_tile(pollutant, z, x, y)
+        if tile is None:
+            return Response(
+                {'error': f'No heatmap computed yet for {pollutant}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if fmt == 'png':
+            response = HttpResponse(tile, content_type=PNGRenderer.media_type)
+        else:
+            response = Response(tile)
+        patch_cache_control(response, private=True, max_age=settings.TILE_CACHE_TIMEOUT)
+        return response
@@ -3,6 +3,19 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Long-lived connections are routed to plain ASGI applications before
+Django, which handles everything else (including the async read views
+under /api/async/, see api/async_views.py):
+
+- /api/alerts/stream/  Server-Sent Events of new alerts (api/streams.py)
+- /ws/readings/        WebSocket of live readings per station (api/streams.py)
+
+Serve it with an ASGI server, e.g.:
+
+    uvicorn core.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+(--workers defaults to the WEB_CONCURRENCY environment variable.)
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -12,5 +25,24 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+# Django does not reuse database connections across requests under ASGI
+# (each request runs its sync code in a new thread), so persistent
+# connections would only pile up; pooling is left to PgBouncer.
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
+
+# Set up Django (apps and settings) before importing the api modules.
+django_application = get_asgi_application()
+
+from api import streams  # noqa: E402
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == streams.STREAM_PATH:
+        return await streams.alert_stream(scope, receive, send)
+    if scope['type'] == 'websocket':
+        if scope['path'] == streams.READINGS_PATH:
+            return await streams.readings_socket(scope, receive, send)
+        # Unknown WebSocket path: reject the handshake.
+        await receive()
+        return await send({'type': 'websocket.close', 'code': 1000})
+    return await django_application(scope, receive, send)
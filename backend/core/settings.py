@@ -66,7 +66,7 @@ MIDDLEWARE = [
 # configuracion de REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.auth_cache.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -120,6 +120,14 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Tiempo de vida (s) del usuario + perfiles cacheados por la autenticacion JWT
+# (ver api/auth_cache.py); se invalida al cambiar el usuario o sus perfiles
+AUTH_USER_CACHE_TIMEOUT = int(os.environ.get("AUTH_USER_CACHE_TIMEOUT", 300))
+
+# Tiempo de vida (s) del conjunto de estaciones concedidas a cada auth user
+# (ver api/access.py); se invalida al conceder o revocar acceso
+STATION_ACCESS_CACHE_TIMEOUT = int(os.environ.get("STATION_ACCESS_CACHE_TIMEOUT", 3600))
+
 # CORS Configuration (para desarrollo)
 CORS_ALLOW_ALL_ORIGINS = True  # Solo para desarrollo
 
@@ -226,6 +234,10 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 #Aqui se configura la base de datos PostGIS, los valores se obtienen de las variables de entorno definidas en docker-compose.yml
+# En modo produccion (infra/docker-compose.prod.yml) DB_HOST apunta a PgBouncer,
+# que mantiene un pool de conexiones ya autenticadas contra PostGIS
+DB_PGBOUNCER = os.environ.get("DB_PGBOUNCER", "false").lower() == "true"
+
 DATABASES = { 
     'default': {
         'ENGINE': 'django.contrib.gis.db.backends.postgis',
@@ -234,10 +246,96 @@ DATABASES = {
         'PASSWORD': os.environ.get("DB_PASSWORD", "vrisa_pass"),
         'HOST': os.environ.get("DB_HOST", "db"),
         'PORT': os.environ.get("DB_PORT", 5432),
+        # Conexiones persistentes: se reutilizan durante CONN_MAX_AGE segundos y se
+        # verifican antes de reutilizarse. Bajo ASGI Django no reutiliza conexiones
+        # entre peticiones, por eso core/asgi.py usa 0 por defecto (pool en PgBouncer)
+        'CONN_MAX_AGE': int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        'CONN_HEALTH_CHECKS': True,
+        # PgBouncer en modo transaction no conserva cursores de servidor entre transacciones
+        'DISABLE_SERVER_SIDE_CURSORS': DB_PGBOUNCER,
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+            'application_name': 'vrisa',
+        },
+    }
+}
+# Conexion directa a PostgreSQL (sin PgBouncer) para lo que necesita una sesion
+# propia: LISTEN de los eventos en vivo y las migraciones (`migrate --database direct`)
+DATABASES['direct'] = {
+    **DATABASES['default'],
+    'HOST': os.environ.get("DB_DIRECT_HOST", DATABASES['default']['HOST']),
+    'PORT': os.environ.get("DB_DIRECT_PORT", DATABASES['default']['PORT']),
+    'CONN_MAX_AGE': 0,
+    'DISABLE_SERVER_SIDE_CURSORS': False,
+    'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+    'TEST': {'MIRROR': 'default'},
+}
 
+
+# Replicas de solo lectura (ver api/routing.py): DB_REPLICA_HOSTS es una lista
+# host[:puerto] separada por comas; cada replica queda como alias replica_<n>.
+# Los endpoints de lectura pesados leen de ellas, las escrituras van a `default`
+DATABASE_REPLICAS = []
+for _index, _address in enumerate(filter(None, os.environ.get("DB_REPLICA_HOSTS", "").split(","))):
+    _host, _, _port = _address.strip().partition(":")
+    DATABASES[f'replica_{_index}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _port or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default']['OPTIONS']),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{_index}')
+
+DATABASE_ROUTERS = ['api.routing.ReplicaRouter']
+
+# Retraso maximo (s) de una replica para leer de ella; sin valor no se verifica.
+# Si todas lo superan (o no responden) se lee del primario
+REPLICA_MAX_LAG_SECONDS = (
+    float(os.environ["REPLICA_MAX_LAG_SECONDS"]) if os.environ.get("REPLICA_MAX_LAG_SECONDS") else None
+)
+REPLICA_LAG_CHECK_SECONDS = int(os.environ.get("REPLICA_LAG_CHECK_SECONDS", 5))
+# Tiempo de vida maximo (s) en cache de las respuestas leidas de una replica
+REPLICA_CACHE_TIMEOUT = int(os.environ.get("REPLICA_CACHE_TIMEOUT", 15))
+
+
+# Cache en Redis (servicio `redis` de docker-compose). Si Redis no responde,
+# las operaciones de cache fallan en silencio y las vistas consultan la BD.
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/1")
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+        'KEY_PREFIX': 'vrisa',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            'IGNORE_EXCEPTIONS': True,
+        },
     }
 }
 
+# Tiempo de vida (s) de las respuestas cacheadas de los endpoints de lectura
+API_CACHE_TIMEOUT = int(os.environ.get("API_CACHE_TIMEOUT", 300))
+
+# Tiempo de vida (s) de los vector tiles de estaciones (también Cache-Control)
+TILE_CACHE_TIMEOUT = int(os.environ.get("TILE_CACHE_TIMEOUT", 60))
+
+# Resumen del dashboard (ver api/dashboard.py): segundos en que esta fresco y
+# segundos adicionales en que se sirve vencido mientras un job lo recalcula
+DASHBOARD_FRESH_SECONDS = int(os.environ.get("DASHBOARD_FRESH_SECONDS", 30))
+DASHBOARD_STALE_SECONDS = int(os.environ.get("DASHBOARD_STALE_SECONDS", 120))
+
+# Mapa de calor interpolado (IDW, ver api/heatmap.py)
+# Caja (oeste, sur, este, norte) sobre Cali y resolucion (columnas, filas) de la grilla
+HEATMAP_BBOX = (-76.60, 3.33, -76.45, 3.50)
+HEATMAP_GRID = (300, 340)
+HEATMAP_POWER = float(os.environ.get("HEATMAP_POWER", 2))
+# Directorio compartido por los procesos donde se guardan las grillas (.npy)
+HEATMAP_DIR = os.environ.get("HEATMAP_DIR", str(BASE_DIR / 'var' / 'heatmap'))
+# Muestras por lado de los tiles JSON
+HEATMAP_JSON_TILE_SIZE = 64
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -280,4 +378,75 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
-CORS_ALLOW_ALL_ORIGINS = True #Temporal para pruebas con React, luego se tiene que quitar
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = True #Temporal para pruebas con React, luego se tiene que quitar
+
+# Particiones mensuales de la tabla de mediciones (ver api/partitions.py)
+MEASUREMENT_PARTITION_MONTHS_AHEAD = int(os.environ.get("MEASUREMENT_PARTITION_MONTHS_AHEAD", 3))
+MEASUREMENT_RETENTION_MONTHS = int(os.environ.get("MEASUREMENT_RETENTION_MONTHS", 24))
+
+# Ingesta masiva de mediciones (ver api/ingest.py)
+MEASUREMENT_INGEST_MAX_ROWS = int(os.environ.get("MEASUREMENT_INGEST_MAX_ROWS", 50000))
+
+# Zona horaria local de las estaciones: alinea los buckets diarios y las series
+STATION_TIME_ZONE = os.environ.get("STATION_TIME_ZONE", "America/Bogota")
+
+# Numero maximo de buckets por respuesta del endpoint de series
+SERIES_MAX_BUCKETS = int(os.environ.get("SERIES_MAX_BUCKETS", 10000))
+
+# Indice de calidad del aire (ver api/aqi.py)
+AQI_STANDARDS = ['colombia', 'us_epa']
+AQI_DEFAULT_STANDARD = 'colombia'
+AQI_LOOKBACK_HOURS = int(os.environ.get("AQI_LOOKBACK_HOURS", 3))
+
+# Motor de alertas por umbral (ver api/alerting.py). Umbrales por defecto en
+# ug/m3 (niveles maximos permisibles de la Resolucion 2254 de 2017); se pueden
+# sobrescribir por contaminante y por estacion con el modelo AlertThreshold.
+ALERT_DEFAULT_THRESHOLDS = {
+    'PM25': 37,
+    'PM10': 75,
+    'O3': 100,
+    'NO2': 200,
+    'SO2': 50,
+    'CO': 5000,
+}
+# Histeresis: la alerta se rearma cuando la lectura baja de umbral * ratio
+ALERT_CLEAR_RATIO = float(os.environ.get("ALERT_CLEAR_RATIO", 0.9))
+# Tiempo minimo entre dos alertas de la misma estacion y contaminante
+ALERT_COOLDOWN_MINUTES = int(os.environ.get("ALERT_COOLDOWN_MINUTES", 60))
+
+# Filas de AlertReceive por INSERT al notificar una alerta (ver api/notifications.py)
+NOTIFY_BATCH_SIZE = int(os.environ.get("NOTIFY_BATCH_SIZE", 1000))
+
+# Cola de trabajos en segundo plano sobre PostgreSQL (ver api/jobs.py y
+# `manage.py run_workers`). Con JOBS_ASYNC=false los trabajos se ejecutan en el
+# mismo proceso al confirmar la transaccion (util sin workers, p. ej. en pruebas)
+JOBS_ASYNC = os.environ.get("JOBS_ASYNC", "true").lower() == "true"
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", 3))
+# Espera antes del primer reintento; se duplica en cada intento
+JOB_RETRY_BACKOFF_SECONDS = int(os.environ.get("JOB_RETRY_BACKOFF_SECONDS", 30))
+# Un trabajo 'running' sin terminar tras este tiempo se considera abandonado
+JOB_LOCK_TIMEOUT_SECONDS = int(os.environ.get("JOB_LOCK_TIMEOUT_SECONDS", 600))
+JOB_POLL_INTERVAL_SECONDS = float(os.environ.get("JOB_POLL_INTERVAL_SECONDS", 1))
+JOB_RETENTION_DAYS = int(os.environ.get("JOB_RETENTION_DAYS", 7))
+
+# Eventos en vivo (SSE/WebSocket) via LISTEN/NOTIFY de PostgreSQL (ver
+# api/broadcast.py). Una sola conexion LISTEN por proceso, contra esta BD; LISTEN
+# no funciona a traves de PgBouncer en modo transaction
+LIVE_DATABASE = os.environ.get("LIVE_DATABASE", "direct")
+# Eventos pendientes por cliente; si se llena, el cliente se desconecta
+LIVE_QUEUE_SIZE = int(os.environ.get("LIVE_QUEUE_SIZE", 100))
+LIVE_HEARTBEAT_SECONDS = int(os.environ.get("LIVE_HEARTBEAT_SECONDS", 15))
+LIVE_RECONNECT_SECONDS = int(os.environ.get("LIVE_RECONNECT_SECONDS", 2))
+# Espera sugerida al navegador antes de reconectar (campo `retry` de SSE)
+LIVE_RETRY_MILLISECONDS = int(os.environ.get("LIVE_RETRY_MILLISECONDS", 5000))
+# Alertas reenviadas como maximo al reconectar con Last-Event-ID
+LIVE_REPLAY_LIMIT = int(os.environ.get("LIVE_REPLAY_LIMIT", 100))
+# Estaciones que puede seguir una conexion WebSocket de lecturas
+LIVE_MAX_STATIONS = int(os.environ.get("LIVE_MAX_STATIONS", 100))
+
+# Paginacion con conteo estimado (ver api/pagination.py): por encima de este
+# numero de filas estimadas se usa la estimacion del planificador en lugar de COUNT(*)
+PAGINATION_ESTIMATE_THRESHOLD = int(os.environ.get("PAGINATION_ESTIMATE_THRESHOLD", 50000))
+
+# Maximo de estaciones devueltas por /api/stations/nearby/?k=
+NEARBY_MAX_K = int(os.environ.get("NEARBY_MAX_K", 100))
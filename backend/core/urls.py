@@ -110,16 +110,41 @@ def api_root(request):
                 "devices": "/api/devices/",
                 "alerts": "/api/alerts/",
                 "alert_pollutants": "/api/alert-pollutants/",
+                "alert_thresholds": "/api/alert-thresholds/",
                 "alert_receives": "/api/alert-receives/",
                 "station_consults": "/api/station-consults/",
+                "measurements": "/api/measurements/",
+                "rollups_hourly": "/api/rollups/hourly/",
+                "rollups_daily": "/api/rollups/daily/",
+                "jobs": "/api/jobs/",
+                "alert_stream": "/api/alerts/stream/",
+                "live_readings": "/ws/readings/ (WebSocket)",
+                "station_tiles": "/api/tiles/{z}/{x}/{y}.mvt",
+                "heatmap_tiles": "/api/heatmap/{pollutant}/{z}/{x}/{y}.png",
+            },
+            "dashboard": {
+                "summary": "/api/dashboard/summary/?standard=colombia",
+            },
+            "async": {
+                "stations": "/api/async/stations/",
+                "nearby_stations": "/api/async/stations/nearby/?lat=X&lon=Y&k=5",
+                "station_series": "/api/async/stations/{id}/series/?pollutant=PM25",
+                "alerts": "/api/async/alerts/",
+                "health": "/api/async/health/",
             },
             "special_actions": {
                 "add_pollutants_to_alert": "/api/alerts/{id}/pollutants/",
                 "get_station_alerts": "/api/stations/{id}/alerts/",
+                "station_alert_levels": "/api/stations/{id}/alert-levels/?pollutant=PM25&max_points=500",
+                "station_series": "/api/stations/{id}/series/?pollutant=PM25&bucket=1h",
+                "stations_aqi": "/api/stations/aqi/?standard=colombia",
+                "station_aqi": "/api/stations/{id}/aqi/",
                 "grant_station_access": "/api/stations/{id}/grant-access/",
                 "nearby_stations": "/api/stations/nearby/?lat=X&lon=Y&radius=Z",
+                "nearest_stations": "/api/stations/nearby/?lat=X&lon=Y&k=5",
                 "mark_alert_attended": "/api/alerts/{id}/mark-attended/",
                 "notify_alert_users": "/api/alerts/{id}/notify/",
+                "ingest_measurements": "/api/measurements/ingest/",
             },
         }
     })
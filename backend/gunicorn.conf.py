@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration of the production server (Dockerfile CMD):
+
+    gunicorn core.asgi:application -c gunicorn.conf.py
+
+Gunicorn manages the worker processes (restarts, graceful reloads on
+SIGHUP); each worker runs the ASGI application on a uvicorn event loop, so
+SSE, WebSockets and the async views work as under plain uvicorn.
+
+The application is imported once in the master (`preload_app`) and the
+workers are forked from it: they start faster and share the memory of the
+loaded code. Nothing may connect to the database or Redis while the app is
+loading; `post_fork` drops any connection inherited from the master anyway.
+
+Environment:
+    WEB_CONCURRENCY   worker processes (default 2 x CPUs + 1)
+    GUNICORN_BIND     listen address (default 0.0.0.0:8000)
+"""
+
+import multiprocessing
+import os
+
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+
+# Recycle workers after a number of requests (with jitter so they do not
+# all restart at once) to bound memory growth.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+# Worker heartbeat; it does not limit long-lived SSE/WebSocket requests.
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat file on tmpfs: the container filesystem can stall it.
+worker_tmp_dir = "/dev/shm"
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    connections.close_all()
@@ -1,7 +1,7 @@
 import { useEffect, useState } from "react";
 import { stationsService } from "../../services/stations.service";
-import { alertsService } from "../../services/alerts.service";
-import { Station, Alert } from "../../types/api.types";
+import { dashboardService } from "../../services/dashboard.service";
+import { Station } from "../../types/api.types";
 import EcommerceMetrics from "../../components/ecommerce/EcommerceMetrics";
 import MonthlySalesChart from "../../components/ecommerce/MonthlySalesChart";
 import RecentOrders from "../../components/ecommerce/RecentOrders";
@@ -10,7 +10,6 @@ import PageMeta from "../../components/common/PageMeta";
 
 export default function Home() {
   const [stations, setStations] = useState<Station[]>([]);
-  const [alerts, setAlerts] = useState<Alert[]>([]);
   const [loading, setLoading] = useState(true);
   const [stats, setStats] = useState({
     activeStations: 0,
@@ -27,30 +26,18 @@ export default function Home() {
     try {
       setLoading(true);
 
-      // Cargar estaciones
-      const stationsData = await stationsService.getAll({ page_size: 100 });
+      // Resumen (conteos calculados en el servidor) y estaciones para el mapa
+      const [summary, stationsData] = await Promise.all([
+        dashboardService.getSummary(),
+        stationsService.getAll({ page_size: 100 }),
+      ]);
       setStations(stationsData.results);
 
-      // Cargar alertas
-      const alertsData = await alertsService.getAll({ page_size: 100 });
-      setAlerts(alertsData.results);
-
-      // Calcular estadísticas
-      const activeStations = stationsData.results.filter(
-        (s) => s.status === "active"
-      ).length;
-      const totalSensors = stationsData.results.reduce(
-        (sum, s) => sum + s.devices_count,
-        0
-      );
-      const activeAlerts = alertsData.results.filter((a) => !a.attended).length;
-      const attendedAlerts = alertsData.results.filter((a) => a.attended).length;
-
       setStats({
-        activeStations,
-        totalSensors,
-        activeAlerts,
-        attendedAlerts,
+        activeStations: summary.totals.active_stations,
+        totalSensors: summary.totals.devices,
+        activeAlerts: summary.totals.unattended_alerts,
+        attendedAlerts: summary.totals.attended_alerts,
       });
     } catch (error) {
       console.error("Error cargando datos del dashboard:", error);
@@ -78,8 +65,7 @@ export default function Home() {
           {/* Pasar stats reales */}
           <EcommerceMetrics stats={stats} />
           
-          {/* Pasar alertas reales */}
-          <MonthlySalesChart alerts={alerts} />
+          <MonthlySalesChart />
         </div>
         
         <div className="col-span-12 xl:col-span-5">
@@ -88,8 +74,7 @@ export default function Home() {
         </div>
         
         <div className="col-span-12 xl:col-span-7">
-          {/* Pasar alertas reales */}
-          <RecentOrders alerts={alerts} />
+          <RecentOrders />
         </div>
       </div>
     </>
@@ -0,0 +1,9 @@
+import api from './api.config';
+import { DashboardSummary } from '../types/api.types';
+
+export const dashboardService = {
+  getSummary: async (params?: { standard?: string }): Promise<DashboardSummary> => {
+    const response = await api.get<DashboardSummary>('/dashboard/summary/', { params });
+    return response.data;
+  },
+};
@@ -70,4 +70,45 @@ export interface Institution {
   admin_name: string;
   stations_count: number;
   created_at: string;
-}
\ No newline at end of file
+}
+export interface DashboardSummary {
+  generated_at: string;
+  totals: {
+    stations: number;
+    active_stations: number;
+    devices: number;
+    unattended_alerts: number;
+    attended_alerts: number;
+    exceedance_hours_24h: number;
+  };
+  stations_by_status: Record<string, { stations: number; devices: number }>;
+  unattended_alerts: {
+    by_station: {
+      station: number;
+      name: string;
+      institution: number;
+      count: number;
+      latest: string;
+    }[];
+    by_institution: {
+      institution: number;
+      name: string;
+      count: number;
+      stations: number;
+    }[];
+  };
+  aqi: {
+    standard: string;
+    stations: {
+      station: number;
+      aqi: number;
+      category: string;
+      dominant_pollutant: string;
+      computed_at: string;
+    }[];
+  };
+  exceedances_24h: {
+    since: string;
+    by_pollutant: { pollutant: string; hours: number; stations: number }[];
+  };
+}